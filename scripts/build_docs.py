@@ -6,35 +6,88 @@
 
 此脚本提供了以下功能：
 1. 安装依赖
-2. 构建静态文档站点
+2. 构建静态文档站点（含静态搜索包导出和报告）
 3. 启动本地预览服务器
-4. 清理构建文件
+4. 清理过期的构建输出
+5. 子进程与进程内构建的启动耗时对比
+
+安装了 mkdocs 时在当前进程内调用 mkdocs API 构建和预览，日志逐行输出，
+同一次运行中的多个操作共用一份已加载的配置；未安装时退回到调用 mkdocs 命令。
+
+进程内构建使用 site_build_cache 模块的增量构建缓存：内容未变化的页面直接恢复渲染结果，
+未修改的图片等静态文件不再重新复制。缓存目录（默认 .cache/site-build，可由
+DOCS_BUILD_CACHE 环境变量或 --cache-dir 指定）可以在 CI 的多次运行之间保存。
 """
 
 import os
 import sys
 import subprocess
 import argparse
+import logging
 import time
 
+# 进程内构建使用的 mkdocs 配置，首次使用时加载，同一次运行中的清理、构建共用
+_mkdocs_config = None
+
 def run_command(command, cwd=None):
-    """运行命令并返回结果"""
+    """运行命令，逐行输出命令的标准输出和标准错误，返回是否成功"""
     print(f"执行命令: {' '.join(command)}")
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             command,
             cwd=cwd,
-            check=True,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
         )
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
+    except OSError as e:
         print(f"命令执行失败: {e}")
-        print(e.stderr)
         return False
+    try:
+        for line in process.stdout:
+            print(line, end='')
+        return_code = process.wait()
+    except KeyboardInterrupt:
+        process.terminate()
+        return_code = process.wait()
+    if return_code != 0:
+        print(f"命令执行失败，退出码: {return_code}")
+        return False
+    return True
+
+def import_mkdocs():
+    """导入 mkdocs，未安装时返回 False"""
+    import importlib
+    # --install 刚安装的包需要刷新导入缓存才能找到
+    importlib.invalidate_caches()
+    try:
+        importlib.import_module('mkdocs.commands.build')
+        return True
+    except ImportError:
+        return False
+
+def setup_mkdocs_logging():
+    """把 mkdocs 日志逐行输出到标准输出，格式与 mkdocs 命令一致"""
+    logger = logging.getLogger('mkdocs')
+    if any(getattr(handler, '_build_docs', False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(levelname)-7s -  %(message)s'))
+    handler._build_docs = True
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def load_mkdocs_config():
+    """加载 mkdocs 配置（只加载一次）"""
+    global _mkdocs_config
+    if _mkdocs_config is None:
+        from mkdocs.config import load_config
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        setup_mkdocs_logging()
+        _mkdocs_config = load_config(os.path.join(project_root, 'mkdocs.yml'))
+    return _mkdocs_config
 
 def install_dependencies():
     """安装文档站点依赖"""
@@ -50,11 +103,64 @@ def install_dependencies():
         packages = ['mkdocs>=1.5.0', 'mkdocs-material>=9.4.0', 'mkdocstrings>=0.24.0']
         return run_command([sys.executable, '-m', 'pip', 'install'] + packages)
 
-def build_docs():
-    """构建文档站点"""
+def build_docs(clean=False, use_cache=True, cache_dir=None):
+    """构建文档站点
+
+    Args:
+        clean: 构建后删除本次构建没有产生的过期输出
+        use_cache: 是否使用增量构建缓存；不使用时清空站点目录完整构建
+        cache_dir: 构建缓存目录
+    """
     print("正在构建文档站点...")
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return run_command(['mkdocs', 'build'], cwd=project_root)
+    if not import_mkdocs():
+        return run_command(['mkdocs', 'build'], cwd=project_root)
+
+    from mkdocs.commands.build import build
+    try:
+        if not use_cache:
+            build(load_mkdocs_config())
+            return True
+        from site_build_cache import SiteBuildCache
+        cache = SiteBuildCache(cache_dir)
+        stats = cache.run_build(load_mkdocs_config(), clean=clean)
+        mode = "增量构建" if stats['incremental'] else "完整构建（构建环境变化或没有可复用的站点目录）"
+        print(f"{mode}: 页面缓存命中 {stats['hits']} 个，重新渲染 {stats['misses']} 个"
+              + (f"，不缓存 {stats['uncached']} 个" if stats['uncached'] else "")
+              + f"，耗时 {stats['seconds']:.2f} 秒")
+        if stats['removed']:
+            print(f"已删除 {len(stats['removed'])} 个过期输出")
+        print(f"构建缓存目录: {cache.cache_dir}")
+        return True
+    except Exception as e:
+        print(f"构建文档站点失败: {e}")
+        return False
+
+def export_search():
+    """报告静态搜索包的体积和首次查询延迟
+
+    搜索包由 mkdocs.yml 中配置的钩子在 mkdocs build 过程中导出到 site/search_bundle；
+    钩子未启用（搜索包不存在）时在这里重新构建索引并导出。
+    """
+    from search_bundle import (BUNDLE_DIR_NAME, DEFAULT_REPORT_QUERIES, bundle_report,
+                               export_search_bundle, print_bundle_report)
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output_dir = os.path.join(project_root, 'site', BUNDLE_DIR_NAME)
+    try:
+        if not os.path.exists(os.path.join(output_dir, 'manifest.json')):
+            print("正在导出静态搜索包...")
+            from search_index_optimizer import SearchIndexOptimizer
+            optimizer = SearchIndexOptimizer()
+            if not optimizer.build_index():
+                return False
+            manifest = export_search_bundle(optimizer, output_dir)
+            print(f"已导出静态搜索包: {output_dir}（{len(manifest['shards'])} 个分片）")
+        print_bundle_report(bundle_report(output_dir, DEFAULT_REPORT_QUERIES))
+        return True
+    except Exception as e:
+        print(f"导出静态搜索包失败: {e}")
+        return False
 
 def serve_docs(port=8000):
     """启动本地预览服务器"""
@@ -63,14 +169,46 @@ def serve_docs(port=8000):
     print("按 Ctrl+C 停止服务器")
     
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return run_command(['mkdocs', 'serve', '--dev-addr', f'localhost:{port}'], cwd=project_root)
+    if not import_mkdocs():
+        return run_command(['mkdocs', 'serve', '--dev-addr', f'localhost:{port}'], cwd=project_root)
+
+    # 预览服务器每次重新构建都会重新读取配置文件，以便配置修改后立即生效
+    from mkdocs.commands.serve import serve
+    setup_mkdocs_logging()
+    try:
+        serve(config_file=os.path.join(project_root, 'mkdocs.yml'), dev_addr=f'localhost:{port}')
+        return True
+    except KeyboardInterrupt:
+        print("预览服务器已停止")
+        return True
+    except Exception as e:
+        print(f"启动预览服务器失败: {e}")
+        return False
+
+def clean_docs(full=False, cache_dir=None):
+    """清理构建文件
 
-def clean_docs():
-    """清理构建文件"""
+    默认只删除上次构建没有产生的过期输出，保留可复用的站点目录；没有构建记录或
+    full 为 True 时删除整个站点目录。
+
+    Args:
+        full: 是否删除整个站点目录
+        cache_dir: 构建缓存目录（其中保存上次构建的输出列表）
+    """
     print("正在清理构建文件...")
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    site_dir = os.path.join(project_root, 'site')
-    
+    if import_mkdocs():
+        site_dir = os.path.abspath(load_mkdocs_config().site_dir)
+    else:
+        site_dir = os.path.join(project_root, 'site')
+
+    if os.path.exists(site_dir) and not full:
+        from site_build_cache import clean_stale_outputs
+        removed = clean_stale_outputs(site_dir, cache_dir)
+        if removed is not None:
+            print(f"已删除 {len(removed)} 个过期输出: {site_dir}")
+            return True
+
     if os.path.exists(site_dir):
         import shutil
         try:
@@ -84,17 +222,73 @@ def clean_docs():
         print("构建目录不存在，无需清理")
         return True
 
+def benchmark_startup(rounds=3):
+    """对比子进程构建和进程内构建的耗时
+
+    子进程构建每次都要启动解释器、导入 mkdocs 和插件并加载配置；进程内构建只在
+    第一次付出导入和加载配置的开销，之后复用已加载的配置。
+    """
+    print("正在对比构建启动耗时...")
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if not import_mkdocs():
+        print("未安装 mkdocs，无法进行进程内构建")
+        return False
+
+    subprocess_times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = subprocess.run(['mkdocs', 'build', '--quiet'], cwd=project_root,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        subprocess_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            print("mkdocs 命令构建失败")
+            return False
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import mkdocs.commands.build'], check=True)
+    import_time = time.perf_counter() - start
+
+    from mkdocs.commands.build import build
+    start = time.perf_counter()
+    config = load_mkdocs_config()
+    load_time = time.perf_counter() - start
+    logging.getLogger('mkdocs').setLevel(logging.WARNING)
+    in_process_times = []
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            build(config)
+            in_process_times.append(time.perf_counter() - start)
+    finally:
+        logging.getLogger('mkdocs').setLevel(logging.INFO)
+
+    print(f"子进程构建（mkdocs build）: 最快 {min(subprocess_times):.2f} 秒，"
+          f"平均 {sum(subprocess_times) / rounds:.2f} 秒")
+    print(f"其中启动解释器并导入 mkdocs: {import_time:.2f} 秒")
+    print(f"进程内加载配置（含主题和插件）: {load_time:.2f} 秒（只需一次）")
+    print(f"进程内首次构建: {in_process_times[0]:.2f} 秒，之后复用配置的构建: "
+          f"最快 {min(in_process_times[1:] or in_process_times):.2f} 秒")
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description='文档站点构建和预览工具')
     
     parser.add_argument('--install', action='store_true', help='安装依赖')
     parser.add_argument('--build', action='store_true', help='构建文档站点')
     parser.add_argument('--serve', action='store_true', help='启动本地预览服务器')
-    parser.add_argument('--clean', action='store_true', help='清理构建文件')
+    parser.add_argument('--clean', action='store_true',
+                        help='清理过期的构建输出（与 --build 一起使用时在构建完成后清理）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用增量构建缓存；与 --clean 一起使用时删除整个站点目录')
+    parser.add_argument('--cache-dir', help='构建缓存目录，默认为 $DOCS_BUILD_CACHE 或 .cache/site-build')
     parser.add_argument('--port', type=int, default=8000, help='预览服务器端口，默认8000')
     parser.add_argument('--all', action='store_true', help='执行安装、构建和预览完整流程')
+    parser.add_argument('--benchmark-startup', action='store_true',
+                        help='对比子进程构建和进程内构建的耗时')
     
     args = parser.parse_args()
+    # 输出重定向到文件或管道（如 CI 日志）时同样逐行输出
+    sys.stdout.reconfigure(line_buffering=True)
     
     # 如果没有指定任何参数，显示帮助信息
     if not any(vars(args).values()):
@@ -107,11 +301,17 @@ def main():
     if args.all or args.install:
         success = install_dependencies() and success
     
-    if args.all or args.clean:
-        success = clean_docs() and success
-    
     if args.all or args.build:
-        success = build_docs() and success
+        # 过期输出要在构建完成后才能确定，清理由构建过程完成
+        success = build_docs(clean=args.all or args.clean, use_cache=not args.no_cache,
+                             cache_dir=args.cache_dir) and success
+        if success:
+            success = export_search() and success
+    elif args.clean:
+        success = clean_docs(full=args.no_cache, cache_dir=args.cache_dir) and success
+    
+    if args.benchmark_startup:
+        success = benchmark_startup() and success
     
     if args.all or args.serve:
         # 服务是阻塞的，所以放在最后
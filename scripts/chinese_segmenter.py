@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+中文分词模块 - 关联需求FR-007
+
+此模块提供离线的基于词典的中文分词功能，包括：
+1. 词典加载（每个词典文件在进程内首次使用时加载一次）
+2. 前缀词典 + 有向无环图（DAG）的候选切分
+3. 基于词频的最大概率路径选择
+4. 连续的未登录单字按重叠的二元组切分
+5. 搜索模式：列出较长词语中包含的词典词语（与 jieba 的搜索引擎模式一致）
+6. 分词吞吐量基准测试
+
+内置词典为 jieba 0.42.1 的 dict.txt 中由中文字符组成的词语及词频，以 gzip 压缩保存。
+jieba 以 MIT 许可证发布，版权声明和许可文本见 data/zh_dict.LICENSE，分发词典文件时需一并保留。
+"""
+
+import os
+import gzip
+import math
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DICTIONARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'zh_dict.txt.gz')
+
+_CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fa5]+')
+
+# 已加载的分词器，按词典路径缓存
+_segmenters = {}
+
+
+class ChineseSegmenter:
+    """基于词典的中文分词器
+
+    与 jieba 的精确模式（不启用HMM）思路一致：用前缀词典为句子中每个位置列出所有
+    可成词的结束位置，再从句尾向前动态规划选出对数概率之和最大的切分路径。
+    路径中连续的、不在词典中的单字切分为重叠的二元组，未登录词仍可按二元组检索。
+    """
+
+    def __init__(self, dictionary_path: str = None):
+        """加载分词词典
+
+        Args:
+            dictionary_path: 词典文件路径（每行"词语 词频"，支持 .gz），默认为内置词典
+        """
+        self.dictionary_path = dictionary_path or DEFAULT_DICTIONARY
+        # 词语 -> 词频；词语的所有前缀以词频0登记，用于构建DAG时判断是否继续向后扩展
+        self._freq = {}
+        self._total = 0
+        self._load_dictionary()
+
+    def _load_dictionary(self):
+        """读取词典文件"""
+        freqs = self._freq
+        total = 0
+        opener = gzip.open if self.dictionary_path.endswith('.gz') else open
+        with opener(self.dictionary_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split()
+                word = parts[0]
+                freq = int(parts[1]) if len(parts) > 1 else 1
+                total += freq - freqs.get(word, 0)
+                freqs[word] = freq
+                for end in range(1, len(word)):
+                    freqs.setdefault(word[:end], 0)
+        self._total = total
+        self._log_total = math.log(total) if total > 0 else 0.0
+
+    def add_word(self, word: str, freq: int = 1):
+        """向词典中添加词语
+
+        Args:
+            word: 词语
+            freq: 词频
+        """
+        self._total += freq - self._freq.get(word, 0)
+        self._freq[word] = freq
+        for end in range(1, len(word)):
+            self._freq.setdefault(word[:end], 0)
+        # 词典变化后重新计算对数概率
+        self._log_total = math.log(self._total) if self._total > 0 else 0.0
+
+    def _build_dag(self, sentence: str) -> List[List[int]]:
+        """列出每个起始位置所有可成词的结束位置"""
+        freq = self._freq
+        length = len(sentence)
+        dag = []
+        for start in range(length):
+            ends = []
+            end = start
+            fragment = sentence[start]
+            while fragment in freq:
+                if freq[fragment]:
+                    ends.append(end)
+                end += 1
+                if end >= length:
+                    break
+                fragment = sentence[start:end + 1]
+            if not ends:
+                ends.append(start)
+            dag.append(ends)
+        return dag
+
+    def _best_route(self, sentence: str, dag: List[List[int]]) -> List[int]:
+        """从句尾向前计算最大概率路径，返回每个起始位置的最优结束位置"""
+        freq = self._freq
+        log_total = self._log_total
+        length = len(sentence)
+        scores = [0.0] * (length + 1)
+        route = [0] * length
+        for start in range(length - 1, -1, -1):
+            best_score = None
+            best_end = start
+            for end in dag[start]:
+                word_freq = freq.get(sentence[start:end + 1]) or 1
+                score = math.log(word_freq) - log_total + scores[end + 1]
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best_end = end
+            scores[start] = best_score
+            route[start] = best_end
+        return route
+
+    def cut(self, sentence: str) -> List[str]:
+        """切分一段连续的中文文本
+
+        Args:
+            sentence: 只包含中文字符的文本
+
+        Returns:
+            词语列表
+        """
+        return [word for word, _ in self.cut_with_offsets(sentence)]
+
+    def cut_with_offsets(self, sentence: str) -> List[Tuple[str, int]]:
+        """切分一段连续的中文文本并记录每个词语在文本中的字符偏移
+
+        连续两个以上的未登录单字切分为重叠的二元组，孤立的未登录单字保持为单字。
+
+        Args:
+            sentence: 只包含中文字符的文本
+
+        Returns:
+            (词语, 字符偏移) 列表
+        """
+        if not sentence:
+            return []
+
+        route = self._best_route(sentence, self._build_dag(sentence))
+        words = []
+        # 当前连续未登录单字的起始偏移
+        unknown_start = None
+        start = 0
+        length = len(sentence)
+        while start <= length:
+            end = route[start] + 1 if start < length else start + 1
+            if start < length and end - start == 1 and not self._freq.get(sentence[start]):
+                if unknown_start is None:
+                    unknown_start = start
+                start = end
+                continue
+            if unknown_start is not None:
+                words.extend(self._unknown_grams(sentence, unknown_start, start))
+                unknown_start = None
+            if start < length:
+                words.append((sentence[start:end], start))
+            start = end
+        return words
+
+    @staticmethod
+    def _unknown_grams(sentence: str, start: int, end: int) -> List[Tuple[str, int]]:
+        """把一段连续的未登录单字切分为重叠的二元组"""
+        if end - start == 1:
+            return [(sentence[start], start)]
+        return [(sentence[i:i + 2], i) for i in range(start, end - 1)]
+
+    def subwords(self, word: str) -> List[Tuple[str, int]]:
+        """列出词语中包含的二字、三字词典词语（搜索模式）
+
+        较长的复合词（如"中文优化版"）建立索引时同时索引其中的词语，查询"中文"也能命中。
+
+        Args:
+            word: 切分得到的词语
+
+        Returns:
+            (词语, 在 word 中的字符偏移) 列表，按偏移排列，不包含 word 本身
+        """
+        freq = self._freq
+        found = []
+        for size in (2, 3):
+            if len(word) > size:
+                found.extend((word[i:i + size], i) for i in range(len(word) - size + 1)
+                             if freq.get(word[i:i + size]))
+        found.sort(key=lambda item: (item[1], len(item[0])))
+        return found
+
+    def cut_text(self, text: str) -> List[str]:
+        """切分任意文本中的中文部分（非中文字符被忽略）
+
+        Args:
+            text: 文本
+
+        Returns:
+            中文词语列表
+        """
+        words = []
+        for match in _CHINESE_PATTERN.finditer(text):
+            words.extend(self.cut(match.group()))
+        return words
+
+
+def get_segmenter(dictionary_path: Optional[str] = None) -> ChineseSegmenter:
+    """获取分词器，同一词典在进程内只加载一次
+
+    Args:
+        dictionary_path: 词典文件路径，默认为内置词典
+
+    Returns:
+        分词器实例
+    """
+    dictionary_path = dictionary_path or DEFAULT_DICTIONARY
+    segmenter = _segmenters.get(dictionary_path)
+    if segmenter is None:
+        segmenter = _segmenters[dictionary_path] = ChineseSegmenter(dictionary_path)
+    return segmenter
+
+
+def benchmark(docs_dir: str, rounds: int = 3, dictionary_path: Optional[str] = None) -> Dict[str, float]:
+    """测量分词吞吐量
+
+    Args:
+        docs_dir: 文档目录，读取其中全部Markdown文件的中文文本
+        rounds: 重复次数
+        dictionary_path: 词典文件路径
+
+    Returns:
+        包含字符数、词语数、耗时和每秒字符数的字典
+    """
+    load_start = time.perf_counter()
+    segmenter = ChineseSegmenter(dictionary_path)
+    load_time = time.perf_counter() - load_start
+
+    runs = []
+    for root, _, files in os.walk(docs_dir):
+        for file in files:
+            if file.endswith('.md'):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    runs.extend(match.group() for match in _CHINESE_PATTERN.finditer(f.read()))
+
+    chars = sum(len(run) for run in runs) * rounds
+    words = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for run in runs:
+            words += len(segmenter.cut(run))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "dictionary_load_seconds": load_time,
+        "chars": chars,
+        "words": words,
+        "seconds": elapsed,
+        "chars_per_second": chars / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main():
+    """主函数 - 分词演示和吞吐量基准测试"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='中文分词工具')
+    parser.add_argument('text', nargs='?', help='要切分的文本')
+    parser.add_argument('--dictionary', help='词典文件路径，默认为内置词典')
+    parser.add_argument('--benchmark', metavar='DOCS_DIR', help='对文档目录中的中文文本执行吞吐量基准测试')
+    parser.add_argument('--rounds', type=int, default=3, help='基准测试重复次数，默认3')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.benchmark, args.rounds, args.dictionary)
+        print(f"词典加载耗时: {result['dictionary_load_seconds'] * 1000:.1f} ms")
+        print(f"切分 {result['chars']} 个字符，得到 {result['words']} 个词语，耗时 {result['seconds']:.3f} 秒")
+        print(f"吞吐量: {result['chars_per_second']:.0f} 字符/秒")
+    elif args.text:
+        print(' / '.join(get_segmenter(args.dictionary).cut_text(args.text)))
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+/*
+ * 静态搜索包浏览器端查询脚本 - 关联需求FR-007
+ *
+ * 由 scripts/search_bundle.py 复制到 site/search_bundle/。页面加载时下载清单和文档表，
+ * 查询时只下载查询涉及的分片，已下载的分片在页面内缓存。
+ *
+ * 用法：
+ *   SpecSearch.search("规范驱动开发", 10).then(function (results) { ... });
+ *   结果为 [{url, title, snippet, score}]，url 相对于站点根目录。
+ */
+(function (global) {
+  "use strict";
+
+  var CJK = /[\u4e00-\u9fa5]/;
+  var script = document.currentScript;
+  var baseUrl = script ? script.src.replace(/[^\/]*$/, "") : "search_bundle/";
+
+  var manifestPromise = null;
+  var docsPromise = null;
+  var shardPromises = {};
+  // 已加载分片中的词语 -> [idf, [doc_id, tf, ...]]
+  var terms = {};
+  // 已加载分片中出现的最长中文词语长度，限制最长匹配的窗口
+  var longestTerm = 1;
+
+  function fetchJson(path) {
+    return fetch(baseUrl + path).then(function (response) {
+      if (!response.ok) {
+        throw new Error("搜索包文件加载失败: " + path);
+      }
+      return response.json();
+    });
+  }
+
+  function loadManifest() {
+    if (!manifestPromise) {
+      manifestPromise = fetchJson("manifest.json").then(function (manifest) {
+        docsPromise = fetchJson(manifest.docs);
+        manifest.firstTerms = manifest.shards.map(function (shard) { return shard[0]; });
+        manifest.stopWordSet = {};
+        manifest.stop_words.forEach(function (word) { manifest.stopWordSet[word] = true; });
+        return manifest;
+      });
+    }
+    return manifestPromise;
+  }
+
+  function loadShard(name) {
+    if (!shardPromises[name]) {
+      shardPromises[name] = fetchJson(name).then(function (shard) {
+        Object.keys(shard).forEach(function (term) {
+          terms[term] = shard[term];
+          if (CJK.test(term.charAt(0)) && term.length > longestTerm) {
+            longestTerm = term.length;
+          }
+        });
+      });
+    }
+    return shardPromises[name];
+  }
+
+  // 最后一个首词语不大于 key 的分片序号
+  function upperBound(firstTerms, key) {
+    var low = 0;
+    var high = firstTerms.length;
+    while (low < high) {
+      var middle = (low + high) >> 1;
+      if (firstTerms[middle] <= key) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    return low;
+  }
+
+  function shardsForTerm(manifest, term) {
+    var index = upperBound(manifest.firstTerms, term) - 1;
+    return index >= 0 ? [manifest.shards[index][1]] : [];
+  }
+
+  function shardsForPrefix(manifest, prefix) {
+    var start = Math.max(upperBound(manifest.firstTerms, prefix) - 1, 0);
+    var end = upperBound(manifest.firstTerms, prefix + "\uffff");
+    return manifest.shards.slice(start, end).map(function (shard) { return shard[1]; });
+  }
+
+  // 把查询拆成英文数字词语和中文片段，与 search_bundle.query_shards 的规则一致
+  function splitQuery(manifest, query) {
+    var words = [];
+    var runs = [];
+    var pattern = /([\u4e00-\u9fa5]+)|([A-Za-z0-9]+)/g;
+    var match;
+    while ((match = pattern.exec(query)) !== null) {
+      if (match[1]) {
+        runs.push(match[1]);
+      } else if (match[2].length >= manifest.min_token_length &&
+                 !manifest.stopWordSet[match[2].toLowerCase()]) {
+        words.push(match[2]);
+      }
+    }
+    return { words: words, runs: runs };
+  }
+
+  function ngrams(run, size) {
+    var grams = [];
+    for (var i = 0; i < Math.max(run.length - size + 1, 1); i++) {
+      grams.push(run.substr(i, size));
+    }
+    return grams;
+  }
+
+  // 用已加载的词表对中文片段做正向最长匹配
+  function segment(run) {
+    var tokens = [];
+    var start = 0;
+    while (start < run.length) {
+      var end = Math.min(run.length, start + longestTerm);
+      for (; end > start + 1; end--) {
+        if (terms.hasOwnProperty(run.slice(start, end))) {
+          break;
+        }
+      }
+      if (end > start + 1) {
+        tokens.push(run.slice(start, end));
+        start = end;
+      } else {
+        start += 1;
+      }
+    }
+    return tokens;
+  }
+
+  function queryTokens(manifest, parts) {
+    var tokens = parts.words.slice();
+    parts.runs.forEach(function (run) {
+      if (manifest.segmentation === "ngram") {
+        tokens = tokens.concat(ngrams(run, manifest.ngram_size));
+      } else if (manifest.segmentation) {
+        tokens = tokens.concat(segment(run));
+      }
+    });
+    return tokens.filter(function (token) {
+      return token.length >= manifest.min_token_length && !manifest.stopWordSet[token.toLowerCase()];
+    });
+  }
+
+  function search(query, limit) {
+    limit = limit || 10;
+    return loadManifest().then(function (manifest) {
+      var parts = splitQuery(manifest, query);
+      var needed = {};
+      parts.words.forEach(function (word) {
+        shardsForTerm(manifest, word).forEach(function (name) { needed[name] = true; });
+      });
+      parts.runs.forEach(function (run) {
+        if (manifest.segmentation === "ngram") {
+          ngrams(run, manifest.ngram_size).forEach(function (gram) {
+            shardsForTerm(manifest, gram).forEach(function (name) { needed[name] = true; });
+          });
+        } else if (manifest.segmentation) {
+          for (var i = 0; i < run.length; i++) {
+            shardsForPrefix(manifest, run.charAt(i)).forEach(function (name) { needed[name] = true; });
+          }
+        }
+      });
+      var loads = Object.keys(needed).map(loadShard);
+      return Promise.all([docsPromise].concat(loads)).then(function (loaded) {
+        return rank(manifest, loaded[0], queryTokens(manifest, parts), limit);
+      });
+    });
+  }
+
+  // BM25 排序，参数与构建索引时的排序配置一致
+  function rank(manifest, docs, tokens, limit) {
+    var scores = {};
+    var k1 = manifest.k1;
+    var b = manifest.b;
+    var avgLength = manifest.avg_doc_length || 1;
+    tokens.forEach(function (token) {
+      var entry = terms[token];
+      if (!entry) {
+        return;
+      }
+      var idf = entry[0];
+      var postings = entry[1];
+      for (var i = 0; i < postings.length; i += 2) {
+        var docId = postings[i];
+        var tf = postings[i + 1];
+        var norm = k1 * (1 - b + b * docs[docId][3] / avgLength);
+        scores[docId] = (scores[docId] || 0) + idf * tf * (k1 + 1) / (tf + norm);
+      }
+    });
+    return Object.keys(scores)
+      .sort(function (left, right) { return scores[right] - scores[left] || left - right; })
+      .slice(0, limit)
+      .map(function (docId) {
+        var doc = docs[docId];
+        return { url: doc[0], title: doc[1], snippet: doc[2], score: scores[docId] };
+      });
+  }
+
+  // 清单和文档表很小，页面加载时预先下载，首次查询只需等待分片
+  loadManifest().catch(function () {
+    manifestPromise = null;
+  });
+
+  global.SpecSearch = { search: search, tokenize: function (query) {
+    return loadManifest().then(function (manifest) {
+      return queryTokens(manifest, splitQuery(manifest, query));
+    });
+  } };
+})(window);
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Markdown纯文本提取模块 - 关联需求FR-007
+
+此模块提供搜索索引使用的Markdown纯文本提取功能，包括：
+1. 单次扫描的逐行状态机（代码块、HTML注释、YAML头信息）
+2. 基于单个预编译正则的行内记号扫描（行内代码、图片、链接、HTML标签、强调标记）
+3. 提取纯文本的同时输出章节边界（标题层级、标题文本及其在纯文本中的位置）
+4. 按 MkDocs 默认目录扩展的规则生成章节锚点（需要安装 markdown）
+5. 与旧版正则替换链的性能对比基准测试
+"""
+
+import os
+import re
+import time
+from typing import Any, Dict, List, NamedTuple
+
+try:
+    from markdown.extensions.toc import slugify, unique
+except ImportError:
+    slugify = None
+    unique = None
+
+
+class Section(NamedTuple):
+    """章节边界：标题层级、标题纯文本及标题在提取文本中的起始位置"""
+    level: int
+    title: str
+    start: int
+
+
+class ExtractedText(NamedTuple):
+    """提取结果：以单个空格分隔的纯文本和按出现顺序排列的章节边界"""
+    text: str
+    sections: List[Section]
+
+
+# 块级结构，每行最多匹配一次
+_FENCE = re.compile(r' {0,3}(`{3,}|~{3,})')
+_HEADING = re.compile(r' {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+_THEMATIC_BREAK = re.compile(r' {0,3}(?:(?:[-*_][ \t]*){3,}|={3,}[ \t]*)$')
+_TABLE_DELIMITER = re.compile(r'[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+# 链接引用定义（"[ref]: url"），只提供链接地址，不输出文本
+_LINK_DEFINITION = re.compile(r' {0,3}\[[^\[\]\n]+\]:[ \t]*\S')
+# 可能出现在块级标记（分隔线、列表、引用）行首的字符
+_BLOCK_MARKERS = frozenset('-*_=+>0123456789')
+_BLOCK_PREFIX = re.compile(r'[ \t]*(?:>[ \t]?)*[ \t]*(?:(?:[-*+]|\d{1,9}[.)])[ \t]+(?:\[[ xX]\][ \t]+)?)?')
+
+# 行内记号的起始字符，先用字符集定位再尝试匹配完整记号
+_INLINE_START = re.compile(r'[`!\[<*~_]')
+# 行内记号，按优先级排列；每行从左到右扫描一次。
+# 链接文本中允许一层成对的方括号（如 "[外层 [内层] 文本](url)"），链接地址和图片的括号内
+# 不允许再出现同类括号，未闭合的括号不会导致重复扫描到行尾
+_INLINE = re.compile(
+    r'(?P<code>`+)'
+    r'|(?P<image>!\[[^\[\]\n]*\]\([^()\n]*\))'
+    r'|\[(?P<label>(?:[^\[\]\n]|\[[^\[\]\n]*\])*)\](?:\([^()\n]*\)|\[[^\[\]\n]*\])'
+    r'|(?P<comment><!--)'
+    r'|(?P<autolink><(?:https?|ftp|mailto):[^<>\s]*>)'
+    r'|(?P<tag></?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>]*)?/?>)'
+    r'|(?P<emphasis>\*{1,3}|~~|_{1,3})'
+)
+
+
+def _is_emphasis_underscore(line: str, start: int, end: int) -> bool:
+    """下划线是否为强调标记（两侧不同时为字母或数字，避免破坏 snake_case 标识符）"""
+    before = line[start - 1] if start > 0 else ' '
+    after = line[end] if end < len(line) else ' '
+    return not (before.isalnum() and after.isalnum())
+
+
+def _render_inline(line: str, out: List[str]) -> bool:
+    """提取一行中的行内文本
+
+    Args:
+        line: 去除块级标记后的行内容
+        out: 输出片段列表
+
+    Returns:
+        行尾是否处于未闭合的HTML注释中
+    """
+    position = 0
+    length = len(line)
+    while position < length:
+        trigger = _INLINE_START.search(line, position)
+        if trigger is None:
+            out.append(line[position:])
+            break
+        match = _INLINE.match(line, trigger.start())
+        if match is None:
+            # 不构成行内记号的普通字符（如单独的 "[" 或 "<"）
+            out.append(line[position:trigger.end()])
+            position = trigger.end()
+            continue
+        start, end = match.span()
+        out.append(line[position:start])
+        kind = match.lastgroup
+        if kind == 'code':
+            # 行内代码：保留代码内容，结束标记需与开始标记的反引号数量相同
+            ticks = match.group()
+            close = line.find(ticks, end)
+            while close >= 0 and close + len(ticks) < length and line[close + len(ticks)] == '`':
+                close = line.find(ticks, close + len(ticks) + 1)
+            if close < 0:
+                out.append(ticks)
+                position = end
+                continue
+            out.append(line[end:close])
+            position = close + len(ticks)
+            continue
+        if kind == 'label':
+            # 链接只保留链接文本，文本中的行内标记继续处理
+            _render_inline(match.group('label'), out)
+        elif kind == 'comment':
+            close = line.find('-->', end)
+            if close < 0:
+                return True
+            end = close + 3
+        elif kind == 'autolink':
+            out.append(match.group()[1:-1])
+        elif kind == 'emphasis' and match.group()[0] == '_' and not _is_emphasis_underscore(line, start, end):
+            out.append(match.group())
+        # 图片、HTML标签和强调标记直接丢弃
+        position = end
+    return False
+
+
+def extract(markdown_content: str) -> ExtractedText:
+    """单次扫描提取Markdown纯文本和章节边界
+
+    逐行处理：围栏代码块、文件开头的YAML头信息和链接引用定义整体跳过，HTML注释（可跨行）在其他
+    任何处理之前移除；标题、列表、引用、表格等块级标记去除后，行内内容交给行内扫描。
+    每个字符只被扫描常数次，耗时与文档长度成线性关系。
+
+    Args:
+        markdown_content: Markdown格式的文本
+
+    Returns:
+        提取结果，其中文本的空白字符被折叠为单个空格
+    """
+    parts = []
+    sections = []
+    # 已输出文本的长度（含片段之间的分隔空格）
+    offset = 0
+    fence = None
+    in_comment = False
+    lines = markdown_content.splitlines()
+
+    line_index = 0
+    if lines and lines[0].strip() == '---':
+        # 文件开头的YAML头信息
+        for closing in range(1, len(lines)):
+            if lines[closing].strip() in ('---', '...'):
+                line_index = closing + 1
+                break
+
+    for line in lines[line_index:]:
+        stripped = line.strip()
+        if fence is not None:
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            continue
+
+        if in_comment:
+            close = line.find('-->')
+            if close < 0:
+                continue
+            in_comment = False
+            line = line[close + 3:]
+            stripped = line.strip()
+
+        if not stripped:
+            continue
+
+        # 按行首字符分派，普通段落行不需要匹配块级正则
+        heading_level = 0
+        content = line
+        first = stripped[0]
+        if first in '`~':
+            fence_match = _FENCE.match(line)
+            if fence_match:
+                fence = fence_match.group(1)
+                continue
+        elif first == '#':
+            heading_match = _HEADING.match(line)
+            if heading_match:
+                heading_level = len(heading_match.group(1))
+                content = heading_match.group(2) or ''
+        elif first == '[':
+            if _LINK_DEFINITION.match(line):
+                continue
+        elif first in _BLOCK_MARKERS:
+            if first in '-*_=' and _THEMATIC_BREAK.match(line):
+                continue
+            content = line[_BLOCK_PREFIX.match(line).end():]
+        if '|' in content:
+            if _TABLE_DELIMITER.match(content):
+                continue
+            content = content.replace('|', ' ')
+
+        if _INLINE_START.search(content):
+            fragments = []
+            in_comment = _render_inline(content, fragments)
+            content = ''.join(fragments)
+        text = ' '.join(content.split())
+        if heading_level:
+            sections.append(Section(heading_level, text, offset))
+        if text:
+            parts.append(text)
+            offset += len(text) + 1
+
+    return ExtractedText(' '.join(parts), sections)
+
+
+def extract_text(markdown_content: str) -> str:
+    """提取Markdown纯文本
+
+    Args:
+        markdown_content: Markdown格式的文本
+
+    Returns:
+        空白字符被折叠为单个空格的纯文本
+    """
+    return extract(markdown_content).text
+
+
+def heading_anchors(sections: List[Section]) -> List[List[Any]]:
+    """生成章节的 [层级, 标题, 锚点] 列表
+
+    锚点与 MkDocs 默认的 toc 扩展一致：标题转为 slug，空 slug 和重复的 slug 追加序号。
+    没有安装 markdown 时锚点为 None。
+
+    Args:
+        sections: 章节边界列表
+
+    Returns:
+        与页面目录结构相同的 [层级, 标题, 锚点] 列表
+    """
+    used_ids = set()
+    headings = []
+    for section in sections:
+        anchor = unique(slugify(section.title, '-'), used_ids) if slugify is not None else None
+        headings.append([section.level, section.title, anchor])
+    return headings
+
+
+def extract_text_regex(markdown_content: str) -> str:
+    """旧版的正则替换链实现，仅用于基准测试对比
+
+    Args:
+        markdown_content: Markdown格式的文本
+
+    Returns:
+        提取后的纯文本
+    """
+    text = re.sub(r'```[\s\S]*?```', '', markdown_content)
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
+    text = re.sub(r'!\[(.*?)\]\(.*?\)', '', text)
+    text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^[\s]*[-*+]\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^[\s]*\d+\.\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[*_]{1,3}([^\s][^*_]*[^\s])[*_]{1,3}', r'\1', text)
+    text = re.sub(r'\|.*?\|\s*\n', '', text)
+    text = re.sub(r'^[-=*]{3,}\s*\n', '', text, flags=re.MULTILINE)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'<!--[\s\S]*?-->', '', text)
+    return text.strip()
+
+
+def benchmark(docs_dir: str, rounds: int = 20) -> Dict[str, float]:
+    """对比单次扫描提取器与旧版正则替换链的耗时
+
+    Args:
+        docs_dir: 文档目录
+        rounds: 重复次数
+
+    Returns:
+        包含文档数、字符数、两种实现的耗时和吞吐量的字典
+    """
+    documents = []
+    for root, _, files in os.walk(docs_dir):
+        for file in files:
+            if file.endswith('.md'):
+                with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                    documents.append(f.read())
+
+    def measure(extractor) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for content in documents:
+                extractor(content)
+        return time.perf_counter() - start
+
+    chars = sum(len(content) for content in documents) * rounds
+    regex_seconds = measure(extract_text_regex)
+    single_pass_seconds = measure(extract)
+    return {
+        "documents": len(documents),
+        "chars": chars,
+        "regex_seconds": regex_seconds,
+        "single_pass_seconds": single_pass_seconds,
+        "regex_chars_per_second": chars / regex_seconds if regex_seconds > 0 else 0.0,
+        "single_pass_chars_per_second": chars / single_pass_seconds if single_pass_seconds > 0 else 0.0
+    }
+
+
+def main():
+    """主函数 - 提取演示和基准测试"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Markdown纯文本提取工具')
+    parser.add_argument('file', nargs='?', help='要提取的Markdown文件')
+    parser.add_argument('--benchmark', metavar='DOCS_DIR', help='在文档目录上对比单次扫描提取器与旧版正则实现')
+    parser.add_argument('--rounds', type=int, default=20, help='基准测试重复次数，默认20')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.benchmark, args.rounds)
+        print(f"文档数: {result['documents']}，字符数: {result['chars']}")
+        print(f"旧版正则替换链: {result['regex_seconds']:.3f} 秒，{result['regex_chars_per_second']:.0f} 字符/秒")
+        print(f"单次扫描提取器: {result['single_pass_seconds']:.3f} 秒，{result['single_pass_chars_per_second']:.0f} 字符/秒")
+    elif args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            extracted = extract(f.read())
+        for section in extracted.sections:
+            print(f"{'#' * section.level} {section.title} @ {section.start}")
+        print(extracted.text)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
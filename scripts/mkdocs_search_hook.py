@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MkDocs 搜索索引钩子 - 关联需求FR-007
+
+在 mkdocs.yml 中通过 hooks 配置启用，在站点构建过程中完成搜索索引：
+1. on_page_content：从 MkDocs 已渲染的页面 HTML 中提取纯文本，从页面目录中取得标题和锚点
+2. on_post_build：用收集到的页面增量更新搜索索引，并导出静态搜索包到 site/search_bundle
+3. mkdocs serve 重新构建时复用进程内的索引，内容未变化的页面不重新分词
+
+    hooks:
+      - scripts/mkdocs_search_hook.py
+"""
+
+import os
+import sys
+import hashlib
+from html.parser import HTMLParser
+from typing import Any, List
+
+# MkDocs 以文件路径加载钩子，需要自行加入脚本目录才能导入同目录下的模块
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+
+from search_bundle import BUNDLE_DIR_NAME, export_search_bundle
+from search_index_optimizer import SearchIndexOptimizer
+
+# 不计入搜索文本的元素：脚本、样式和代码块（与 Markdown 提取器跳过围栏代码块一致）
+_SKIPPED_TAGS = frozenset({'script', 'style', 'pre', 'template'})
+# 不计入搜索文本的元素类名：标题旁的永久链接符号
+_SKIPPED_CLASSES = frozenset({'headerlink'})
+_VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                        'link', 'meta', 'source', 'track', 'wbr'})
+
+
+class _PageTextParser(HTMLParser):
+    """从渲染后的页面 HTML 中提取纯文本"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        # 正在跳过的元素嵌套深度
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            self.parts.append(' ')
+            return
+        if self._skip_depth:
+            self._skip_depth += 1
+            return
+        classes = dict(attrs).get('class') or ''
+        if tag in _SKIPPED_TAGS or _SKIPPED_CLASSES.intersection(classes.split()):
+            self._skip_depth = 1
+            return
+        # 元素边界按空白处理，避免相邻块级元素的文字粘连
+        self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_page_text(html: str) -> str:
+    """提取页面 HTML 的纯文本
+
+    Args:
+        html: MkDocs 渲染的页面内容（不含主题模板）
+
+    Returns:
+        空白字符被折叠为单个空格的纯文本
+    """
+    parser = _PageTextParser()
+    parser.feed(html)
+    parser.close()
+    return ' '.join(''.join(parser.parts).split())
+
+
+def _flatten_toc(items, headings: List[List[Any]]):
+    """把页面目录展开为 [层级, 标题, 锚点] 列表"""
+    for item in items:
+        headings.append([item.level, item.title, item.id])
+        _flatten_toc(item.children, headings)
+
+
+class _SearchHookState:
+    """跨越多次构建（mkdocs serve）保留的钩子状态"""
+
+    def __init__(self):
+        self.optimizer = None
+        self.docs_dir = None
+        self.page_order = []
+        self.pages = {}
+
+
+_state = _SearchHookState()
+
+
+def on_config(config, **kwargs):
+    """每次构建开始时确认优化器与文档目录对应，并清空上次收集的页面"""
+    docs_dir = os.path.abspath(config['docs_dir'])
+    if _state.optimizer is None or _state.docs_dir != docs_dir:
+        _state.optimizer = SearchIndexOptimizer(docs_dir=docs_dir)
+        _state.docs_dir = docs_dir
+    _state.pages = {}
+    return config
+
+
+def on_files(files, config, **kwargs):
+    """记录站点中全部文档页面的顺序"""
+    _state.page_order = [file.src_path for file in files.documentation_pages()]
+    return files
+
+
+def on_page_content(html, page, config, files, **kwargs):
+    """收集已渲染页面的纯文本、标题和目录"""
+    file = page.file
+    try:
+        modified_time = os.path.getmtime(file.abs_src_path)
+    except (OSError, TypeError):
+        modified_time = 0.0
+    headings = []
+    _flatten_toc(page.toc, headings)
+    _state.pages[file.src_path] = {
+        'title': page.title or '',
+        'text': extract_page_text(html),
+        'headings': headings,
+        'content_hash': hashlib.sha256((page.markdown or '').encode('utf-8')).hexdigest(),
+        'modified_time': modified_time
+    }
+    return html
+
+
+def on_post_build(config, **kwargs):
+    """用本次构建渲染的页面更新搜索索引并导出静态搜索包"""
+    if _state.optimizer is None:
+        return
+    if not _state.optimizer.index_pages(_state.pages, _state.page_order):
+        return
+    output_dir = os.path.join(config['site_dir'], BUNDLE_DIR_NAME)
+    manifest = export_search_bundle(_state.optimizer, output_dir)
+    print(f"已导出静态搜索包: {output_dir}（{len(manifest['shards'])} 个分片）")
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+静态搜索包导出模块 - 关联需求FR-007
+
+此模块把 SearchIndexOptimizer 构建的索引导出为浏览器端使用的静态搜索包，包括：
+1. 按词语排序切分的倒排分片（前缀区间分区，查询只下载需要的分片）
+2. 文件名带内容哈希的分片，可以长期缓存
+3. 预压缩的 .gz 文件（安装了 brotli 时同时生成 .br）
+4. 浏览器端查询脚本（按需加载分片、词表最长匹配切分中文、BM25 排序）
+5. 搜索包体积和首次查询延迟报告
+
+搜索包布局：
+
+    search_bundle/
+        manifest.json           分片区间表、文档数、排序参数、分词方式
+        docs-<hash>.json        文档 URL、标题、摘要和长度
+        shards/NNNN-<hash>.json 一段连续词语区间的 {词语: [idf, [doc_id, tf, ...]]}
+        search_bundle.js        浏览器端查询脚本
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import shutil
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+from search_index_optimizer import _STOP_WORDS, SearchIndexOptimizer
+from search_ranking import DEFAULT_RANKING_SETTINGS
+from search_terms import is_canonical_term
+
+BUNDLE_VERSION = 1
+# 搜索包在站点目录中的子目录名（MkDocs 自带的 search 插件占用 site/search）
+BUNDLE_DIR_NAME = 'search_bundle'
+# 每个分片未压缩JSON的目标字节数
+DEFAULT_SHARD_BYTES = 16 * 1024
+# 摘要保留的字符数
+SUMMARY_LENGTH = 120
+CLIENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'search_bundle.js')
+
+# 首次查询延迟估算使用的网络参数：带宽（字节/秒）和往返时间（秒），接近移动网络的慢速情况
+ESTIMATE_BANDWIDTH = 1.6 * 1000 * 1000 / 8
+ESTIMATE_RTT = 0.15
+
+_CJK_START = '\u4e00'
+_CJK_END = '\u9fa5'
+
+
+def _sort_key(term: str) -> bytes:
+    """按 UTF-16 码元排序，与浏览器中字符串比较的顺序一致"""
+    return term.encode('utf-16-be')
+
+
+def _is_cjk(char: str) -> bool:
+    return _CJK_START <= char <= _CJK_END
+
+
+def page_url(doc_path: str) -> str:
+    """文档路径对应的 MkDocs 页面地址（use_directory_urls 开启时）
+
+    Args:
+        doc_path: 相对于 docs 目录的文档路径
+
+    Returns:
+        相对于站点根目录的页面地址
+    """
+    path = doc_path.replace(os.sep, '/')
+    if path.endswith('.md'):
+        path = path[:-3]
+    if path == 'index' or path.endswith('/index'):
+        return path[:-5]
+    return path + '/'
+
+
+def _dump(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_compressed(path: str, data: bytes) -> Dict[str, int]:
+    """写入文件及其预压缩版本，返回各版本的字节数"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    sizes = {'raw': len(data)}
+    # mtime=0 使相同内容的压缩结果逐字节相同
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+    sizes['gzip'] = len(compressed)
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        with open(path + '.br', 'wb') as f:
+            f.write(compressed)
+        sizes['brotli'] = len(compressed)
+    return sizes
+
+
+def _hashed_name(prefix: str, data: bytes) -> str:
+    return f"{prefix}-{hashlib.sha256(data).hexdigest()[:10]}.json"
+
+
+def export_search_bundle(optimizer, output_dir: str,
+                         shard_bytes: int = DEFAULT_SHARD_BYTES) -> Dict[str, Any]:
+    """导出静态搜索包
+
+    词语按浏览器的字符串顺序排序后依次装入分片，分片达到目标大小时开始下一个分片，
+    清单中记录每个分片的第一个词语。同一前缀的词语位于连续的分片区间，浏览器端对
+    清单二分查找即可确定查询需要下载的分片。
+
+    Args:
+        optimizer: 已构建索引的 SearchIndexOptimizer
+        output_dir: 输出目录（通常为 site/search_bundle），原有内容会被替换
+        shard_bytes: 每个分片未压缩JSON的目标字节数
+
+    Returns:
+        清单内容，另含各文件的字节数（files 字段，不写入清单文件）
+    """
+    snapshot = optimizer._snapshot
+    settings = optimizer._metadata["optimization_settings"]
+    ranking = dict(DEFAULT_RANKING_SETTINGS, **optimizer._metadata.get("ranking", {}))
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(os.path.join(output_dir, 'shards'))
+    files = {}
+
+    docs = []
+    for doc_id, doc_path in enumerate(snapshot.doc_ids):
+        doc_data = snapshot.documents[doc_path]
+        summary = doc_data.get('content', '')[:SUMMARY_LENGTH]
+        docs.append([page_url(doc_path), doc_data['title'], summary, snapshot.doc_lengths[doc_id]])
+    docs_data = _dump(docs)
+    docs_name = _hashed_name('docs', docs_data)
+    files[docs_name] = _write_compressed(os.path.join(output_dir, docs_name), docs_data)
+
+    shards = []
+    current = {}
+    current_bytes = 0
+
+    def flush():
+        data = _dump(current)
+        name = 'shards/' + _hashed_name(f"{len(shards):04d}", data)
+        files[name] = _write_compressed(os.path.join(output_dir, name), data)
+        shards.append([next(iter(current)), name])
+
+    for term in sorted(snapshot.postings.keys(), key=_sort_key):
+        # 浏览器端查询脚本不做词干提取和同义词替换，不导出规范词语
+        if is_canonical_term(term):
+            continue
+        postings = list(snapshot.postings[term])
+        entry = [round(snapshot.idf[term], 4), postings]
+        current[term] = entry
+        current_bytes += len(_dump(term)) + len(_dump(entry)) + 2
+        if current_bytes >= shard_bytes:
+            flush()
+            current = {}
+            current_bytes = 0
+    if current:
+        flush()
+
+    mode = optimizer._segmentation_mode()
+    manifest = {
+        'version': BUNDLE_VERSION,
+        'generation': snapshot.generation,
+        'doc_count': len(docs),
+        'avg_doc_length': snapshot.avg_doc_length,
+        'k1': ranking['k1'],
+        'b': ranking['b'],
+        'segmentation': mode,
+        'ngram_size': settings.get('ngram_size', 2) if mode == 'ngram' else None,
+        'min_token_length': settings['min_token_length'],
+        'stop_words': sorted(_STOP_WORDS) if settings['stop_words_removal'] else [],
+        'docs': docs_name,
+        'shards': shards
+    }
+    files['manifest.json'] = _write_compressed(os.path.join(output_dir, 'manifest.json'), _dump(manifest))
+    if os.path.exists(CLIENT_SCRIPT):
+        with open(CLIENT_SCRIPT, 'rb') as f:
+            files['search_bundle.js'] = _write_compressed(os.path.join(output_dir, 'search_bundle.js'), f.read())
+
+    return dict(manifest, files=files)
+
+
+class _ShardTable:
+    """与浏览器端脚本一致的分片定位逻辑"""
+
+    def __init__(self, manifest: Dict[str, Any]):
+        self.first_terms = [_sort_key(first) for first, _ in manifest['shards']]
+        self.names = [name for _, name in manifest['shards']]
+
+    def for_term(self, term: str) -> List[str]:
+        index = bisect_right(self.first_terms, _sort_key(term)) - 1
+        return [self.names[index]] if index >= 0 else []
+
+    def for_prefix(self, prefix: str) -> List[str]:
+        start = max(bisect_right(self.first_terms, _sort_key(prefix)) - 1, 0)
+        end = bisect_right(self.first_terms, _sort_key(prefix + '\uffff'))
+        return self.names[start:end]
+
+
+def query_shards(manifest: Dict[str, Any], query: str) -> List[str]:
+    """查询需要下载的分片
+
+    英文、数字词语只需要包含该词的分片；中文片段在浏览器端用已下载分片中的词表做
+    最长匹配切分，因此需要片段中每个字开头的全部词语所在的分片（n-gram 模式下
+    直接生成 n-gram）。
+
+    Args:
+        manifest: 搜索包清单
+        query: 查询文本
+
+    Returns:
+        分片文件名列表
+    """
+    table = _ShardTable(manifest)
+    stop_words = set(manifest['stop_words'])
+    needed = []
+    token = ''
+    run = ''
+
+    def flush_token():
+        if len(token) >= manifest['min_token_length'] and token.lower() not in stop_words:
+            needed.extend(table.for_term(token))
+
+    def flush_run():
+        if manifest['segmentation'] == 'ngram':
+            size = manifest['ngram_size']
+            grams = [run[i:i + size] for i in range(max(len(run) - size + 1, 1))]
+            for gram in grams:
+                needed.extend(table.for_term(gram))
+        elif manifest['segmentation']:
+            for char in set(run):
+                needed.extend(table.for_prefix(char))
+
+    for char in query + ' ':
+        if _is_cjk(char):
+            if token:
+                flush_token()
+                token = ''
+            run += char
+            continue
+        if run:
+            flush_run()
+            run = ''
+        if char.isascii() and char.isalnum():
+            token += char
+        elif token:
+            flush_token()
+            token = ''
+    return sorted(set(needed))
+
+
+def bundle_report(bundle_dir: str, queries: List[str],
+                  bandwidth: float = ESTIMATE_BANDWIDTH, rtt: float = ESTIMATE_RTT) -> Dict[str, Any]:
+    """统计搜索包体积并估算首次查询延迟
+
+    浏览器端脚本在页面加载时预先下载清单和文档表，首次查询只需并行下载涉及的分片
+    （一次往返）：延迟 = rtt + 分片压缩后字节数 / 带宽 + 本地解压和解析耗时。
+    单文件索引同样按一次往返估算，但需要下载全部索引。
+
+    Args:
+        bundle_dir: 搜索包目录
+        queries: 用于估算的查询
+        bandwidth: 估算使用的带宽（字节/秒）
+        rtt: 估算使用的往返时间（秒）
+
+    Returns:
+        体积统计和每个查询的首次查询估算
+    """
+    with open(os.path.join(bundle_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def size(name: str, kind: str) -> int:
+        path = os.path.join(bundle_dir, name) + {'raw': '', 'gzip': '.gz', 'brotli': '.br'}[kind]
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    shard_names = [name for _, name in manifest['shards']]
+    all_files = ['manifest.json', manifest['docs']] + shard_names
+    totals = {kind: sum(size(name, kind) for name in all_files) for kind in ('raw', 'gzip', 'brotli')}
+
+    # 等价的单文件索引（全部分片合并），对比浏览器一次下载全部索引的体积
+    merged = {}
+    for name in shard_names:
+        with open(os.path.join(bundle_dir, name), 'r', encoding='utf-8') as f:
+            merged.update(json.load(f))
+    with open(os.path.join(bundle_dir, manifest['docs']), 'r', encoding='utf-8') as f:
+        monolithic = _dump({'docs': json.load(f), 'terms': merged})
+    monolithic_gzip = len(gzip.compress(monolithic, compresslevel=9, mtime=0))
+    start = time.perf_counter()
+    json.loads(monolithic)
+    monolithic_decode = time.perf_counter() - start
+
+    def decode(names: List[str]) -> float:
+        start = time.perf_counter()
+        for name in names:
+            with open(os.path.join(bundle_dir, name) + '.gz', 'rb') as f:
+                json.loads(gzip.decompress(f.read()))
+        return time.perf_counter() - start
+
+    first_queries = []
+    for query in queries:
+        names = query_shards(manifest, query)
+        fetched = sum(size(name, 'gzip') for name in names)
+        decode_seconds = decode(names)
+        first_queries.append({
+            'query': query,
+            'files': len(names),
+            'gzip_bytes': fetched,
+            'decode_ms': decode_seconds * 1000,
+            'estimated_ms': ((rtt if names else 0.0) + fetched / bandwidth + decode_seconds) * 1000
+        })
+
+    return {
+        'shards': len(shard_names),
+        'largest_shard_gzip': max((size(name, 'gzip') for name in shard_names), default=0),
+        'totals': totals,
+        'monolithic_raw': len(monolithic),
+        'monolithic_gzip': monolithic_gzip,
+        'monolithic_estimated_ms': (rtt + monolithic_gzip / bandwidth + monolithic_decode) * 1000,
+        'prefetch_gzip': size('manifest.json', 'gzip') + size(manifest['docs'], 'gzip'),
+        'first_queries': first_queries
+    }
+
+
+def print_bundle_report(report: Dict[str, Any]):
+    """打印搜索包报告"""
+    totals = report['totals']
+    brotli_text = f"，brotli {totals['brotli'] / 1024:.1f} KB" if totals['brotli'] else ''
+    print(f"搜索包: {report['shards']} 个分片，合计 {totals['raw'] / 1024:.1f} KB，"
+          f"gzip {totals['gzip'] / 1024:.1f} KB{brotli_text}，最大分片 gzip {report['largest_shard_gzip'] / 1024:.1f} KB")
+    print(f"等价的单文件索引: {report['monolithic_raw'] / 1024:.1f} KB，gzip {report['monolithic_gzip'] / 1024:.1f} KB，"
+          f"首次查询估算 {report['monolithic_estimated_ms']:.0f} ms")
+    print(f"页面加载时预先下载清单和文档表: gzip {report['prefetch_gzip'] / 1024:.1f} KB")
+    for item in report['first_queries']:
+        print(f"  首次查询 '{item['query']}': 下载 {item['files']} 个分片 {item['gzip_bytes'] / 1024:.1f} KB，"
+              f"解析 {item['decode_ms']:.1f} ms，估算 {item['estimated_ms']:.0f} ms")
+
+
+def main():
+    """主函数 - 构建索引并导出静态搜索包"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='静态搜索包导出工具')
+    parser.add_argument('--output', help='输出目录，默认为 site/search_bundle')
+    parser.add_argument('--shard-kb', type=int, default=DEFAULT_SHARD_BYTES // 1024,
+                        help='每个分片未压缩的目标大小（KB），默认16')
+    parser.add_argument('--report', nargs='*', metavar='QUERY', default=None,
+                        help='导出后打印体积和首次查询延迟报告，可指定查询')
+    args = parser.parse_args()
+
+    optimizer = SearchIndexOptimizer()
+    optimizer.build_index()
+    output_dir = args.output or os.path.join(optimizer.project_root, 'site', BUNDLE_DIR_NAME)
+    manifest = export_search_bundle(optimizer, output_dir, args.shard_kb * 1024)
+    print(f"已导出静态搜索包: {output_dir}（{len(manifest['shards'])} 个分片）")
+    if args.report is not None:
+        print_bundle_report(bundle_report(output_dir, args.report or DEFAULT_REPORT_QUERIES))
+
+
+# 报告默认使用的查询
+DEFAULT_REPORT_QUERIES = ["安装", "规范驱动开发", "API", "配置", "Supabase"]
+
+
+if __name__ == '__main__':
+    main()
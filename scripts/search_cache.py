@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索缓存模块 - 关联需求FR-007
+
+此模块提供搜索路径上使用的有界缓存，包括：
+1. 按最近使用顺序淘汰的LRU缓存
+2. 可选的条目存活时间（TTL）
+3. 命中、未命中、淘汰和过期次数统计
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """有界LRU缓存
+
+    条目数超过上限时淘汰最久未使用的条目；设置了存活时间时，超过存活时间的条目
+    在下次访问时视为未命中并被移除。所有操作在内部锁的保护下进行，可以在多个线程之间共享。
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """初始化缓存
+
+        Args:
+            maxsize: 最大条目数，0表示不缓存
+            ttl: 条目存活秒数，None表示不过期
+            clock: 计时函数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # 键 -> (值, 过期时间)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存条目
+
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+
+        Returns:
+            缓存值或默认值
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """写入缓存条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """读取缓存条目，未命中时计算并写入
+
+        计算在锁外进行，并发未命中时可能重复计算，但结果相同。
+
+        Args:
+            key: 缓存键
+            compute: 计算缓存值的函数
+
+        Returns:
+            缓存值
+        """
+        sentinel = _MISSING
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """清空缓存条目（保留统计计数）"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            包含条目数、容量、存活时间、命中、未命中、淘汰和过期次数及命中率的字典
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+_MISSING = object()
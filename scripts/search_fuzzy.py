@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模糊匹配模块 - 关联需求FR-007
+
+此模块提供英文数字词语的拼写容错匹配，包括：
+1. 构建索引时预先生成的对称删除字典（SymSpell）：每个词语删除至多 N 个字符得到的
+   变体映射回原词语，查询时只需生成查询词的删除变体并查表
+2. 限制编辑距离的 Damerau-Levenshtein（相邻字符交换计为一次编辑）距离计算
+3. 按查询词长度确定允许的编辑距离
+
+查询词与索引词语的编辑距离不超过 d 时，二者各删除至多 d 个字符后必有相同的变体，
+因此查表得到的候选再用真实编辑距离校验即可，查询复杂度与词典大小无关。
+删除变体只由词语的前 PREFIX_LENGTH 个字符生成，限制长词语产生的变体数量。
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+# 构建删除字典时的最大编辑距离，查询时使用的编辑距离不能超过它
+MAX_EDIT_DISTANCE = 2
+# 生成删除变体时只取词语的前若干个字符
+PREFIX_LENGTH = 7
+# 按查询词长度确定编辑距离：短于第一个长度时不做模糊匹配，短于第二个长度时允许一次编辑
+AUTO_DISTANCE_LENGTHS = (4, 7)
+
+_FUZZY_TERM_PATTERN = re.compile(r'[A-Za-z0-9]*[A-Za-z][A-Za-z0-9]*')
+
+
+def is_fuzzy_term(term: str) -> bool:
+    """是否为参与模糊匹配的词语（只含英文字母和数字，且至少有一个字母）"""
+    return _FUZZY_TERM_PATTERN.fullmatch(term) is not None
+
+
+def auto_distance(term: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """按词语长度确定允许的编辑距离，短词只允许较少的编辑，避免匹配到无关词语
+
+    Args:
+        term: 查询词
+        max_distance: 编辑距离上限
+
+    Returns:
+        允许的编辑距离，0 表示不做模糊匹配
+    """
+    short, medium = AUTO_DISTANCE_LENGTHS
+    if len(term) < short:
+        return 0
+    if len(term) < medium:
+        return min(1, max_distance)
+    return min(2, max_distance)
+
+
+def edit_distance(left: str, right: str, max_distance: int) -> int:
+    """计算两个词语的编辑距离（插入、删除、替换和相邻字符交换各计一次）
+
+    Args:
+        left: 词语
+        right: 词语
+        max_distance: 距离上限，超过时提前结束
+
+    Returns:
+        编辑距离；超过上限时返回 max_distance + 1
+    """
+    if abs(len(left) - len(right)) > max_distance:
+        return max_distance + 1
+    previous_row = None
+    row = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        current = [i] + [0] * len(right)
+        row_min = i
+        for j in range(1, len(right) + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            value = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if previous_row is not None and j > 1 and left[i - 1] == right[j - 2] and left[i - 2] == right[j - 1]:
+                value = min(value, previous_row[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_row, row = row, current
+    return row[-1] if row[-1] <= max_distance else max_distance + 1
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """词语前 PREFIX_LENGTH 个字符删除至多 max_distance 个字符得到的全部变体（含自身）"""
+    word = word[:PREFIX_LENGTH]
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier if len(variant) > 1
+                    for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """对称删除字典
+
+    词语按小写形式生成删除变体，查找时不区分大小写，返回索引中的原始词语。
+    """
+
+    def __init__(self, terms: List[str], deletes: Dict[str, List[int]], max_distance: int = MAX_EDIT_DISTANCE):
+        """初始化删除字典
+
+        Args:
+            terms: 参与模糊匹配的索引词语
+            deletes: 删除变体到 terms 中序号列表的映射
+            max_distance: 构建时使用的最大编辑距离
+        """
+        self.terms = terms
+        self.deletes = deletes
+        self.max_distance = max_distance
+
+    @classmethod
+    def build(cls, terms: Iterable[str], max_distance: int = MAX_EDIT_DISTANCE) -> 'DeletionIndex':
+        """由索引词语构建删除字典，不参与模糊匹配的词语被忽略
+
+        Args:
+            terms: 索引词语
+            max_distance: 最大编辑距离
+
+        Returns:
+            删除字典
+        """
+        fuzzy_terms = sorted(term for term in terms if is_fuzzy_term(term))
+        deletes = {}
+        for term_index, term in enumerate(fuzzy_terms):
+            for variant in _deletes(term.lower(), max_distance):
+                deletes.setdefault(variant, []).append(term_index)
+        return cls(fuzzy_terms, deletes, max_distance)
+
+    def lookup(self, term: str, max_distance: int) -> Dict[str, int]:
+        """查找与查询词编辑距离不超过 max_distance 的索引词语
+
+        Args:
+            term: 查询词
+            max_distance: 编辑距离，不超过构建时的最大编辑距离
+
+        Returns:
+            索引词语到编辑距离的映射（只有大小写不同的词语距离为0）
+        """
+        max_distance = min(max_distance, self.max_distance)
+        query = term.lower()
+        checked = set()
+        matches = {}
+        for variant in _deletes(query, max_distance):
+            for term_index in self.deletes.get(variant, ()):
+                if term_index in checked:
+                    continue
+                checked.add(term_index)
+                candidate = self.terms[term_index]
+                distance = edit_distance(query, candidate.lower(), max_distance)
+                if distance <= max_distance:
+                    matches[candidate] = distance
+        return matches
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典"""
+        return {'version': 1, 'max_distance': self.max_distance, 'prefix_length': PREFIX_LENGTH,
+                'terms': self.terms, 'deletes': self.deletes}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DeletionIndex':
+        """从 to_dict 的结果恢复删除字典；前缀长度与当前版本不同时按词语重新构建"""
+        if data.get('prefix_length') != PREFIX_LENGTH:
+            return cls.build(data['terms'], data['max_distance'])
+        return cls(data['terms'], data['deletes'], data['max_distance'])
+
+
+def closest_terms(matches: Dict[str, int], doc_freqs: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+    """只保留编辑距离最小的候选，按文档频率从高到低取前 limit 个
+
+    Args:
+        matches: 候选词语到编辑距离的映射
+        doc_freqs: 候选词语到文档频率的映射
+        limit: 返回数量上限
+
+    Returns:
+        (词语, 编辑距离) 列表
+    """
+    if not matches:
+        return []
+    best = min(matches.values())
+    closest = [term for term, distance in matches.items() if distance == best]
+    closest.sort(key=lambda term: (-doc_freqs.get(term, 0), term))
+    return [(term, best) for term in closest[:limit]]
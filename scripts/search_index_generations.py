@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+索引代数目录模块 - 关联需求FR-007
+
+此模块提供搜索索引的崩溃安全持久化功能，包括：
+1. 按代数编号的索引目录（每一代索引的全部文件位于同一目录）
+2. 用 os.mkdir 原子地占用代数目录名，多个写入方不会分到同一代
+3. 先写入临时目录、fsync 后原子重命名的发布流程
+4. 原子替换的清单文件，指向当前生效的一代索引
+5. 旧代数目录和中断残留的临时目录的清理
+
+目录布局：
+
+    index_dir/
+        manifest.json               {"generation": N, "directory": "generations/gen-0000000N", ...}
+        generations/
+            gen-0000000N/           当前一代：segments.json、seg-*（分段文件）、search_suggestions.json、index_metadata.json
+            gen-0000000M/           保留的上一代，其他进程可能仍在 mmap 读取
+            gen-0000000L/           已占用但尚未发布的一代（空目录），发布时被临时目录替换
+            .staging-0000000K-PID/  正在写入的一代，发布前对读取方不可见
+
+读取方只通过清单定位索引目录。清单和代数目录都在完整写入并 fsync 之后才通过
+rename 发布，任何时刻崩溃都只会留下旧的一代或完整的新一代，不会出现截断的文件，
+也不会出现索引与元数据分属不同代的情况。
+"""
+
+import os
+import json
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+MANIFEST_NAME = 'manifest.json'
+GENERATIONS_DIR = 'generations'
+# 保留的代数（含当前一代），上一代留给仍在读取旧文件的进程
+KEEP_GENERATIONS = 2
+# 超过此时长的临时目录视为中断写入的残留
+STALE_STAGING_SECONDS = 3600
+
+_GENERATION_PREFIX = 'gen-'
+_STAGING_PREFIX = '.staging-'
+
+
+def fsync_directory(path: str):
+    """将目录项的变化（创建、重命名）落盘；不支持打开目录的平台上忽略"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_file(path: str):
+    """将文件内容落盘"""
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def write_file_atomic(path: str, data: bytes):
+    """原子地写入文件：写入同目录下的临时文件，fsync 后重命名覆盖目标
+
+    Args:
+        path: 目标文件路径
+        data: 文件内容
+    """
+    temp_path = f"{path}.tmp-{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(os.path.dirname(path) or '.')
+
+
+def generation_directory_name(generation: int) -> str:
+    """代数对应的目录名"""
+    return f"{_GENERATION_PREFIX}{generation:08d}"
+
+
+def read_manifest(index_dir: str) -> Optional[Dict[str, Any]]:
+    """读取清单
+
+    Args:
+        index_dir: 索引根目录
+
+    Returns:
+        清单内容；清单不存在、损坏或指向的目录不存在时返回None
+    """
+    manifest_path = os.path.join(index_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isdir(os.path.join(index_dir, manifest.get('directory', ''))):
+        return None
+    return manifest
+
+
+def current_directory(index_dir: str) -> str:
+    """当前生效的索引目录；没有清单时（旧的目录布局）为索引根目录本身"""
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        return index_dir
+    return os.path.join(index_dir, manifest['directory'])
+
+
+def reserve_generation(index_dir: str, generation: int) -> int:
+    """占用不小于 generation 的第一个空闲代数
+
+    以 os.mkdir 创建空的代数目录作为占用标记，目录已存在（已发布或被其他写入方占用）时
+    尝试下一个代数。mkdir 是原子的，并发的写入方不会得到相同的代数。
+
+    Args:
+        index_dir: 索引根目录
+        generation: 期望的最小代数
+
+    Returns:
+        占用的代数
+    """
+    generations_dir = os.path.join(index_dir, GENERATIONS_DIR)
+    os.makedirs(generations_dir, exist_ok=True)
+    while True:
+        try:
+            os.mkdir(os.path.join(generations_dir, generation_directory_name(generation)))
+            return generation
+        except FileExistsError:
+            generation += 1
+
+
+def release_generation(index_dir: str, generation: int):
+    """放弃占用的代数；只删除空的占用目录，已发布的目录不受影响"""
+    try:
+        os.rmdir(os.path.join(index_dir, GENERATIONS_DIR, generation_directory_name(generation)))
+    except OSError:
+        pass
+
+
+def create_staging_directory(index_dir: str, generation: int) -> str:
+    """为新一代索引创建临时目录
+
+    Args:
+        index_dir: 索引根目录
+        generation: 新一代的代数
+
+    Returns:
+        临时目录路径
+    """
+    generations_dir = os.path.join(index_dir, GENERATIONS_DIR)
+    os.makedirs(generations_dir, exist_ok=True)
+    staging_dir = os.path.join(generations_dir, f"{_STAGING_PREFIX}{generation:08d}-{os.getpid()}")
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+    return staging_dir
+
+
+def publish_generation(index_dir: str, staging_dir: str, generation: int) -> str:
+    """发布已写完的一代索引
+
+    依次 fsync 临时目录中的文件和目录本身，把临时目录重命名为代数目录，最后原子地
+    替换清单。清单替换之前崩溃时，读取方仍然使用上一代。
+    代数目录只能是 reserve_generation 占用的空目录或不存在；已有内容的目录可能已被
+    清单引用，重命名失败并抛出 OSError，不会删除它。
+    清单只向更新的代数前进：写清单之前重新读取清单，其他写入方已发布了更新的一代时
+    不替换清单（否则读取方会退回旧的一代），删除本次的代数目录并返回 None。
+
+    Args:
+        index_dir: 索引根目录
+        staging_dir: 已写入全部文件的临时目录
+        generation: 代数，应已由 reserve_generation 占用
+
+    Returns:
+        发布后的代数目录路径；已被更新的一代取代时返回 None
+    """
+    for name in os.listdir(staging_dir):
+        fsync_file(os.path.join(staging_dir, name))
+    fsync_directory(staging_dir)
+
+    generations_dir = os.path.join(index_dir, GENERATIONS_DIR)
+    directory_name = generation_directory_name(generation)
+    final_dir = os.path.join(generations_dir, directory_name)
+    try:
+        # POSIX 上重命名可以原子地替换空的占用目录，目标目录非空时失败
+        os.replace(staging_dir, final_dir)
+    except OSError:
+        # 不允许替换目录的平台（Windows）：先删除占用目录，rmdir 不会删除非空目录
+        if not os.path.isdir(final_dir) or os.listdir(final_dir):
+            raise
+        os.rmdir(final_dir)
+        os.rename(staging_dir, final_dir)
+    fsync_directory(generations_dir)
+
+    current = read_manifest(index_dir)
+    if current is not None and current['generation'] >= generation:
+        # 清单从未指向这个目录，可以直接删除
+        shutil.rmtree(final_dir, ignore_errors=True)
+        return None
+
+    manifest = {
+        'version': 1,
+        'generation': generation,
+        'directory': f"{GENERATIONS_DIR}/{directory_name}",
+        'files': sorted(os.listdir(final_dir)),
+        'published_at': datetime.now().isoformat()
+    }
+    write_file_atomic(os.path.join(index_dir, MANIFEST_NAME),
+                      json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    return final_dir
+
+
+def discard_staging(staging_dir: str):
+    """放弃写入失败的临时目录"""
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def collect_garbage(index_dir: str, keep: int = KEEP_GENERATIONS,
+                    legacy_files: Optional[List[str]] = None) -> List[str]:
+    """清理旧的代数目录、残留的临时目录和旧目录布局中的索引文件
+
+    当前一代永远保留，空的代数目录（尚未发布的占用）不计入保留数量。删除失败（例如
+    Windows 上文件仍被其他进程映射）时跳过，下次清理时重试。
+
+    Args:
+        index_dir: 索引根目录
+        keep: 保留的代数（含当前一代）
+        legacy_files: 旧目录布局下位于索引根目录中的文件名
+
+    Returns:
+        已删除的路径列表
+    """
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        return []
+    current = os.path.basename(manifest['directory'])
+    generations_dir = os.path.join(index_dir, GENERATIONS_DIR)
+
+    removed = []
+    generations = []
+    now = time.time()
+    for name in os.listdir(generations_dir):
+        path = os.path.join(generations_dir, name)
+        try:
+            reserved = name.startswith(_GENERATION_PREFIX) and name != current and not os.listdir(path)
+        except OSError:
+            continue
+        if name.startswith(_GENERATION_PREFIX) and not reserved:
+            if name <= current:
+                generations.append(name)
+        elif reserved or name.startswith(_STAGING_PREFIX):
+            # 空的代数目录是其他写入方占用、尚未发布的一代，与临时目录一样只清理中断残留
+            try:
+                stale = now - os.path.getmtime(path) > STALE_STAGING_SECONDS
+            except OSError:
+                continue
+            if not stale:
+                continue
+            if reserved:
+                # 只删除仍为空的目录，期间被发布替换的代数目录不受影响
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    continue
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+
+    # 代数目录名定长编号，字典序即代数顺序
+    for name in sorted(generations, reverse=True)[max(keep, 1):]:
+        path = os.path.join(generations_dir, name)
+        try:
+            shutil.rmtree(path)
+            removed.append(path)
+        except OSError:
+            pass
+
+    for name in legacy_files or []:
+        path = os.path.join(index_dir, name)
+        if os.path.isfile(path):
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                pass
+    return removed
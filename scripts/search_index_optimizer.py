@@ -9,7 +9,8 @@
 2. 索引构建和优化
 3. 搜索结果排序算法
 4. 搜索建议和自动完成
-5. 索引定期更新机制
+5. 索引定期更新和文档目录监视更新机制
+6. 基于不可变分段的增量提交和后台合并
 """
 
 import os
@@ -17,9 +18,142 @@ import json
 import re
 import time
 import hashlib
-from typing import Dict, List, Set, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Set, Optional, Tuple
 from datetime import datetime
 
+from chinese_segmenter import ChineseSegmenter, get_segmenter
+from markdown_text import extract, extract_text, heading_anchors
+from search_cache import LRUCache
+from search_fuzzy import auto_distance, closest_terms, is_fuzzy_term
+from search_index_generations import (collect_garbage, create_staging_directory, current_directory,
+                                      discard_staging, publish_generation, read_manifest,
+                                      release_generation, reserve_generation)
+from search_index_segments import (FUZZY_SUFFIX, INDEX_SUFFIX, TEXT_SUFFIX, IndexSegment, MemoryIndex,
+                                   SegmentedIndex, build_segment, link_segment, open_segment, open_segments, plan_merges,
+                                   segment_documents, segment_name, write_segment, write_segment_list)
+from search_index_storage import BinaryIndexReader, TextStoreReader, lean_document
+from search_index_watcher import create_watcher, watch_changes
+from search_suggestions import PrefixIndex
+from search_terms import DEFAULT_SYNONYMS, TermNormalizer, get_normalizer, is_canonical_term
+from search_ranking import (BODY_FIELD, DEFAULT_RANKING_SETTINGS, FIELD_SEPARATOR, FieldIndex, RankingContext,
+                            bm25_idf, split_field, create_ranker)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 分词使用的正则表达式只编译一次
+_CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fa5]+')
+_NON_CHINESE_TOKEN_PATTERN = re.compile(r'[a-zA-Z0-9]+')
+_TITLE_PATTERN = re.compile(r'^#\s+(.*?)$', re.MULTILINE)
+# 查询中用英文双引号括起的精确短语
+_PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+# 查询中限定检索字段的部分，如 title:规范 或 heading:"安装 配置"
+_FIELD_QUERY_PATTERN = re.compile(r'(?<![A-Za-z0-9])(title|heading|body):("[^"]*"|\S+)')
+
+# 简单的停用词列表（中英文）
+_STOP_WORDS = frozenset({
+    '的', '了', '和', '是', '在', '有', '我', '他', '她', '它', '你',
+    '这', '那', '个', '我们', '你们', '他们', '她们', '它们',
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'for',
+    'with', 'on', 'in', 'at', 'to', 'of', 'by', 'from', 'as', 'is',
+    'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might',
+    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
+})
+
+# 旧目录布局下直接位于索引目录中的文件，发布第一代索引目录后删除
+_LEGACY_INDEX_FILES = ['search_index.json', 'search_postings.json', 'search_index.bin',
+                       'search_suggestions.json', 'index_metadata.json']
+
+# 索引结构版本，计入配置签名，版本变化时下次构建完整重建。
+# 版本2起所有分词方式都在倒排表中记录词语位置和字节偏移，完整文本保存在文本存储中；
+# 版本3起标题和小标题作为独立字段建立倒排表；版本4起索引由不可变分段组成；
+# 版本5起启用词干提取或同义词时，在原词语的位置上额外索引规范词语；
+# 版本6起词典分词使用完整的词频词典，并在复合词的位置上额外索引其中的词典词语；
+# 版本7起每个文档的词语数上限只计原词语，追加的词语随原词语保留
+INDEX_LAYOUT_VERSION = 7
+
+# 独立建立倒排表的附加字段；正文字段即全局倒排表
+INDEXED_FIELDS = ("title", "heading")
+# 各字段命中的得分权重，可在 optimization_settings.field_boosts 中覆盖
+DEFAULT_FIELD_BOOSTS = {
+    "title": 3.0,
+    "heading": 2.0,
+    BODY_FIELD: 1.0
+}
+
+# 由已渲染页面（MkDocs 钩子）建立的文档条目的内容哈希前缀。渲染页面与直接解析 Markdown
+# 得到的文本和小标题不同，两条路径写入同一索引目录时不能互相复用对方的条目
+RENDERED_HASH_PREFIX = 'html:'
+
+# 搜索结果摘要的最大长度（字符数）
+SNIPPET_LENGTH = 200
+# 确定规范词语命中的原文长度时，从命中位置读取的文本字节数
+SURFACE_WINDOW_BYTES = 256
+
+# 查询分词结果和摘要高亮正则的缓存容量
+QUERY_TOKEN_CACHE_SIZE = 1024
+HIGHLIGHT_PATTERN_CACHE_SIZE = 256
+
+# 搜索结果缓存的默认配置：最大条目数和条目存活秒数（None表示不过期）
+DEFAULT_RESULT_CACHE_SETTINGS = {
+    "size": 512,
+    "ttl_seconds": 300
+}
+
+# 模糊匹配的默认配置：最大编辑距离，精确匹配的结果少于 min_results 个时启用，
+# 每个查询词最多扩展的相近词语数
+DEFAULT_FUZZY_SETTINGS = {
+    "enabled": True,
+    "max_distance": 2,
+    "min_results": 3,
+    "max_expansions": 3
+}
+
+class IndexSnapshot:
+    """某一代索引的只读快照
+
+    搜索只通过快照访问索引数据。构建新索引时生成新的数据对象，完成后整体替换
+    优化器持有的快照引用（单次赋值，对其他线程是原子的），已发布快照中的对象
+    不会再被修改，正在使用旧快照的查询始终看到完整一致的一代索引。
+    旧快照不再被引用后，其分段的 mmap 读取器随之释放。
+    """
+
+    __slots__ = ('generation', 'documents', 'doc_ids', 'doc_lengths', 'postings', 'positions', 'offsets',
+                 'idf', 'avg_doc_length', 'max_scores', 'score_bound_params', 'segments', 'prefix_index',
+                 'suggestions_file', 'texts', 'fields')
+
+    def __init__(self, generation: int = 0, documents: Any = None, doc_ids: Any = None,
+                 doc_lengths: Any = None, postings: Any = None, positions: Any = None,
+                 idf: Any = None, avg_doc_length: float = 0.0, max_scores: Any = None,
+                 score_bound_params: Optional[Tuple[float, float]] = None,
+                 segments: Optional[SegmentedIndex] = None, prefix_index: Optional[PrefixIndex] = None,
+                 suggestions_file: Optional[str] = None, offsets: Any = None,
+                 texts: Optional[TextStoreReader] = None, fields: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.generation = generation
+        self.documents = documents if documents is not None else {}
+        self.doc_ids = doc_ids if doc_ids is not None else []
+        self.doc_lengths = doc_lengths if doc_lengths is not None else []
+        self.postings = postings if postings is not None else {}
+        self.positions = positions if positions is not None else {}
+        # 与位置逐项对应的词语在文档文本中的字节偏移
+        self.offsets = offsets if offsets is not None else {}
+        self.idf = idf if idf is not None else {}
+        self.avg_doc_length = avg_doc_length
+        self.max_scores = max_scores if max_scores is not None else {}
+        self.score_bound_params = score_bound_params
+        # 提供上面各字段的分段合并视图，持有各分段的 mmap 读取器
+        self.segments = segments
+        # 搜索建议前缀索引可以在首次使用时加载，这是快照中唯一会被延迟赋值的字段
+        self.prefix_index = prefix_index
+        # 延迟加载前缀索引时读取的文件，属于快照所在的一代索引目录
+        self.suggestions_file = suggestions_file
+        # 文档完整文本的存储，截取摘要时按字节偏移读取；没有文本存储时为None
+        self.texts = texts
+        # 附加字段名 -> {"postings", "sections", "doc_lengths", "avg_doc_length"}
+        self.fields = fields if fields is not None else {}
+
+
 class SearchIndexOptimizer:
     """搜索索引优化器类"""
     
@@ -33,34 +167,146 @@ class SearchIndexOptimizer:
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.docs_dir = docs_dir or os.path.join(self.project_root, 'docs')
         self.index_dir = index_dir or os.path.join(self.project_root, '.config', 'index')
-        self.index_file = os.path.join(self.index_dir, 'search_index.json')
-        self.metadata_file = os.path.join(self.index_dir, 'index_metadata.json')
         
         # 确保索引目录存在
         self._ensure_index_directory()
+        # 索引文件位于清单指向的当前一代目录中（旧的目录布局下直接位于索引目录）
+        self._set_data_dir(current_directory(self.index_dir))
         
         # 初始化索引和元数据
         self._index = {}
         self._metadata = {}
-        self._load_index()
+        # 当前分词配置的规范词语映射表，首次分词时获取；分词配置变化时（加载元数据、构建）重置
+        self._reset_term_normalizer()
+        # 全局倒排表：词语 -> [doc_id, tf, doc_id, tf, ...]（doc_id按文档顺序递增）；
+        # 以下各字段都是当前一代分段合并视图中的对应部分
+        self._postings = {}
+        # 词语位置：词语 -> 与倒排列表逐项对应的位置列表
+        self._positions = {}
+        # 词语字节偏移：词语 -> 与位置列表逐项对应的字节偏移列表
+        self._offsets = {}
+        # 标题、小标题字段：字段名 -> {"postings": 倒排表, "sections": 与倒排列表逐项对应的
+        # 小标题序号列表, "doc_lengths": 字段长度, "avg_doc_length": 平均字段长度}
+        self._fields = {}
+        self._doc_ids = []
+        self._doc_lengths = []
+        # 构建索引时预先计算的排序统计信息
+        self._idf = {}
+        self._avg_doc_length = 0.0
+        self._max_scores = {}
+        self._score_bound_params = None
+        # 搜索建议前缀索引，首次使用时加载
+        self._prefix_index = None
+        # 当前一代全部分段的合并视图
+        self._segments = SegmentedIndex([])
+        # 当前一代的文档文本存储
+        self._text_store = None
+        # 搜索使用的已发布索引快照；上面的字段是构建过程使用的工作状态，
+        # 构建、优化或迁移完成后才整体发布为新的快照
+        self._snapshot = IndexSnapshot()
+        # 串行化构建、优化和迁移，搜索不需要获取此锁
+        self._build_lock = threading.RLock()
+        # 后台定期更新线程及其停止信号
+        self._update_thread = None
+        self._update_stop = threading.Event()
+        # 查询分词结果和摘要高亮正则的LRU缓存，分词配置可能变化，构建索引时清空
+        self._query_token_cache = LRUCache(QUERY_TOKEN_CACHE_SIZE)
+        self._highlight_cache = LRUCache(HIGHLIGHT_PATTERN_CACHE_SIZE)
         self._load_metadata()
+        self._load_index()
+        self._ranker = create_ranker(self._metadata.get("ranking"))
+        # 搜索结果缓存，键中包含索引代数，索引重新保存后旧条目不会再被命中
+        self._result_cache = self._create_result_cache()
+        self._publish_snapshot()
     
+    def _publish_snapshot(self):
+        """将当前的构建状态发布为新的只读索引快照"""
+        self._snapshot = IndexSnapshot(
+            generation=self._metadata.get("generation", 0),
+            documents=self._index,
+            doc_ids=self._doc_ids,
+            doc_lengths=self._doc_lengths,
+            postings=self._postings,
+            positions=self._positions,
+            offsets=self._offsets,
+            idf=self._idf,
+            avg_doc_length=self._avg_doc_length,
+            max_scores=self._max_scores,
+            score_bound_params=self._score_bound_params,
+            segments=self._segments,
+            prefix_index=self._prefix_index,
+            suggestions_file=self.suggestions_file,
+            texts=self._text_store,
+            fields=self._fields
+        )
+
+    def _set_data_dir(self, data_dir: str):
+        """设置索引文件所在的目录
+
+        Args:
+            data_dir: 一代索引的目录
+        """
+        self.data_dir = data_dir
+        self.index_file = os.path.join(data_dir, 'search_index.json')
+        self.metadata_file = os.path.join(data_dir, 'index_metadata.json')
+        self.postings_file = os.path.join(data_dir, 'search_postings.json')
+        # 分段之前版本的单文件索引、文本存储和字段索引，只在加载和迁移旧索引时读取
+        self.binary_index_file = os.path.join(data_dir, 'search_index.bin')
+        self.suggestions_file = os.path.join(data_dir, 'search_suggestions.json')
+        self.text_store_file = os.path.join(data_dir, 'search_text.bin')
+        self.fields_file = os.path.join(data_dir, 'search_fields.json')
+
+    def reload_index(self) -> bool:
+        """其他进程发布了新一代索引时重新加载
+
+        读取清单，代数与当前快照不同时加载清单指向的一代并发布为新快照，
+        加载期间的搜索继续使用旧快照，实现不停机的热更新。
+
+        Returns:
+            是否加载了新的一代索引
+        """
+        manifest = read_manifest(self.index_dir)
+        if manifest is None or manifest["generation"] == self._snapshot.generation:
+            return False
+
+        with self._build_lock:
+            data_dir = os.path.join(self.index_dir, manifest["directory"])
+            if os.path.normpath(data_dir) == os.path.normpath(self.data_dir):
+                return False
+            self._set_data_dir(data_dir)
+            self._prefix_index = None
+            self._query_token_cache.clear()
+            self._highlight_cache.clear()
+            self._load_metadata()
+            self._load_index()
+            self._ranker = create_ranker(self._metadata.get("ranking"))
+            self._publish_snapshot()
+        print(f"已重新加载第 {manifest['generation']} 代搜索索引")
+        return True
+
     def _ensure_index_directory(self):
         """确保索引目录存在"""
         if not os.path.exists(self.index_dir):
             os.makedirs(self.index_dir)
     
     def _load_index(self):
-        """加载搜索索引"""
-        if os.path.exists(self.index_file):
-            try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    self._index = json.load(f)
-                print(f"已加载搜索索引，包含 {len(self._index)} 个文档")
-            except Exception as e:
-                print(f"加载搜索索引失败: {e}")
-                self._index = {}
-    
+        """加载搜索索引
+
+        打开当前一代目录中分段清单列出的全部分段；没有分段清单时把分段之前版本的
+        二进制索引或JSON索引作为一个分段加载，下次保存时改写为分段文件。
+        """
+        segmented = None
+        try:
+            segmented = open_segments(self.data_dir)
+        except Exception as e:
+            print(f"加载搜索索引分段失败: {e}")
+        if segmented is None:
+            legacy_segment = self._load_legacy_segment()
+            segmented = SegmentedIndex([legacy_segment] if legacy_segment is not None else [])
+        self._apply_segments(segmented)
+        if self._doc_ids:
+            print(f"已加载搜索索引，包含 {len(self._doc_ids)} 个文档（{len(segmented.segments)} 个分段）")
+
     def _load_metadata(self):
         """加载索引元数据"""
         default_metadata = {
@@ -70,13 +316,21 @@ class SearchIndexOptimizer:
             "document_count": 0,
             "token_count": 0,
             "languages": ["zh", "en"],
+            "index_format": "binary",
+            "ranking": dict(DEFAULT_RANKING_SETTINGS),
+            "result_cache": dict(DEFAULT_RESULT_CACHE_SETTINGS),
+            "fuzzy": dict(DEFAULT_FUZZY_SETTINGS),
+            "generation": 0,
             "optimization_settings": {
                 "stemming": True,
                 "stop_words_removal": True,
                 "synonyms_enabled": True,
-                "chinese_segmentation": True,
+                "chinese_segmentation": "dictionary",
+                "segmentation_dictionary": None,
                 "max_tokens_per_document": 10000,
-                "min_token_length": 2
+                "min_token_length": 2,
+                "positional_index": True,
+                "field_boosts": dict(DEFAULT_FIELD_BOOSTS)
             }
         }
         
@@ -89,22 +343,462 @@ class SearchIndexOptimizer:
                 self._metadata = default_metadata
         else:
             self._metadata = default_metadata
-    
-    def _save_index(self):
-        """保存搜索索引"""
+        self._reset_term_normalizer()
+
+    def _apply_segments(self, segmented: SegmentedIndex):
+        """把分段合并视图设为构建状态
+
+        Args:
+            segmented: 当前一代全部分段的合并视图
+        """
+        self._segments = segmented
+        self._index = segmented.documents
+        self._doc_ids = segmented.doc_ids
+        self._doc_lengths = segmented.doc_lengths
+        self._postings = segmented.postings
+        self._positions = segmented.positions
+        self._offsets = segmented.offsets
+        self._fields = segmented.fields
+        self._idf = segmented.idf
+        self._avg_doc_length = segmented.avg_doc_length
+        self._max_scores = segmented.max_scores
+        self._score_bound_params = segmented.score_bound_params
+        self._text_store = segmented.texts
+
+    def _load_legacy_segment(self) -> Optional[IndexSegment]:
+        """加载分段之前版本的索引
+
+        优先通过 mmap 打开二进制索引，只有在二进制索引不存在时才读取旧的JSON索引。
+        文本存储或字段索引不存在、或文档数与索引不一致时不使用。
+
+        Returns:
+            尚未保存为分段文件的分段；没有可用的索引时返回None
+        """
+        if os.path.exists(self.binary_index_file):
+            try:
+                reader = BinaryIndexReader(self.binary_index_file)
+                return IndexSegment(None, reader, self._load_legacy_text_store(reader.doc_count),
+                                    self._load_legacy_fields(reader.doc_count))
+            except Exception as e:
+                print(f"加载二进制搜索索引失败: {e}")
+
+        if not os.path.exists(self.index_file):
+            return None
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                documents = json.load(f)
+        except Exception as e:
+            print(f"加载搜索索引失败: {e}")
+            return None
+
+        if os.path.exists(self.postings_file):
+            try:
+                with open(self.postings_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('doc_ids') == list(documents.keys()):
+                    index = MemoryIndex(documents, data['postings'], data['doc_lengths'],
+                                        positions=data.get('positions'), offsets=data.get('offsets'),
+                                        idf=data.get('idf'), max_scores=data.get('max_scores'),
+                                        meta={"avg_doc_length": data.get('avg_doc_length')})
+                    if data.get('bound_k1') is not None:
+                        index.meta.update(bound_k1=data['bound_k1'], bound_b=data['bound_b'])
+                    return IndexSegment(None, index, fields=self._load_legacy_fields(index.doc_count))
+                print("倒排表与搜索索引不一致，正在重新生成")
+            except Exception as e:
+                print(f"加载倒排表失败: {e}")
+
+        # 精简结构的文档不含词频，只能依赖倒排表文件
+        if any('inverted_index' not in doc_data and 'tokens' not in doc_data for doc_data in documents.values()):
+            print("倒排表缺失且文档不含词频信息，下次构建时将完整重建索引")
+            return None
+        ranking = dict(DEFAULT_RANKING_SETTINGS, **self._metadata.get("ranking", {}))
+        index, _, fields = build_segment(documents, self._is_positional(), ranking["k1"], ranking["b"])
+        return IndexSegment(None, index, fields=fields if fields else None)
+
+    def _load_legacy_text_store(self, doc_count: int) -> Optional[TextStoreReader]:
+        """打开分段之前版本的文档文本存储，不可用时摘要只使用文档记录保存的开头部分"""
+        if not os.path.exists(self.text_store_file):
+            return None
         try:
-            self._ensure_index_directory()
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(self._index, f, indent=2, ensure_ascii=False)
+            text_store = TextStoreReader(self.text_store_file)
+        except Exception as e:
+            print(f"加载文本存储失败: {e}")
+            return None
+        if len(text_store) != doc_count:
+            print("文本存储与搜索索引不一致，摘要只使用文档开头部分")
+            text_store.close()
+            return None
+        return text_store
+
+    def _load_legacy_fields(self, doc_count: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """读取分段之前版本的标题、小标题字段倒排表，不可用时只按正文排序"""
+        if not os.path.exists(self.fields_file):
+            return None
+        try:
+            with open(self.fields_file, 'r', encoding='utf-8') as f:
+                fields = json.load(f).get('fields', {})
+        except Exception as e:
+            print(f"加载字段索引失败: {e}")
+            return None
+        if any(len(field['doc_lengths']) != doc_count for field in fields.values()):
+            print("字段索引与搜索索引不一致，暂时只按正文排序")
+            return None
+        return fields
+
+    def _forward_term_counts(self, snapshot: Optional[IndexSnapshot] = None) -> Dict[str, Dict[str, int]]:
+        """由全局倒排表还原每个文档的词频
+
+        Args:
+            snapshot: 索引快照，默认使用构建状态
+
+        Returns:
+            文档路径到 {词语: 词频} 的映射
+        """
+        forward_index = {}
+        doc_ids = snapshot.doc_ids if snapshot is not None else self._doc_ids
+        postings_table = snapshot.postings if snapshot is not None else self._postings
+        for token, postings in postings_table.items():
+            for i in range(0, len(postings), 2):
+                doc_path = doc_ids[postings[i]]
+                forward_index.setdefault(doc_path, {})[token] = postings[i + 1]
+        return forward_index
+
+    def _create_prefix_index(self, postings: Any, documents: Any) -> PrefixIndex:
+        """由倒排表和文档记录创建搜索建议前缀索引
+
+        索引中的每个词语（规范词语除外）以文档频率为权重；文档标题按完整标题和标题中的每个词语建立条目，
+        以便输入标题中间的词语时也能给出标题建议；小标题按完整文本建立条目。
+
+        Args:
+            postings: 词语到倒排列表的映射
+            documents: 文档路径到文档数据的映射
+
+        Returns:
+            前缀索引
+        """
+        entries = [(token, token, len(token_postings) // 2) for token, token_postings in postings.items()
+                   if not is_canonical_term(token)]
+        for doc_data in documents.values():
+            entries.extend(self._document_suggestion_entries(doc_data))
+        return PrefixIndex.build(entries)
+
+    def _document_suggestion_entries(self, doc_data: Dict[str, Any], weight: int = 1) -> List[Tuple[str, str, int]]:
+        """文档的标题和小标题贡献的搜索建议条目
+
+        Args:
+            doc_data: 文档数据
+            weight: 每个条目的权重，移除文档时为 -1
+
+        Returns:
+            (查找键, 展示文本, 权重) 列表
+        """
+        title = doc_data['title']
+        entries = [(title, title, weight)]
+        for token in set(self._tokenize(title)):
+            if not is_canonical_term(token):
+                entries.append((token, title, weight))
+        for _, heading, _ in self._field_headings(doc_data):
+            entries.append((heading, heading, weight))
+        return entries
+
+    def _update_prefix_index(self, previous_dir: str, segmented: SegmentedIndex, removed_docs: List[str],
+                             new_documents: Dict[str, Dict[str, Any]]) -> Optional[PrefixIndex]:
+        """按变化的文档增量更新上一代的搜索建议前缀索引
+
+        标题和小标题条目按文档增减；词语条目以文档频率为权重，只对变化的文档中出现的词语
+        按新旧两代的倒排表重新计算。移除的文档从上一代的文本存储重新分词得到词语集合，
+        不做词语数截断，得到的是已索引词语的超集，多出的词语文档频率没有变化，不影响结果。
+
+        Args:
+            previous_dir: 上一代索引的目录
+            segmented: 新一代的分段合并视图
+            removed_docs: 修改和删除的文档路径
+            new_documents: 写入新分段的文档条目
+
+        Returns:
+            更新后的前缀索引；上一代没有搜索建议文件或文本存储时返回None，由调用方完整重建
+        """
+        previous = self._segments
+        prefix_index = self._prefix_index
+        if prefix_index is None:
+            suggestions_file = os.path.join(previous_dir, os.path.basename(self.suggestions_file))
+            try:
+                with open(suggestions_file, 'r', encoding='utf-8') as f:
+                    prefix_index = PrefixIndex.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                return None
+
+        entries = []
+        terms = set()
+        for doc_path in removed_docs:
+            location = previous.locate(doc_path)
+            if location is None:
+                continue
+            texts = previous.segments[location[0]].texts
+            if texts is None:
+                return None
+            entries.extend(self._document_suggestion_entries(previous.documents[doc_path], -1))
+            terms.update(self._tokenize(texts.read_bytes(location[1]).decode('utf-8')))
+        for doc_data in new_documents.values():
+            entries.extend(self._document_suggestion_entries(doc_data))
+            terms.update(doc_data.get('inverted_index') or ())
+
+        for term in terms:
+            if is_canonical_term(term):
+                continue
+            delta = len(segmented.postings.get(term) or ()) // 2 - len(previous.postings.get(term) or ()) // 2
+            if delta:
+                entries.append((term, term, delta))
+        return prefix_index.updated(entries)
+
+    def _load_prefix_index(self, postings: Any, documents: Any,
+                           suggestions_file: Optional[str] = None) -> PrefixIndex:
+        """从文件读取搜索建议前缀索引，文件不可用时重新构建"""
+        suggestions_file = suggestions_file or self.suggestions_file
+        if os.path.exists(suggestions_file):
+            try:
+                with open(suggestions_file, 'r', encoding='utf-8') as f:
+                    return PrefixIndex.from_dict(json.load(f))
+            except Exception as e:
+                print(f"加载搜索建议索引失败: {e}")
+        return self._create_prefix_index(postings, documents)
+
+    def _save_prefix_index(self, prefix_index: PrefixIndex):
+        """保存搜索建议前缀索引"""
+        temp_path = self.suggestions_file + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(prefix_index.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.suggestions_file)
+
+    def _save_generation(self, segments: List[IndexSegment], merges: Optional[List[List[int]]] = None,
+                         new_documents: Optional[Dict[str, Dict[str, Any]]] = None,
+                         overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                         rebuild_suggestions: bool = False, removed_docs: Optional[List[str]] = None) -> bool:
+        """将分段保存为新的一代索引
+
+        未变化的分段文件从当前一代目录硬链接到临时目录，只写入新分段（新增、修改的文档
+        或合并结果）、分段清单、搜索建议和元数据，写入量与变化的文档数成正比。全部写完并
+        fsync 后才通过重命名和替换清单发布；写入失败或中途崩溃时清单仍指向上一代，其他
+        进程可以继续 mmap 读取上一代的文件。发布成功后把新一代的分段合并视图设为构建状态，
+        并清理超出保留数量的旧代数目录。
+
+        Args:
+            segments: 新一代沿用的分段（已标记删除的文档），没有未删除文档的分段被丢弃
+            merges: 需要合并为一个新分段的 segments 序号组
+            new_documents: 写入新分段的文档条目（顺序即分段内 doc_id 顺序）
+            overrides: 只有修改时间变化的文档记录字段
+            rebuild_suggestions: 是否完整重建搜索建议索引；为False时按 removed_docs 和 new_documents
+                增量更新上一代的搜索建议，无法增量更新时仍完整重建
+            removed_docs: 相对上一代修改和删除的文档路径，增量更新搜索建议时使用
+
+        Returns:
+            是否保存成功；其他进程在此期间发布了更新的一代时不发布并返回False，
+            清单保持指向更新的一代，可通过 reload_index 加载
+        """
+        # 每次保存都产生新的索引代数，使缓存的搜索结果失效；
+        # 代数同时是目录编号，以清单中的代数为下限并原子地占用目录名，避免与其他进程重名
+        manifest = read_manifest(self.index_dir)
+        generation = max(self._metadata.get("generation", 0),
+                         manifest["generation"] if manifest else 0) + 1
+        previous_dir = self.data_dir
+        try:
+            generation = reserve_generation(self.index_dir, generation)
+        except OSError as e:
+            print(f"占用索引代数目录失败: {e}")
+            return False
+        self._metadata["generation"] = generation
+        try:
+            staging_dir = create_staging_directory(self.index_dir, generation)
+        except OSError as e:
+            print(f"创建索引临时目录失败: {e}")
+            release_generation(self.index_dir, generation)
+            return False
+
+        overrides = dict(overrides or {})
+        prefix_index = None
+        self._set_data_dir(staging_dir)
+        try:
+            saved = self._write_segments(previous_dir, segments, merges or [], new_documents, overrides)
+            write_segment_list(staging_dir, saved, overrides)
+            segmented = SegmentedIndex(saved, overrides)
+            # 每一代都带有搜索建议文件，输入时不需要重建前缀索引
+            if not rebuild_suggestions:
+                prefix_index = self._update_prefix_index(previous_dir, segmented, removed_docs or [],
+                                                         new_documents or {})
+            if prefix_index is None:
+                prefix_index = self._create_prefix_index(segmented.postings, segmented.documents)
+            self._save_prefix_index(prefix_index)
+            if not self._save_metadata():
+                raise OSError("索引元数据写入失败")
+            final_dir = publish_generation(self.index_dir, staging_dir, generation)
+            if final_dir is None:
+                raise OSError("其他进程已发布了更新的一代索引，本次保存被取代")
+            self._set_data_dir(final_dir)
+        except Exception as e:
+            print(f"发布第 {generation} 代索引失败: {e}")
+            discard_staging(staging_dir)
+            release_generation(self.index_dir, generation)
+            self._set_data_dir(previous_dir)
+            return False
+
+        self._apply_segments(segmented)
+        self._prefix_index = prefix_index
+        collect_garbage(self.index_dir, legacy_files=_LEGACY_INDEX_FILES)
+        return True
+
+    def _write_segments(self, source_dir: str, segments: List[IndexSegment], merges: List[List[int]],
+                        new_documents: Optional[Dict[str, Dict[str, Any]]],
+                        overrides: Dict[str, Dict[str, Any]]) -> List[IndexSegment]:
+        """把新一代的分段放入 self.data_dir（临时目录）
+
+        合并组中的分段在第一个成员的位置合并为一个新分段，合并后的文档记录写回修改时间等
+        覆盖字段并从 overrides 中移除；其余分段硬链接；新文档的分段排在最后。
+
+        Args:
+            source_dir: 当前一代的目录
+            segments: 新一代沿用的分段
+            merges: 需要合并的分段序号组
+            new_documents: 写入新分段的文档条目
+            overrides: 只有修改时间变化的文档记录字段，合并时会被修改
+
+        Returns:
+            新一代按顺序排列的分段
+        """
+        groups = {}
+        for group in merges:
+            for i in group:
+                groups[i] = group
+        # 旧版本的索引没有分段文件，总是改写为分段
+        for i, segment in enumerate(segments):
+            if segment.name is None and i not in groups:
+                groups[i] = [i]
+
+        saved = []
+        for i, segment in enumerate(segments):
+            group = groups.get(i)
+            if group is None:
+                if segment.live_count:
+                    link_segment(source_dir, self.data_dir, segment.name)
+                    saved.append(segment)
+                continue
+            if i != group[0]:
+                continue
+            documents = {}
+            for member in group:
+                documents.update(segment_documents(segments[member], overrides))
+            for doc_path in documents:
+                overrides.pop(doc_path, None)
+            if documents:
+                saved.append(self._write_segment(documents, segment_name(self._metadata["generation"], len(saved))))
+        if new_documents:
+            saved.append(self._write_segment(new_documents, segment_name(self._metadata["generation"], len(saved))))
+        return saved
+
+    def _write_segment(self, documents: Dict[str, Dict[str, Any]], name: str) -> IndexSegment:
+        """由文档条目构建分段，写入 self.data_dir 后打开
+
+        Args:
+            documents: 文档路径到文档条目的映射
+            name: 分段名称
+
+        Returns:
+            通过 mmap 打开的新分段
+        """
+        ranking = dict(DEFAULT_RANKING_SETTINGS, **self._metadata.get("ranking", {}))
+        index, texts, fields = build_segment(documents, self._is_positional(), ranking["k1"], ranking["b"])
+        write_segment(self.data_dir, name, index, texts, fields,
+                      meta={"settings_signature": self._metadata.get("settings_signature"),
+                            "generation": self._metadata["generation"]})
+        return open_segment(self.data_dir, name)
+
+    def _save_json_index(self, output_dir: str):
+        """以JSON格式保存搜索索引和全局倒排表
+
+        Args:
+            output_dir: 输出目录
+        """
+        index_file = os.path.join(output_dir, os.path.basename(self.index_file))
+        postings_file = os.path.join(output_dir, os.path.basename(self.postings_file))
+
+        documents = {doc_path: lean_document(doc_data) for doc_path, doc_data in self._index.items()}
+
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(documents, f, indent=2, ensure_ascii=False)
+
+        # 多个分段时没有预计算的得分上界，bound_k1/bound_b 为 None
+        bound_k1, bound_b = self._score_bound_params or (None, None)
+        postings = dict(self._postings.items())
+        data = {
+            'version': 2,
+            'doc_ids': list(self._doc_ids),
+            'doc_lengths': list(self._doc_lengths),
+            'avg_doc_length': self._avg_doc_length,
+            'idf': {token: self._idf[token] for token in postings},
+            'max_scores': {token: self._max_scores.get(token) for token in postings},
+            'bound_k1': bound_k1,
+            'bound_b': bound_b,
+            'postings': postings
+        }
+        if self._is_positional():
+            data['positions'] = {token: self._positions[token] for token in postings}
+            data['offsets'] = {token: self._offsets[token] for token in postings}
+        with open(postings_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def export_json_index(self, output_dir: str) -> bool:
+        """将搜索索引导出为JSON格式
+
+        Args:
+            output_dir: 输出目录
+
+        Returns:
+            是否导出成功
+        """
+        try:
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            self._save_json_index(output_dir)
+            print(f"已导出JSON格式搜索索引: {output_dir}")
             return True
         except Exception as e:
-            print(f"保存搜索索引失败: {e}")
+            print(f"导出JSON格式搜索索引失败: {e}")
             return False
-    
+
+    def migrate_index(self) -> bool:
+        """将已有索引迁移为精简结构
+
+        全部分段（包括作为一个分段加载的旧版本索引）合并为一个分段重新保存，
+        并报告迁移前后的文件大小。
+        迁移完成后发布新的索引快照。
+
+        Returns:
+            是否迁移成功
+        """
+        with self._build_lock:
+            result = self._migrate_index()
+            self._publish_snapshot()
+            return result
+
+    def _migrate_index(self) -> bool:
+        """migrate_index 的实现，调用方需持有构建锁"""
+        self._reset_term_normalizer()
+        if not self._index:
+            print("没有可迁移的搜索索引")
+            return False
+
+        size_before = self._index_size()
+        segments = self._segments.segments
+        if self._save_generation(segments, merges=[list(range(len(segments)))],
+                                 overrides=self._segments.overrides, rebuild_suggestions=True):
+            size_after = self._index_size()
+            print(f"搜索索引迁移完成！索引文件 {size_before / 1024:.2f} KB -> {size_after / 1024:.2f} KB")
+            return True
+        print("搜索索引迁移失败")
+        return False
+
     def _save_metadata(self):
-        """保存索引元数据"""
+        """保存索引元数据（写入 self.data_dir）"""
         try:
-            self._ensure_index_directory()
             self._metadata["last_updated"] = datetime.now().isoformat()
             with open(self.metadata_file, 'w', encoding='utf-8') as f:
                 json.dump(self._metadata, f, indent=2, ensure_ascii=False)
@@ -116,83 +810,209 @@ class SearchIndexOptimizer:
     def _extract_text_from_markdown(self, markdown_content: str) -> str:
         """从Markdown内容中提取纯文本
         
+        使用单次扫描的提取器，代码块、HTML注释、图片等在一次扫描中按正确的顺序处理。
+        
         Args:
             markdown_content: Markdown格式的文本
             
         Returns:
             提取后的纯文本
         """
-        # 移除代码块
-        text = re.sub(r'```[\s\S]*?```', '', markdown_content)
-        # 移除行内代码
-        text = re.sub(r'`([^`]+)`', r'\1', text)
-        # 移除链接，但保留链接文本
-        text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
-        # 移除图片
-        text = re.sub(r'!\[(.*?)\]\(.*?\)', '', text)
-        # 移除标题标记
-        text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
-        # 移除列表标记
-        text = re.sub(r'^[\s]*[-*+]\s*', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^[\s]*\d+\.\s*', '', text, flags=re.MULTILINE)
-        # 移除强调标记
-        text = re.sub(r'[*_]{1,3}([^\s][^*_]*[^\s])[*_]{1,3}', r'\1', text)
-        # 移除表格
-        text = re.sub(r'\|.*?\|\s*\n', '', text)
-        # 移除水平分隔线
-        text = re.sub(r'^[-=*]{3,}\s*\n', '', text, flags=re.MULTILINE)
-        # 移除HTML标签
-        text = re.sub(r'<[^>]+>', '', text)
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
-        # 移除注释
-        text = re.sub(r'<!--[\s\S]*?-->', '', text)
-        
-        return text.strip()
+        return extract_text(markdown_content)
     
-    def _tokenize(self, text: str) -> List[str]:
+    def _tokenize(self, text: str, query: bool = False, max_tokens: Optional[int] = None) -> List[str]:
         """将文本分词
         
+        启用词干提取或同义词时，建立索引的分词结果在词语之后追加其规范词语；
+        查询的分词结果中词语和同义短语直接替换为规范词语，每个词语只需一次映射表查找。
+        
         Args:
             text: 要分词的文本
+            query: 是否为查询
+            max_tokens: 建立索引时最多保留的原词语数，追加的词语不计入
             
         Returns:
             词语列表
         """
-        tokens = []
+        tokens = self._split_tokens(text)
+        normalizer = self._term_normalizer()
+        if not query or normalizer is None:
+            return [token for _, token, _ in self._expand_tokens(tokens, max_tokens)]
+
+        kept = set(self._filter_tokens(list(dict.fromkeys(tokens))))
+        phrases = normalizer.phrases(tokens)
+        result = []
+        i = 0
+        while i < len(tokens):
+            phrase = phrases.get(i)
+            if phrase is not None:
+                result.append(phrase[1])
+                i += phrase[0]
+                continue
+            if tokens[i] in kept:
+                result.append(normalizer.normalize(tokens[i]))
+            i += 1
+        return result
+
+    def _expand_tokens(self, tokens: List[str], max_tokens: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        """过滤停用词和短词，追加复合词中的词典词语，并按 stemming、synonyms_enabled 配置追加规范词语
+        
+        追加的词语与原词语位置相同：规范词语紧跟在原词语之后；词典分词时较长的中文词语之后
+        依次是其中包含的词典词语（搜索模式）；由多个词语组成的同义词的规范词语位于短语的
+        首个词语处，短语中的词语被过滤时也会追加。
         
-        # 中文分词（简化版，实际项目中可使用jieba等专业分词库）
-        if self._metadata["optimization_settings"]["chinese_segmentation"]:
-            # 匹配中文词语
-            chinese_pattern = re.compile(r'[\u4e00-\u9fa5]+')
-            chinese_matches = chinese_pattern.finditer(text)
+        Args:
+            tokens: 切分得到的词语序列
+            max_tokens: 最多保留的原词语数（过滤后），追加的规范词语和复合词中的词语不计入
             
-            last_end = 0
-            for match in chinese_matches:
-                start, end = match.span()
-                # 处理非中文字符
-                non_chinese = text[last_end:start].strip()
-                if non_chinese:
-                    tokens.extend(self._tokenize_non_chinese(non_chinese))
-                # 添加中文词语
-                chinese_word = match.group()
-                # 对于长的中文词语，简单地按单个字符切分
-                if len(chinese_word) <= 2:
-                    tokens.append(chinese_word)
-                else:
-                    # 保留完整词和单字
-                    tokens.append(chinese_word)
-                    tokens.extend(list(chinese_word))
-                last_end = end
+        Returns:
+            (词语在 tokens 中的序号, 词语, 词语相对原词语起点的字符偏移) 列表
+        """
+        # 停用词和短词过滤只取决于词语本身，对去重后的词语过滤一次即可
+        kept = set(self._filter_tokens(list(dict.fromkeys(tokens))))
+        normalizer = self._term_normalizer()
+        phrases = normalizer.phrases(tokens) if normalizer is not None else {}
+        segmenter = self._segmenter() if self._segmentation_mode() == "dictionary" else None
+        expanded = []
+        original_count = 0
+        for i, token in enumerate(tokens):
+            if max_tokens is not None and original_count >= max_tokens:
+                break
+            if token in kept:
+                original_count += 1
+                expanded.append((i, token, 0))
+                if normalizer is not None:
+                    canonical = normalizer.normalize(token)
+                    if canonical != token:
+                        expanded.append((i, canonical, 0))
+                if segmenter is not None and len(token) > 2 and _CHINESE_PATTERN.fullmatch(token):
+                    subwords = segmenter.subwords(token)
+                    kept_subwords = set(self._filter_tokens([word for word, _ in subwords]))
+                    expanded.extend((i, word, offset) for word, offset in subwords if word in kept_subwords)
+            phrase = phrases.get(i)
+            if phrase is not None and (not expanded or expanded[-1][:2] != (i, phrase[1])):
+                expanded.append((i, phrase[1], 0))
+        return expanded
+
+    def _term_normalizer(self) -> Optional[TermNormalizer]:
+        """当前分词配置的规范词语映射表，未启用词干提取和同义词时返回None
+
+        映射表在实例上缓存，每次分词只读取一个属性，不重新计算配置签名。
+        """
+        if not self._normalizer_resolved:
+            settings = self._metadata["optimization_settings"]
+            stemming = bool(settings.get("stemming"))
+            synonym_groups = self._synonym_groups()
+            normalizer = None
+            if stemming or synonym_groups:
+                normalizer = get_normalizer(self._settings_signature(), stemming, synonym_groups,
+                                            self._split_tokens)
+            self._normalizer = normalizer
+            self._normalizer_resolved = True
+        return self._normalizer
+
+    def _reset_term_normalizer(self):
+        """分词配置可能已变化，下次分词时重新获取规范词语映射表"""
+        self._normalizer = None
+        self._normalizer_resolved = False
+
+    def _synonym_groups(self) -> List[List[str]]:
+        """启用同义词时的同义词表，可在 optimization_settings.synonyms 中覆盖默认表"""
+        settings = self._metadata["optimization_settings"]
+        if not settings.get("synonyms_enabled"):
+            return []
+        return settings.get("synonyms", DEFAULT_SYNONYMS)
+
+    def _tokenize_with_positions(self, text: str) -> List[Tuple[str, int]]:
+        """将文本分词并记录词语位置
+        
+        位置是词语在过滤停用词和短词之前的序号，被过滤的词语仍占据位置，
+        相邻的词语在过滤后依然可以通过位置差判断是否相邻。
+        
+        Args:
+            text: 要分词的文本
             
-            # 处理剩余的非中文字符
-            remaining = text[last_end:].strip()
-            if remaining:
-                tokens.extend(self._tokenize_non_chinese(remaining))
-        else:
+        Returns:
+            (词语, 位置) 列表
+        """
+        return [(token, position) for token, position, _ in self._tokenize_with_offsets(text)]
+
+    def _tokenize_with_offsets(self, text: str, max_tokens: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """将文本分词并记录词语位置和字节偏移
+        
+        字节偏移是词语在文本 UTF-8 编码中的起始字节，截取摘要时直接按偏移读取文本存储。
+        
+        Args:
+            text: 要分词的文本
+            max_tokens: 最多保留的原词语数，追加的词语不计入
+            
+        Returns:
+            (词语, 位置, 字节偏移) 列表
+        """
+        split = self._split_tokens_with_offsets(text)
+        result = []
+        # 字符偏移基本递增，逐段累加编码长度换算为字节偏移；追加的词语与原词语的位置相同
+        char_cursor = 0
+        byte_cursor = 0
+        for position, token, inner_offset in self._expand_tokens([token for token, _ in split], max_tokens):
+            char_offset = split[position][1] + inner_offset
+            if char_offset >= char_cursor:
+                byte_cursor += len(text[char_cursor:char_offset].encode('utf-8'))
+            else:
+                byte_cursor = len(text[:char_offset].encode('utf-8'))
+            char_cursor = char_offset
+            result.append((token, position, byte_cursor))
+        return result
+
+    def _split_tokens(self, text: str) -> List[str]:
+        """切分文本，不做停用词和短词过滤
+        
+        Args:
+            text: 要切分的文本
+            
+        Returns:
+            词语列表
+        """
+        return [token for token, _ in self._split_tokens_with_offsets(text)]
+
+    def _split_tokens_with_offsets(self, text: str) -> List[Tuple[str, int]]:
+        """切分文本并记录每个词语在文本中的字符偏移，不做停用词和短词过滤
+        
+        Args:
+            text: 要切分的文本
+            
+        Returns:
+            (词语, 字符偏移) 列表
+        """
+        mode = self._segmentation_mode()
+        if not mode:
             # 只进行非中文分词
-            tokens.extend(self._tokenize_non_chinese(text))
+            return [(match.group(), match.start()) for match in _NON_CHINESE_TOKEN_PATTERN.finditer(text)]
+
+        tokens = []
+        last_end = 0
+        for match in _CHINESE_PATTERN.finditer(text):
+            start, end = match.span()
+            # 处理非中文字符：提取字母、数字组成的词语
+            tokens.extend((token.group(), token.start())
+                          for token in _NON_CHINESE_TOKEN_PATTERN.finditer(text, last_end, start))
+            tokens.extend(self._segment_chinese_with_offsets(match.group(), start, mode))
+            last_end = end
+
+        # 处理剩余的非中文字符
+        tokens.extend((token.group(), token.start())
+                      for token in _NON_CHINESE_TOKEN_PATTERN.finditer(text, last_end))
+        return tokens
+
+    def _filter_tokens(self, tokens: List[str]) -> List[str]:
+        """过滤停用词和短词
         
+        Args:
+            tokens: 词语列表
+            
+        Returns:
+            过滤后的词语列表
+        """
         # 应用停用词过滤
         if self._metadata["optimization_settings"]["stop_words_removal"]:
             tokens = self._remove_stop_words(tokens)
@@ -203,19 +1023,82 @@ class SearchIndexOptimizer:
         
         return tokens
     
-    def _tokenize_non_chinese(self, text: str) -> List[str]:
-        """非中文文本分词
+    def _segmentation_mode(self) -> Optional[str]:
+        """获取中文分词方式
+        
+        optimization_settings.chinese_segmentation 可取 "dictionary"（基于词典分词）、
+        "ngram"（按 ngram_size 个字切分的重叠 n-gram，默认二元）、"simple"（保留完整词和单字），
+        兼容旧配置中的 true（等同 "simple"）和 false（不分词）。
+        
+        Returns:
+            分词方式名称，不进行中文分词时返回None
+        """
+        setting = self._metadata["optimization_settings"].get("chinese_segmentation")
+        if setting is True:
+            return "simple"
+        if not setting:
+            return None
+        if setting not in ("simple", "dictionary", "ngram"):
+            raise ValueError(f"未知的中文分词方式: {setting}")
+        return setting
+
+    def _segment_chinese(self, chinese_word: str, mode: str) -> List[str]:
+        """切分一段连续的中文文本
         
         Args:
-            text: 非中文文本
+            chinese_word: 连续的中文文本
+            mode: 分词方式
             
         Returns:
             词语列表
         """
-        # 提取字母、数字组成的词语
-        tokens = re.findall(r'[a-zA-Z0-9]+', text)
-        return tokens
+        if mode == "dictionary":
+            return self._segmenter().cut(chinese_word)
+
+        if mode == "ngram":
+            # 重叠的 n-gram，不足 n 个字的文本整体作为一个词语
+            size = self._metadata["optimization_settings"].get("ngram_size", 2)
+            if len(chinese_word) <= size:
+                return [chinese_word]
+            return [chinese_word[i:i + size] for i in range(len(chinese_word) - size + 1)]
+
+        # 对于长的中文词语，保留完整词和单字
+        if len(chinese_word) <= 2:
+            return [chinese_word]
+        return [chinese_word] + list(chinese_word)
+
+    def _segment_chinese_with_offsets(self, chinese_word: str, start: int, mode: str) -> List[Tuple[str, int]]:
+        """切分一段连续的中文文本并记录每个词语的字符偏移
+        
+        Args:
+            chinese_word: 连续的中文文本
+            start: 该段文本在全文中的字符偏移
+            mode: 分词方式
+            
+        Returns:
+            (词语, 字符偏移) 列表
+        """
+        if mode == "dictionary":
+            # 词典分词的结果依次覆盖整段文本，连续的未登录单字为重叠的二元组
+            return [(word, start + offset) for word, offset in self._segmenter().cut_with_offsets(chinese_word)]
+        words = self._segment_chinese(chinese_word, mode)
+        if mode == "ngram":
+            # 第 i 个 n-gram 从第 i 个字开始
+            return [(word, start + i) for i, word in enumerate(words)]
+        # simple 模式：完整词之后依次是每个单字
+        return [(words[0], start)] + [(char, start + i) for i, char in enumerate(words[1:])]
+
+    def _segmenter(self) -> ChineseSegmenter:
+        """词典分词使用的分词器，optimization_settings.segmentation_dictionary 可指定词典文件"""
+        dictionary = self._metadata["optimization_settings"].get("segmentation_dictionary")
+        if dictionary:
+            dictionary = os.path.join(_PROJECT_ROOT, dictionary)
+        return get_segmenter(dictionary)
     
+    def _is_positional(self) -> bool:
+        """是否在倒排表中保存词语位置和字节偏移（精确短语查询和整篇摘要依赖位置和偏移）"""
+        return self._metadata["optimization_settings"].get("positional_index", True)
+
     def _remove_stop_words(self, tokens: List[str]) -> List[str]:
         """移除停用词
         
@@ -225,127 +1108,461 @@ class SearchIndexOptimizer:
         Returns:
             过滤后的词语列表
         """
-        # 简单的停用词列表（中英文）
-        stop_words = {
-            '的', '了', '和', '是', '在', '有', '我', '他', '她', '它', '你',
-            '这', '那', '个', '我们', '你们', '他们', '她们', '它们',
-            'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'for',
-            'with', 'on', 'in', 'at', 'to', 'of', 'by', 'from', 'as', 'is',
-            'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might',
-            '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
-        }
-        
-        return [token for token in tokens if token.lower() not in stop_words]
+        return [token for token in tokens if token.lower() not in _STOP_WORDS]
     
-    def build_index(self, force_rebuild: bool = False) -> bool:
+    def build_index(self, force_rebuild: bool = False, workers: int = 1,
+                    changed_paths: Optional[Set[str]] = None) -> bool:
         """构建搜索索引
-        
+
+        默认以增量方式构建：未变化的文档直接复用已有索引条目，只对新增、修改的文档
+        重新提取和分词，并移除已删除的文档。文件修改时间变化但内容哈希相同（例如
+        CI 重新检出代码）时同样视为未变化。
+        构建在构建锁内进行，完成后发布新的索引快照，构建期间的搜索继续使用旧快照。
+
+        Args:
+            force_rebuild: 是否强制重新构建
+            workers: 文本提取和分词使用的进程数，1为串行，0表示使用全部CPU核心
+            changed_paths: 已知变化的文档相对路径（来自目录监视），给出时增量构建只检查
+                这些文档，不再遍历整个文档目录；完整重建时忽略
+
+        Returns:
+            是否构建成功
+        """
+        with self._build_lock:
+            result = self._build_index(force_rebuild, workers, changed_paths)
+            self._publish_snapshot()
+            return result
+
+    def _build_index(self, force_rebuild: bool = False, workers: int = 1,
+                     changed_paths: Optional[Set[str]] = None) -> bool:
+        """build_index 的实现，调用方需持有构建锁"""
+        print(f"开始构建搜索索引，文档目录: {self.docs_dir}")
+
+        settings_signature = self._settings_signature()
+        # 分词配置可能已变化，缓存的映射表和查询分词结果不再可靠
+        self._reset_term_normalizer()
+        self._query_token_cache.clear()
+        self._highlight_cache.clear()
+        incremental = not force_rebuild and bool(self._index) and \
+            self._metadata.get("settings_signature") == settings_signature
+        if not force_rebuild and self._index and not incremental:
+            print("索引配置已变化，执行完整重建")
+        previous_index = self._index if incremental else {}
+
+        # 按遍历顺序记录文档路径，待处理文档稍后统一（可并行）分词
+        doc_order = []
+        reused_docs = {}
+        pending_docs = []
+        modified_times = {}
+
+        # 遍历文档目录；给出了变化路径时只检查这些文档，其余文档直接复用
+        for file_rel_path, file_path in self._iter_doc_files(previous_index, changed_paths if incremental else None):
+            previous = previous_index.get(file_rel_path)
+            if file_path is None:
+                reused_docs[file_rel_path] = previous
+                doc_order.append(file_rel_path)
+                continue
+
+            try:
+                file_mtime = os.path.getmtime(file_path)
+                # 修改时间未变化，直接复用
+                if previous is not None and previous.get('modified_time') == file_mtime:
+                    reused_docs[file_rel_path] = previous
+                    doc_order.append(file_rel_path)
+                    continue
+
+                with open(file_path, 'rb') as f:
+                    raw_content = f.read()
+                content_hash = hashlib.sha256(raw_content).hexdigest()
+
+                # 内容未变化，仅更新修改时间
+                if previous is not None and previous.get('content_hash') == content_hash:
+                    reused_docs[file_rel_path] = previous
+                    doc_order.append(file_rel_path)
+                    modified_times[file_rel_path] = file_mtime
+                    continue
+
+                pending_docs.append((file_rel_path, raw_content.decode('utf-8'), file_mtime, content_hash))
+                doc_order.append(file_rel_path)
+
+            except Exception as e:
+                print(f"处理文件 {file_rel_path} 失败: {e}")
+                # 读取失败时保留旧条目，避免文档从索引中意外消失
+                if previous is not None:
+                    reused_docs[file_rel_path] = previous
+                    doc_order.append(file_rel_path)
+
+        indexed_docs = self._index_documents(pending_docs, workers)
+        return self._commit_documents(doc_order, reused_docs, indexed_docs, previous_index,
+                                      incremental, modified_times, settings_signature)
+
+    def _commit_documents(self, doc_order: List[str], reused_docs: Dict[str, Dict[str, Any]],
+                          indexed_docs: Dict[str, Dict[str, Any]], previous_index: Any,
+                          incremental: bool, modified_times: Dict[str, float], settings_signature: str) -> bool:
+        """把重新索引的文档写入新分段并保存为新的一代索引
+
+        增量构建时已有的分段保持不变：新增和修改的文档写入一个新的小分段，修改和删除的
+        文档只在所属分段的删除标记位图中标记，只有修改时间变化的文档记录在分段清单中，
+        写入量与变化的文档数成正比。完整重建时全部文档写入一个分段。
+
+        Args:
+            doc_order: 文档路径顺序（新分段中的 doc_id 顺序）
+            reused_docs: 直接复用的文档条目
+            indexed_docs: 重新索引的文档条目
+            previous_index: 增量构建的基准索引，完整重建时为空
+            incremental: 是否为增量构建
+            modified_times: 内容未变化、只有修改时间变化的文档路径到新修改时间的映射
+            settings_signature: 分词配置签名
+
+        Returns:
+            是否构建成功
+        """
+        # 按遍历顺序合并结果，保证串行与并行构建的输出一致
+        new_documents = {}
+        added_docs = []
+        modified_docs = []
+        kept_docs = set()
+        for file_rel_path in doc_order:
+            if file_rel_path in reused_docs:
+                kept_docs.add(file_rel_path)
+            elif file_rel_path in indexed_docs:
+                kept_docs.add(file_rel_path)
+                new_documents[file_rel_path] = indexed_docs[file_rel_path]
+                if file_rel_path in previous_index:
+                    modified_docs.append(file_rel_path)
+                else:
+                    added_docs.append(file_rel_path)
+            elif file_rel_path in previous_index:
+                kept_docs.add(file_rel_path)
+
+        deleted_docs = [path for path in previous_index if path not in kept_docs]
+
+        if incremental and not (added_docs or modified_docs or deleted_docs or modified_times):
+            print("搜索索引已是最新，无需更新")
+            return True
+
+        # 更新元数据
+        if incremental:
+            # 增量修正全局统计信息
+            token_delta = sum(new_documents[path]['token_count'] for path in added_docs + modified_docs)
+            token_delta -= sum(previous_index[path]['token_count'] for path in modified_docs + deleted_docs)
+            self._metadata["document_count"] += len(added_docs) - len(deleted_docs)
+            self._metadata["token_count"] += token_delta
+        else:
+            self._metadata["document_count"] = len(new_documents)
+            self._metadata["token_count"] = sum(doc['token_count'] for doc in new_documents.values())
+        self._metadata["settings_signature"] = settings_signature
+        self._metadata["last_updated"] = datetime.now().isoformat()
+
+        # 修改和删除的文档在原分段中标记删除，已发布快照中的分段对象保持不变
+        segments = []
+        overrides = {}
+        if incremental:
+            removed_docs = modified_docs + deleted_docs
+            segments = self._segments.with_deletions(removed_docs)
+            overrides = dict(self._segments.overrides)
+            for doc_path in removed_docs:
+                overrides.pop(doc_path, None)
+            for doc_path, modified_time in modified_times.items():
+                overrides[doc_path] = dict(overrides.get(doc_path, {}), modified_time=modified_time)
+
+        # 保存索引、搜索建议和元数据；增量构建只按变化的文档更新搜索建议
+        if self._save_generation(segments, new_documents=new_documents, overrides=overrides,
+                                 rebuild_suggestions=not incremental,
+                                 removed_docs=modified_docs + deleted_docs if incremental else None):
+            if incremental:
+                print(f"搜索索引增量更新完成！新增 {len(added_docs)} 个、修改 {len(modified_docs)} 个、"
+                      f"删除 {len(deleted_docs)} 个文档，当前共 {self._metadata['document_count']} 个文档"
+                      f"（{len(self._segments.segments)} 个分段），{self._metadata['token_count']} 个词语")
+            else:
+                print(f"搜索索引构建完成！处理了 {len(new_documents)} 个文档，"
+                      f"索引了 {self._metadata['token_count']} 个词语")
+            return True
+        else:
+            print("搜索索引构建失败")
+            return False
+
+    def index_pages(self, pages: Dict[str, Dict[str, Any]], page_order: List[str]) -> bool:
+        """用站点构建过程中已渲染的页面更新索引
+
+        供 MkDocs 钩子使用：页面文本和标题由 MkDocs 渲染得到，不再重新读取和解析
+        Markdown 文件。页面的内容哈希加上 RENDERED_HASH_PREFIX 后记录在条目中，只复用
+        同样由已渲染页面建立、内容哈希未变化的条目；增量构建（mkdocs serve
+        的 dirty 模式）中未重新渲染的页面保留已有条目，不在 page_order 中的文档被删除。
+        完成后发布新的索引快照。
+
+        Args:
+            pages: 文档相对路径 -> {"title", "text", "headings", "content_hash", "modified_time"}
+            page_order: 站点中全部文档页面的相对路径，顺序即 doc_id 顺序
+
+        Returns:
+            是否构建成功
+        """
+        with self._build_lock:
+            result = self._index_pages(pages, page_order)
+            self._publish_snapshot()
+            return result
+
+    def _index_pages(self, pages: Dict[str, Dict[str, Any]], page_order: List[str]) -> bool:
+        """index_pages 的实现，调用方需持有构建锁"""
+        print(f"开始根据已渲染的 {len(pages)} 个页面更新搜索索引")
+        settings_signature = self._settings_signature()
+        self._reset_term_normalizer()
+        self._query_token_cache.clear()
+        self._highlight_cache.clear()
+        incremental = bool(self._index) and self._metadata.get("settings_signature") == settings_signature
+        previous_index = self._index if incremental else {}
+
+        doc_order = []
+        reused_docs = {}
+        indexed_docs = {}
+        modified_times = {}
+        created_at = datetime.now().isoformat()
+        for file_rel_path in page_order:
+            previous = previous_index.get(file_rel_path)
+            page = pages.get(file_rel_path)
+            if page is None:
+                if previous is not None:
+                    reused_docs[file_rel_path] = previous
+                    doc_order.append(file_rel_path)
+                continue
+
+            doc_order.append(file_rel_path)
+            content_hash = RENDERED_HASH_PREFIX + page['content_hash']
+            if previous is not None and previous.get('content_hash') == content_hash:
+                reused_docs[file_rel_path] = previous
+                if previous.get('modified_time') != page['modified_time']:
+                    modified_times[file_rel_path] = page['modified_time']
+                continue
+            try:
+                indexed_docs[file_rel_path] = self._index_text(
+                    file_rel_path, page['title'], page['text'], page['modified_time'],
+                    content_hash, created_at, page.get('headings'))
+            except Exception as e:
+                print(f"处理页面 {file_rel_path} 失败: {e}")
+                if previous is not None:
+                    reused_docs[file_rel_path] = previous
+
+        return self._commit_documents(doc_order, reused_docs, indexed_docs, previous_index,
+                                      incremental, modified_times, settings_signature)
+
+    def _iter_doc_files(self, previous_index: Dict[str, Dict[str, Any]],
+                        changed_paths: Optional[Set[str]] = None):
+        """列出需要检查的文档
+
+        没有给出变化路径时遍历整个文档目录；给出时按已有索引的顺序列出文档，不在
+        变化集合中的文档不访问文件系统，新增文档追加在末尾，已不存在的文档不再列出。
+
+        Args:
+            previous_index: 已有的文档索引
+            changed_paths: 变化的文档相对路径集合
+
+        Returns:
+            (相对路径, 文件路径) 迭代器，文件路径为None表示文档未变化可直接复用
+        """
+        if changed_paths is None:
+            for root, _, files in os.walk(self.docs_dir):
+                for file in files:
+                    if file.endswith('.md'):
+                        file_path = os.path.join(root, file)
+                        yield os.path.relpath(file_path, self.docs_dir), file_path
+            return
+
+        changed = {os.path.normpath(path) for path in changed_paths if path.endswith('.md')}
+        for file_rel_path in previous_index:
+            if file_rel_path not in changed:
+                yield file_rel_path, None
+            else:
+                file_path = os.path.join(self.docs_dir, file_rel_path)
+                if os.path.isfile(file_path):
+                    yield file_rel_path, file_path
+        for file_rel_path in sorted(changed - previous_index.keys()):
+            file_path = os.path.join(self.docs_dir, file_rel_path)
+            if os.path.isfile(file_path):
+                yield file_rel_path, file_path
+
+    def _index_documents(self, pending_docs: List[Tuple[str, str, float, str]],
+                         workers: int = 1) -> Dict[str, Dict[str, Any]]:
+        """对待处理文档执行文本提取和分词
+
+        workers 大于1时使用进程池并行处理，结果按输入顺序返回，与串行处理完全一致。
+
+        Args:
+            pending_docs: (相对路径, 文档内容, 修改时间, 内容哈希) 列表
+            workers: 进程数，1为串行，0表示使用全部CPU核心
+
+        Returns:
+            相对路径到文档索引条目的映射
+        """
+        if not pending_docs:
+            return {}
+
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(pending_docs))
+
+        # 同一次构建中的文档使用相同的创建时间，使输出与处理顺序和进程数无关
+        created_at = datetime.now().isoformat()
+        jobs = [doc + (created_at,) for doc in pending_docs]
+
+        start_time = time.perf_counter()
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_index_worker,
+                                     initargs=(self._metadata,)) as executor:
+                results = list(executor.map(_index_document_worker, jobs, chunksize=chunksize))
+        else:
+            results = [self._timed_index_document(job) for job in jobs]
+        wall_time = time.perf_counter() - start_time
+
+        indexed_docs = {}
+        cpu_time = 0.0
+        for (file_rel_path, _, _, _, _), (doc_index, elapsed, error) in zip(jobs, results):
+            cpu_time += elapsed
+            if error:
+                print(f"处理文件 {file_rel_path} 失败: {error}")
+                continue
+            indexed_docs[file_rel_path] = doc_index
+
+            if len(indexed_docs) % 10 == 0:
+                print(f"已处理 {len(indexed_docs)} 个文档...")
+
+        if workers > 1 and wall_time > 0:
+            speedup = cpu_time / wall_time
+            print(f"并行索引: {workers} 个进程处理 {len(jobs)} 个文档，耗时 {wall_time:.2f} 秒，"
+                  f"串行估计 {cpu_time:.2f} 秒，加速比 {speedup:.2f}x（每核 {speedup / workers:.2f}x）")
+
+        return indexed_docs
+
+    def _timed_index_document(self, job: Tuple[str, str, float, str, str]) -> Tuple[Optional[Dict[str, Any]], float, Optional[str]]:
+        """为单个文档建立索引并记录耗时
+
+        Args:
+            job: (相对路径, 文档内容, 修改时间, 内容哈希, 创建时间)
+
+        Returns:
+            (文档索引条目, 耗时秒数, 错误信息)
+        """
+        start_time = time.perf_counter()
+        try:
+            doc_index = self._index_document(*job)
+            return doc_index, time.perf_counter() - start_time, None
+        except Exception as e:
+            return None, time.perf_counter() - start_time, str(e)
+
+    def _index_document(self, file_rel_path: str, content: str, file_mtime: float,
+                        content_hash: str, created_at: str) -> Dict[str, Any]:
+        """为单个Markdown文档创建索引条目
+
+        Args:
+            file_rel_path: 文档相对于文档目录的路径
+            content: Markdown格式的文档内容
+            file_mtime: 文件修改时间
+            content_hash: 文件内容的SHA-256哈希
+            created_at: 索引条目创建时间
+
+        Returns:
+            文档索引条目
+        """
+        extracted = extract(content)
+        return self._index_text(file_rel_path, self._extract_title(content), extracted.text,
+                                file_mtime, content_hash, created_at, heading_anchors(extracted.sections))
+
+    def _index_text(self, file_rel_path: str, title: str, text: str, file_mtime: float,
+                    content_hash: str, created_at: str,
+                    headings: Optional[List[List[Any]]] = None) -> Dict[str, Any]:
+        """为已提取的纯文本创建文档索引条目
+
+        Args:
+            file_rel_path: 文档相对于文档目录的路径
+            title: 文档标题
+            text: 文档纯文本
+            file_mtime: 文件修改时间
+            content_hash: 文档内容的SHA-256哈希
+            created_at: 索引条目创建时间
+            headings: [层级, 标题, 锚点] 列表（来自渲染后的页面目录），可选
+
+        Returns:
+            文档索引条目
+        """
+        # 分词，限制每个文档的原词语数量；追加的规范词语和复合词中的词语随原词语保留，不占用名额
+        max_tokens = self._metadata["optimization_settings"]["max_tokens_per_document"]
+        positional = self._is_positional()
+        if positional:
+            positioned_tokens = self._tokenize_with_offsets(text, max_tokens)
+            tokens = [token for token, _, _ in positioned_tokens]
+        else:
+            tokens = self._tokenize(text, max_tokens=max_tokens)
+
+        # 创建文档索引
+        doc_index = {
+            'title': title,
+            'path': file_rel_path,
+            'content': text[:1000],  # 保存前1000个字符作为摘要
+            'text': text,  # 完整文本写入文本存储，构建倒排表时从文档记录中移除
+            # 文档长度只计原词语，追加的规范词语不影响长度归一化
+            'token_count': sum(1 for token in tokens if not is_canonical_term(token)),
+            'modified_time': file_mtime,
+            'content_hash': content_hash,
+            'created_at': created_at
+        }
+        if headings is not None:
+            doc_index['headings'] = headings
+        # 标题和小标题作为独立字段索引，小标题字段的每次出现记录所在章节在 headings 中的序号
+        field_terms = {'title': {}, 'heading': {}}
+        for token in self._tokenize(title):
+            field_terms['title'].setdefault(token, []).append(0)
+        for index, heading, _ in self._field_headings(doc_index):
+            for token in self._tokenize(heading):
+                field_terms['heading'].setdefault(token, []).append(index)
+        doc_index['field_terms'] = field_terms
+
+        # 建立倒排索引
+        inverted_index = {}
+        for token in tokens:
+            if token not in inverted_index:
+                inverted_index[token] = 0
+            inverted_index[token] += 1
+
+        doc_index['inverted_index'] = inverted_index
+
+        if positional:
+            term_positions = {}
+            term_offsets = {}
+            for token, position, offset in positioned_tokens:
+                term_positions.setdefault(token, []).append(position)
+                term_offsets.setdefault(token, []).append(offset)
+            doc_index['term_positions'] = term_positions
+            doc_index['term_offsets'] = term_offsets
+        return doc_index
+
+    def _field_headings(self, doc_data: Dict[str, Any]) -> List[Tuple[int, str, Optional[str]]]:
+        """列出计入小标题字段的章节，与文档标题相同的一级标题已计入标题字段
+
         Args:
-            force_rebuild: 是否强制重新构建
-            
+            doc_data: 文档数据
+
         Returns:
-            是否构建成功
+            (章节在 headings 中的序号, 小标题, 锚点) 列表
         """
-        print(f"开始构建搜索索引，文档目录: {self.docs_dir}")
-        
-        if not force_rebuild and self._index:
-            # 检查是否需要更新
-            needs_update = False
-            for root, _, files in os.walk(self.docs_dir):
-                for file in files:
-                    if file.endswith('.md'):
-                        file_path = os.path.join(root, file)
-                        file_rel_path = os.path.relpath(file_path, self.docs_dir)
-                        file_mtime = os.path.getmtime(file_path)
-                        
-                        # 检查文件是否存在于索引中或是否已修改
-                        if file_rel_path not in self._index or \
-                           'modified_time' not in self._index[file_rel_path] or \
-                           file_mtime > self._index[file_rel_path]['modified_time']:
-                            needs_update = True
-                            break
-                if needs_update:
-                    break
-            
-            if not needs_update:
-                print("搜索索引已是最新，无需更新")
-                return True
-        
-        # 重新初始化索引
-        new_index = {}
-        processed_docs = 0
-        total_tokens = 0
-        
-        # 遍历文档目录
-        for root, _, files in os.walk(self.docs_dir):
-            for file in files:
-                if file.endswith('.md'):
-                    file_path = os.path.join(root, file)
-                    file_rel_path = os.path.relpath(file_path, self.docs_dir)
-                    file_mtime = os.path.getmtime(file_path)
-                    
-                    try:
-                        # 读取文件内容
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        # 提取纯文本
-                        text = self._extract_text_from_markdown(content)
-                        
-                        # 分词
-                        tokens = self._tokenize(text)
-                        
-                        # 限制每个文档的token数量
-                        max_tokens = self._metadata["optimization_settings"]["max_tokens_per_document"]
-                        tokens = tokens[:max_tokens]
-                        
-                        # 创建文档索引
-                        doc_index = {
-                            'title': self._extract_title(content),
-                            'path': file_rel_path,
-                            'content': text[:1000],  # 保存前1000个字符作为摘要
-                            'tokens': tokens,
-                            'token_count': len(tokens),
-                            'modified_time': file_mtime,
-                            'created_at': datetime.now().isoformat()
-                        }
-                        
-                        # 建立倒排索引
-                        inverted_index = {}
-                        for token in tokens:
-                            if token not in inverted_index:
-                                inverted_index[token] = 0
-                            inverted_index[token] += 1
-                        
-                        doc_index['inverted_index'] = inverted_index
-                        new_index[file_rel_path] = doc_index
-                        
-                        processed_docs += 1
-                        total_tokens += len(tokens)
-                        
-                        if processed_docs % 10 == 0:
-                            print(f"已处理 {processed_docs} 个文档...")
-                            
-                    except Exception as e:
-                        print(f"处理文件 {file_rel_path} 失败: {e}")
-        
-        # 保存索引
-        self._index = new_index
-        
-        # 更新元数据
-        self._metadata["document_count"] = processed_docs
-        self._metadata["token_count"] = total_tokens
-        self._metadata["last_updated"] = datetime.now().isoformat()
-        
-        # 保存索引和元数据
-        if self._save_index() and self._save_metadata():
-            print(f"搜索索引构建完成！处理了 {processed_docs} 个文档，索引了 {total_tokens} 个词语")
-            return True
-        else:
-            print("搜索索引构建失败")
-            return False
-    
+        title = doc_data.get('title')
+        return [(index, heading[1], heading[2]) for index, heading in enumerate(doc_data.get('headings') or [])
+                if heading[1] and not (heading[0] == 1 and heading[1] == title)]
+
+    def _settings_signature(self) -> str:
+        """计算影响分词结果和索引结构的配置签名，签名变化时需要完整重建索引
+
+        字段权重只在查询时使用，不计入签名。
+        """
+        settings = {key: value for key, value in self._metadata["optimization_settings"].items()
+                    if key != "field_boosts"}
+        # 默认同义词表不在元数据中，按实际生效的表计算
+        settings["synonyms"] = self._synonym_groups()
+        settings = json.dumps([INDEX_LAYOUT_VERSION, settings], sort_keys=True)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+
     def _extract_title(self, content: str) -> str:
         """从Markdown内容中提取标题
         
@@ -356,7 +1573,7 @@ class SearchIndexOptimizer:
             提取的标题
         """
         # 查找一级标题
-        match = re.search(r'^#\s+(.*?)$', content, re.MULTILINE)
+        match = _TITLE_PATTERN.search(content)
         if match:
             return match.group(1).strip()
         
@@ -372,6 +1589,9 @@ class SearchIndexOptimizer:
     def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """搜索文档
         
+        结果按 (查询, 数量限制, 索引代数) 缓存，缓存大小和存活时间由元数据中的
+        result_cache 配置。
+        
         Args:
             query: 搜索查询
             limit: 返回结果数量限制
@@ -379,19 +1599,356 @@ class SearchIndexOptimizer:
         Returns:
             搜索结果列表
         """
-        if not self._index:
+        # 整个查询只使用这一份快照，期间发布的新索引不影响本次查询
+        snapshot = self._snapshot
+        if not snapshot.documents:
             print("搜索索引为空，请先构建索引")
             return []
         
-        if not query.strip():
+        # 折叠空白字符后的查询作为缓存键，词语大小写会影响分词结果，不做转换
+        query = ' '.join(query.split())
+        if not query:
             return []
+
+        cache_key = (query, limit, snapshot.generation)
+        results = self._result_cache.get(cache_key)
+        if results is None:
+            results = self._execute_search(snapshot, query, limit)
+            self._result_cache.put(cache_key, results)
+        # 返回副本，调用方修改结果不会影响缓存
+        return [dict(result) for result in results]
+
+    def _execute_search(self, snapshot: IndexSnapshot, query: str, limit: int) -> List[Dict[str, Any]]:
+        """在索引快照上执行搜索（不经过结果缓存）
         
+        Args:
+            snapshot: 索引快照
+            query: 折叠空白字符后的搜索查询
+            limit: 返回结果数量限制
+            
+        Returns:
+            搜索结果列表
+        """
         # 分词查询
-        query_tokens = self._tokenize(query)
+        query_tokens = self._tokenize_query(query)
+
+        # 通过全局倒排表选出前 limit 个文档，只访问包含至少一个查询词的文档
+        context = self._ranking_context(snapshot)
+        restricted = False
+        phrases = _PHRASE_PATTERN.findall(query)
+        if phrases and snapshot.positions:
+            # 引号中的短语必须按原顺序连续出现，直接由倒排表中的词语位置判断
+            phrase_docs = self._exact_phrase_matches(snapshot, phrases)
+            if phrase_docs is not None:
+                if not phrase_docs:
+                    return []
+                context = self._restrict_context(context, query_tokens, phrase_docs)
+                restricted = True
+        elif self._segmentation_mode() == "ngram" and snapshot.positions:
+            # n-gram 模式下优先返回查询中各段中文的 n-gram 位置相邻（即包含完整短语）的文档，
+            # 没有这样的文档时退回到普通的 n-gram 匹配
+            phrase_docs = self._phrase_matches(snapshot, query)
+            if phrase_docs:
+                context = self._restrict_context(context, query_tokens, phrase_docs)
+                restricted = True
+        top_docs = self._ranker.top_k(query_tokens, context, limit)
+
+        # 精确匹配的结果过少时，把少见的英文查询词扩展为编辑距离最小的相近词语重新排序
+        fuzzy_terms = ()
+        fuzzy = dict(DEFAULT_FUZZY_SETTINGS, **self._metadata.get("fuzzy", {}))
+        if fuzzy["enabled"] and not restricted and len(top_docs) < min(limit, fuzzy["min_results"]):
+            expansion, weights, fuzzy_terms = self._fuzzy_expansion(snapshot, query, query_tokens, fuzzy)
+            if expansion:
+                query_tokens = query_tokens + expansion
+                top_docs = self._ranker.top_k(query_tokens, self._ranking_context(snapshot, weights), limit)
+
+        # 只为最终结果读取文档记录、定位章节并生成摘要片段
+        top_doc_ids = {doc_id for doc_id, _ in top_docs}
+        hits = self._hit_offsets(snapshot, top_doc_ids, _bare_terms(query_tokens))
+        sections = self._matched_sections(snapshot, top_doc_ids, query_tokens)
+        results = []
+        for doc_id, score in top_docs:
+            doc_path = snapshot.doc_ids[doc_id]
+            doc_data = snapshot.documents[doc_path]
+            snippet = self._document_snippet(snapshot, doc_id, query, hits.get(doc_id), doc_data['content'],
+                                             extra_terms=fuzzy_terms)
+            section = None
+            anchor = None
+            if doc_id in sections:
+                _, section, anchor = doc_data['headings'][sections[doc_id]]
+
+            results.append({
+                'path': doc_path,
+                'title': doc_data['title'],
+                'section': section,
+                'anchor': anchor,
+                'snippet': snippet,
+                'score': score,
+                'modified_time': doc_data['modified_time']
+            })
+
+        return results
+
+    def _matched_sections(self, snapshot: IndexSnapshot, doc_ids: Set[int],
+                          query_tokens: Tuple[str, ...]) -> Dict[int, int]:
+        """找出各文档中与查询最匹配的小标题
+
+        由小标题字段倒排表中记录的章节序号统计每个小标题命中的查询词种类数，
+        取命中最多（相同时靠前）的小标题。
+
+        Args:
+            snapshot: 索引快照
+            doc_ids: 需要定位章节的文档
+            query_tokens: 查询词语
+
+        Returns:
+            doc_id 到章节在文档 headings 中的序号的映射，没有小标题命中的文档不出现
+        """
+        field = snapshot.fields.get('heading')
+        if not field or not doc_ids:
+            return {}
+        counts = {}
+        for token in set(query_tokens):
+            field_name, term = split_field(token)
+            if field_name not in (None, 'heading'):
+                continue
+            postings = field['postings'].get(term)
+            if not postings:
+                continue
+            for i, doc_sections in enumerate(field['sections'][term]):
+                doc_id = postings[i * 2]
+                if doc_id in doc_ids:
+                    doc_counts = counts.setdefault(doc_id, {})
+                    for section in set(doc_sections):
+                        doc_counts[section] = doc_counts.get(section, 0) + 1
+        return {doc_id: min(doc_counts, key=lambda section: (-doc_counts[section], section))
+                for doc_id, doc_counts in counts.items()}
+
+    def _phrase_matches(self, snapshot: IndexSnapshot, query: str) -> Optional[Set[int]]:
+        """按 n-gram 位置相邻关系查找包含查询中每段中文短语的文档
+        
+        Args:
+            snapshot: 索引快照
+            query: 搜索查询
+            
+        Returns:
+            doc_id 集合；查询中没有切分出多个 n-gram 的中文短语时返回None
+        """
+        matches = None
+        for match in _CHINESE_PATTERN.finditer(query):
+            grams = self._tokenize_with_positions(match.group())
+            if len(grams) < 2:
+                continue
+            phrase_docs = self._adjacent_docs(snapshot, grams)
+            matches = phrase_docs if matches is None else matches & phrase_docs
+            if not matches:
+                break
+        return matches
+
+    def _exact_phrase_matches(self, snapshot: IndexSnapshot, phrases: List[str]) -> Optional[Set[int]]:
+        """查找包含每个引号短语的文档，短语中的词语需按原顺序连续出现
+        
+        Args:
+            snapshot: 索引快照
+            phrases: 引号中的短语列表
+            
+        Returns:
+            doc_id 集合；短语中没有可检索的词语（例如只有停用词）时返回None
+        """
+        matches = None
+        for phrase in phrases:
+            grams = self._tokenize_with_positions(phrase)
+            if not grams:
+                continue
+            phrase_docs = self._adjacent_docs(snapshot, grams)
+            matches = phrase_docs if matches is None else matches & phrase_docs
+            if not matches:
+                return set()
+        return matches
+
+    def _adjacent_docs(self, snapshot: IndexSnapshot, grams: List[Tuple[str, int]]) -> Set[int]:
+        """查找各词语按给定相对位置依次出现的文档
         
-        # 计算文档得分
+        Args:
+            snapshot: 索引快照
+            grams: (词语, 相对位置) 列表
+            
+        Returns:
+            doc_id 集合
+        """
+        # 词语 -> {doc_id: 位置集合}，从文档频率最低的词语开始求交集
+        occurrences = []
+        for token, offset in grams:
+            postings = snapshot.postings.get(token)
+            if not postings:
+                return set()
+            token_positions = snapshot.positions.get(token) or []
+            doc_positions = {postings[i * 2]: positions for i, positions in enumerate(token_positions)}
+            occurrences.append((offset, doc_positions))
+        occurrences.sort(key=lambda item: len(item[1]))
+
+        candidates = set(occurrences[0][1])
+        for _, doc_positions in occurrences[1:]:
+            candidates.intersection_update(doc_positions)
+            if not candidates:
+                return candidates
+
+        base_offset, base_positions = occurrences[0]
+        matched = set()
+        for doc_id in candidates:
+            other_sets = [(offset, set(doc_positions[doc_id])) for offset, doc_positions in occurrences[1:]]
+            for position in base_positions[doc_id]:
+                start = position - base_offset
+                if all(start + offset in positions for offset, positions in other_sets):
+                    matched.add(doc_id)
+                    break
+        return matched
+
+    def _restrict_context(self, context: RankingContext, query_tokens: Tuple[str, ...],
+                          doc_ids: Set[int]) -> RankingContext:
+        """只保留正文和各字段中查询词倒排列表里属于指定文档的条目
+        
+        Args:
+            context: 索引数据视图
+            query_tokens: 查询词语
+            doc_ids: 保留的 doc_id 集合
+            
+        Returns:
+            倒排表被替换为过滤结果的索引数据视图
+        """
+        terms = _bare_terms(query_tokens)
+        fields = {name: index._replace(postings=_filter_postings(index.postings, terms, doc_ids))
+                  for name, index in (context.fields or {}).items()}
+        return context._replace(postings=_filter_postings(context.postings, terms, doc_ids), fields=fields)
+
+    def _fuzzy_expansion(self, snapshot: IndexSnapshot, query: str, query_tokens: Tuple[str, ...],
+                         settings: Dict[str, Any]) -> Tuple[Tuple[str, ...], Dict[str, float], Tuple[str, ...]]:
+        """为少见的英文查询词查找拼写相近的索引词语
+
+        只扩展文档频率低于 min_results 的词语，允许的编辑距离按词语长度确定，
+        每个词语只取编辑距离最小的若干个候选（只有大小写不同的词语距离为0）。
+        删除字典中是原词语，扩展的查询词语是候选的规范词语，并保留原查询词的字段限定。
+
+        Args:
+            snapshot: 索引快照
+            query: 搜索查询
+            query_tokens: 查询词语（规范词语）
+            settings: 模糊匹配配置
+
+        Returns:
+            (扩展的查询词语, 扩展词语到得分权重的映射, 需要高亮的候选原词语)；
+            编辑距离为 d 的词语权重为 1 / (1 + d)
+        """
+        if snapshot.segments is None:
+            return (), {}, ()
+        normalizer = self._term_normalizer()
+        normalize = normalizer.normalize if normalizer is not None else (lambda term: term)
+        bare_terms = set(_bare_terms(query_tokens))
+        expansion = []
+        weights = {}
+        candidates = []
+        for token in dict.fromkeys(self._parse_query(query, normalize=False)):
+            field, term = split_field(token)
+            distance = auto_distance(term, settings["max_distance"])
+            # 组成同义短语的词语已被替换为短语的规范词语，不单独扩展
+            if not distance or not is_fuzzy_term(term) or normalize(term) not in bare_terms:
+                continue
+            postings = snapshot.postings.get(normalize(term))
+            if postings and len(postings) // 2 >= settings["min_results"]:
+                continue
+            matches = {candidate: candidate_distance
+                       for candidate, candidate_distance in snapshot.segments.fuzzy_lookup(term, distance).items()
+                       if normalize(candidate) not in bare_terms}
+            doc_freqs = {candidate: len(snapshot.postings.get(candidate) or []) // 2 for candidate in matches}
+            for candidate, candidate_distance in closest_terms(matches, doc_freqs, settings["max_expansions"]):
+                canonical = normalize(candidate)
+                expansion.append(canonical if field is None else field + FIELD_SEPARATOR + canonical)
+                weights[canonical] = max(weights.get(canonical, 0.0), 1.0 / (1 + candidate_distance))
+                candidates.append(candidate)
+        return tuple(dict.fromkeys(expansion)), weights, tuple(candidates)
+
+    def _ranking_context(self, snapshot: IndexSnapshot,
+                         term_weights: Optional[Dict[str, float]] = None) -> RankingContext:
+        """构造排序算法使用的索引快照数据视图，字段权重取自 optimization_settings.field_boosts
+
+        Args:
+            snapshot: 索引快照
+            term_weights: 词语到得分权重（不大于1）的映射，用于降低模糊匹配扩展词语的得分
+
+        Returns:
+            索引数据视图
+        """
+        idf_table = snapshot.idf
+        doc_count = len(snapshot.doc_ids)
+        term_weights = term_weights or {}
+
+        def idf(token: str) -> float:
+            value = idf_table.get(token)
+            if value is None:
+                postings = snapshot.postings.get(token) or []
+                value = bm25_idf(doc_count, len(postings) // 2)
+            return value * term_weights.get(token, 1.0)
+
+        def max_score(token: str, k1: float, b: float) -> Optional[float]:
+            if snapshot.score_bound_params != (k1, b):
+                return None
+            return snapshot.max_scores.get(token)
+
+        boosts = dict(DEFAULT_FIELD_BOOSTS, **self._metadata["optimization_settings"].get("field_boosts", {}))
+        fields = {name: FieldIndex(field['postings'], field['doc_lengths'], field['avg_doc_length'], boosts[name])
+                  for name, field in snapshot.fields.items() if boosts.get(name)}
+        return RankingContext(snapshot.postings, snapshot.doc_lengths, idf, snapshot.avg_doc_length, max_score,
+                              fields=fields, body_boost=boosts[BODY_FIELD])
+
+    def set_ranking(self, settings: Dict[str, Any]):
+        """切换排序算法并保存到元数据
+
+        BM25 的 k1/b 与构建索引时不同时，在下次构建前使用较宽松的得分上界。
+
+        Args:
+            settings: 排序配置，如 {"algorithm": "legacy"} 或 {"algorithm": "bm25", "k1": 1.5}
+        """
+        ranking = dict(DEFAULT_RANKING_SETTINGS, **settings)
+        self._ranker = create_ranker(ranking)
+        self._metadata["ranking"] = ranking
+        # 排序算法变化后缓存的结果不再有效
+        self._result_cache.clear()
+
+    def _create_result_cache(self) -> LRUCache:
+        """根据元数据中的配置创建搜索结果缓存"""
+        settings = dict(DEFAULT_RESULT_CACHE_SETTINGS, **self._metadata.get("result_cache", {}))
+        return LRUCache(settings["size"], settings["ttl_seconds"])
+
+    def set_result_cache(self, settings: Dict[str, Any]):
+        """修改搜索结果缓存配置并保存到元数据，已缓存的结果被丢弃
+        
+        Args:
+            settings: 缓存配置，如 {"size": 1024, "ttl_seconds": 60}；size 为0时关闭缓存
+        """
+        result_cache = dict(DEFAULT_RESULT_CACHE_SETTINGS, **settings)
+        self._metadata["result_cache"] = result_cache
+        self._result_cache = self._create_result_cache()
+
+    def _search_by_scan(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """逐文档扫描的搜索实现，用于校验倒排表搜索结果
+
+        Args:
+            query: 搜索查询
+            limit: 返回结果数量限制
+
+        Returns:
+            搜索结果列表
+        """
+        snapshot = self._snapshot
+        if not snapshot.documents or not query.strip():
+            return []
+
+        query_tokens = _bare_terms(self._tokenize_query(query))
+        forward_index = self._forward_term_counts(snapshot)
+
         results = []
-        for doc_path, doc_data in self._index.items():
+        for doc_path, doc_data in snapshot.documents.items():
+            doc_data = dict(doc_data, inverted_index=forward_index.get(doc_path, {}))
             score = self._calculate_relevance_score(query_tokens, doc_data)
             if score > 0:
                 # 生成摘要片段
@@ -424,8 +1981,8 @@ class SearchIndexOptimizer:
             return 0
         
         score = 0.0
-        doc_tokens = set(doc_data['tokens'])
         doc_inverted_index = doc_data.get('inverted_index', {})
+        doc_tokens = set(doc_inverted_index)
         
         # 基础得分：查询词出现在文档中的比例
         matched_tokens = set(query_tokens) & doc_tokens
@@ -447,13 +2004,111 @@ class SearchIndexOptimizer:
         
         return score
     
-    def _generate_snippet(self, query: str, content: str, max_length: int = 200) -> str:
+    def _hit_offsets(self, snapshot: IndexSnapshot, doc_ids: Set[int],
+                     query_tokens: Tuple[str, ...]) -> Dict[int, List[Tuple[int, int, str]]]:
+        """从倒排表中取出查询词在指定文档中的字节区间
+        
+        普通词语的区间长度就是词语本身的长度；规范词语（如 "~featur"、"~VSCode"）对应的原文
+        各处不同（"featured"、"Visual Studio Code"），区间长度按命中位置的原文确定。
+        
+        Args:
+            snapshot: 索引快照
+            doc_ids: 需要生成摘要的文档
+            query_tokens: 查询词语
+            
+        Returns:
+            doc_id 到 (起始字节, 结束字节, 词语) 列表的映射；没有字节偏移时为空
+        """
+        hits = {}
+        if not doc_ids or not snapshot.offsets:
+            return hits
+        for token in set(query_tokens):
+            postings = snapshot.postings.get(token)
+            if not postings:
+                continue
+            token_offsets = snapshot.offsets.get(token) or []
+            token_bytes = len(token.encode('utf-8'))
+            surface_pattern = None
+            if is_canonical_term(token) and snapshot.texts is not None:
+                surface_pattern = self._surface_pattern(token)
+            for i, doc_offsets in enumerate(token_offsets):
+                doc_id = postings[i * 2]
+                if doc_id not in doc_ids:
+                    continue
+                if surface_pattern is None:
+                    hits.setdefault(doc_id, []).extend(
+                        (offset, offset + token_bytes, token) for offset in doc_offsets)
+                    continue
+                for offset in doc_offsets:
+                    window = snapshot.texts.read_bytes(doc_id, offset, offset + SURFACE_WINDOW_BYTES)
+                    match = surface_pattern.match(window.decode('utf-8', errors='ignore'))
+                    surface_bytes = len(match.group().encode('utf-8')) if match else token_bytes
+                    hits.setdefault(doc_id, []).append((offset, offset + surface_bytes, token))
+        return hits
+
+    def _surface_pattern(self, canonical: str) -> Optional[re.Pattern]:
+        """匹配规范词语在原文中对应文本的正则：同义词为同组的各个同义词，词干为英文单词
+
+        Args:
+            canonical: 规范词语
+
+        Returns:
+            在命中位置使用 match 的正则
+        """
+        normalizer = self._term_normalizer()
+        aliases = normalizer.aliases.get(canonical, ()) if normalizer is not None else ()
+        if aliases:
+            return self._highlight_pattern(tuple(aliases))
+        return self._highlight_pattern((), frozenset((canonical,)))
+
+    def _document_snippet(self, snapshot: IndexSnapshot, doc_id: int, query: str,
+                          hits: Optional[List[Tuple[int, int, str]]], content: str,
+                          max_length: int = SNIPPET_LENGTH, extra_terms: Tuple[str, ...] = ()) -> str:
+        """在整篇文档中截取查询词命中最密集的窗口作为摘要
+        
+        没有命中偏移或文本存储时退回到只在文档开头部分查找的 _generate_snippet。
+        
+        Args:
+            snapshot: 索引快照
+            doc_id: 文档序号
+            query: 搜索查询
+            hits: 查询词在文档中的字节区间
+            content: 文档记录中保存的开头部分
+            max_length: 摘要最大长度（字符数）
+            extra_terms: 查询之外需要高亮的词语（模糊匹配的扩展词语）
+            
+        Returns:
+            格式化的摘要
+        """
+        texts = snapshot.texts
+        if not hits or texts is None:
+            return self._generate_snippet(query, content, max_length, extra_terms)
+
+        byte_length = texts.byte_length(doc_id)
+        # 按文档平均每个字符的字节数把摘要长度换算为字节预算
+        budget = max(1, round(max_length * byte_length / max(texts.char_length(doc_id), 1)))
+        start, end = _densest_window(hits, budget)
+        # 命中区域两侧平均留出上下文
+        start = max(0, start - max(0, budget - (end - start)) // 2)
+        end = min(byte_length, max(end, start + budget))
+        start = max(0, min(start, end - budget))
+        # 窗口边界可能落在多字节字符中间，解码时丢弃不完整的字节
+        snippet = texts.read_bytes(doc_id, start, end).decode('utf-8', errors='ignore')
+        if start > 0:
+            snippet = "..." + snippet
+        if end < byte_length:
+            snippet = snippet + "..."
+        return self._highlight_snippet(query, snippet, extra_terms)
+
+    def _generate_snippet(self, query: str, content: str, max_length: int = SNIPPET_LENGTH,
+                          extra_terms: Tuple[str, ...] = ()) -> str:
         """生成搜索结果摘要
         
         Args:
             query: 搜索查询
             content: 文档内容
             max_length: 摘要最大长度
+            extra_terms: 查询之外需要高亮的词语
             
         Returns:
             格式化的摘要
@@ -481,13 +2136,111 @@ class SearchIndexOptimizer:
             if len(content) > max_length:
                 snippet = snippet + "..."
         
-        # 高亮查询词
-        for token in self._tokenize(query):
-            # 使用不区分大小写的替换
-            pattern = re.compile(re.escape(token), re.IGNORECASE)
-            snippet = pattern.sub(f"<mark>{token}</mark>", snippet)
+        return self._highlight_snippet(query, snippet, extra_terms)
+
+    def _highlight_snippet(self, query: str, snippet: str, extra_terms: Tuple[str, ...] = ()) -> str:
+        """高亮摘要中的查询词和 extra_terms 中的词语
+        
+        所有查询词合并为一个不区分大小写的正则，一次替换完成，
+        避免后一个词匹配到前一个词已插入的标记。查询词的同义词一并高亮；
+        启用词干提取时，摘要中与查询词词干相同的英文单词也被高亮。
+        """
+        query_terms = _bare_terms(self._tokenize_query(query))
+        terms = tuple(term for term in query_terms if not is_canonical_term(term)) + extra_terms
+        stems = frozenset()
+        normalizer = self._term_normalizer()
+        if normalizer is not None:
+            canonical_terms = [term for term in query_terms if is_canonical_term(term)]
+            terms += tuple(alias for term in canonical_terms for alias in normalizer.aliases.get(term, ()))
+            stems = frozenset(term for term in canonical_terms if term not in normalizer.aliases)
+        pattern = self._highlight_pattern(tuple(dict.fromkeys(terms)), stems)
+        if pattern is None:
+            return snippet
+        if not stems:
+            return pattern.sub(r"<mark>\g<0></mark>", snippet)
+
+        def mark(match: re.Match) -> str:
+            if match.group('word') is not None and normalizer.normalize(match.group()) not in stems:
+                return match.group()
+            return f"<mark>{match.group()}</mark>"
+
+        return pattern.sub(mark, snippet)
+
+    def _tokenize_query(self, query: str) -> Tuple[str, ...]:
+        """对查询分词，结果保存在LRU缓存中
+        
+        "字段:内容" 形式的部分（字段为 title、heading 或 body）分词后的每个词语
+        表示为 "字段:词语"，只在该字段中检索。
+        
+        Args:
+            query: 搜索查询
+            
+        Returns:
+            查询词语元组
+        """
+        return self._query_token_cache.get_or_compute(query, lambda: tuple(self._parse_query(query)))
+
+    def _parse_query(self, query: str, normalize: bool = True) -> List[str]:
+        """拆分查询中限定字段的部分并分词
+
+        Args:
+            query: 搜索查询
+            normalize: 是否把词语替换为规范词语；为False时得到查询中的原词语（用于高亮和模糊匹配）
+
+        Returns:
+            查询词语列表
+        """
+        def tokenize(text: str) -> List[str]:
+            if normalize:
+                return self._tokenize(text, query=True)
+            return self._filter_tokens(self._split_tokens(text))
+
+        tokens = []
+        last_end = 0
+        for match in _FIELD_QUERY_PATTERN.finditer(query):
+            tokens.extend(tokenize(query[last_end:match.start()]))
+            field = match.group(1)
+            tokens.extend(field + FIELD_SEPARATOR + token for token in tokenize(match.group(2)))
+            last_end = match.end()
+        tokens.extend(tokenize(query[last_end:]))
+        return tokens
+
+    def _highlight_pattern(self, query_tokens: Tuple[str, ...],
+                           stems: frozenset = frozenset()) -> Optional[re.Pattern]:
+        """获取查询词的高亮正则，结果保存在LRU缓存中
+        
+        较长的词语排在前面，同一位置优先匹配较长的词语。
+        有词干时正则末尾附加匹配任意英文单词的 word 分组，由调用方判断词干是否相同。
+        
+        Args:
+            query_tokens: 查询词语元组
+            stems: 查询词的词干（规范词语）
+            
+        Returns:
+            编译后的正则，没有查询词时返回None
+        """
+        def compile_pattern() -> Optional[re.Pattern]:
+            alternatives = [re.escape(token) for token in
+                            sorted(set(query_tokens), key=lambda token: (-len(token), token))]
+            if stems:
+                alternatives.append(r'(?P<word>[A-Za-z]+)')
+            if not alternatives:
+                return None
+            return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+        return self._highlight_cache.get_or_compute((query_tokens, stems), compile_pattern)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取搜索缓存的命中统计
         
-        return snippet
+        Returns:
+            各缓存名称到统计信息（条目数、容量、命中、未命中、淘汰次数、命中率）的映射
+        """
+        return {
+            "results": self._result_cache.stats(),
+            "query_tokens": self._query_token_cache.stats(),
+            "highlight_patterns": self._highlight_cache.stats()
+        }
     
     def get_search_suggestions(self, query: str, limit: int = 5) -> List[str]:
         """获取搜索建议
@@ -499,84 +2252,182 @@ class SearchIndexOptimizer:
         Returns:
             搜索建议列表
         """
-        if not self._index or not query.strip():
+        snapshot = self._snapshot
+        if not snapshot.documents or not query.strip():
             return []
         
-        query_lower = query.lower()
-        suggestions = set()
-        
-        # 从文档标题和内容中提取建议
-        for doc_data in self._index.values():
-            # 检查标题
-            title_lower = doc_data['title'].lower()
-            if query_lower in title_lower:
-                suggestions.add(doc_data['title'])
-            
-            # 检查内容中的词语
-            for token in doc_data['tokens']:
-                token_lower = token.lower()
-                if token_lower.startswith(query_lower) and len(token) > len(query):
-                    suggestions.add(token)
-            
-            # 如果建议数量足够，提前返回
-            if len(suggestions) >= limit:
-                break
-        
-        # 按相关性排序（这里简单按长度排序）
-        sorted_suggestions = sorted(suggestions, key=lambda x: (len(x), x))
-        
-        return sorted_suggestions[:limit]
+        # 在前缀索引中查找，建议按文档频率排序；启动后首次使用时加载，并发加载的结果相同
+        prefix_index = snapshot.prefix_index
+        if prefix_index is None:
+            prefix_index = snapshot.prefix_index = self._load_prefix_index(
+                snapshot.postings, snapshot.documents, snapshot.suggestions_file)
+        return prefix_index.suggest(query.strip(), limit)
     
-    def optimize_index(self):
+    def optimize_index(self, background: bool = False) -> Any:
         """优化搜索索引
-        
+
         包括：
-        1. 合并重复索引项
-        2. 清理无效条目
-        3. 优化索引结构
+        1. 清理文档文件已不存在的条目
+        2. 更新文档的修改时间
+        3. 按大小分层的策略合并分段，重写已删除文档较多的分段
+
+        合并在构建锁内进行，搜索继续使用旧快照，不会被阻塞；优化完成后发布新的索引快照。
+
+        Args:
+            background: 是否在后台守护线程中合并，为True时立即返回
+
+        Returns:
+            后台运行时返回合并线程，否则返回是否优化成功
         """
+        if background:
+            thread = threading.Thread(target=self.optimize_index, name="search-index-merge", daemon=True)
+            thread.start()
+            return thread
+        with self._build_lock:
+            result = self._optimize_index()
+            self._publish_snapshot()
+            return result
+
+    def _optimize_index(self) -> bool:
+        """optimize_index 的实现，调用方需持有构建锁"""
         print("开始优化搜索索引...")
-        
-        # 清理无效条目
-        valid_index = {}
-        invalid_count = 0
-        
+
+        # 清理无效条目并更新修改时间，只标记删除和记录覆盖字段，不改写分段
+        invalid_docs = []
+        overrides = dict(self._segments.overrides)
         for doc_path, doc_data in self._index.items():
             full_path = os.path.join(self.docs_dir, doc_path)
             # 检查文件是否存在
-            if os.path.exists(full_path):
-                # 更新修改时间
-                doc_data['modified_time'] = os.path.getmtime(full_path)
-                valid_index[doc_path] = doc_data
-            else:
-                invalid_count += 1
-        
-        # 保存优化后的索引
-        self._index = valid_index
-        self._metadata["document_count"] = len(self._index)
-        
-        if self._save_index() and self._save_metadata():
-            print(f"搜索索引优化完成！清理了 {invalid_count} 个无效条目")
+            if not os.path.exists(full_path):
+                invalid_docs.append(doc_path)
+                overrides.pop(doc_path, None)
+                continue
+            modified_time = os.path.getmtime(full_path)
+            if doc_data.get('modified_time') != modified_time:
+                overrides[doc_path] = dict(overrides.get(doc_path, {}), modified_time=modified_time)
+
+        segments = self._segments.with_deletions(invalid_docs)
+        merges = plan_merges(segments)
+        if not (invalid_docs or merges or overrides != self._segments.overrides
+                or any(segment.name is None for segment in segments)):
+            print(f"搜索索引已是最优，当前共 {len(segments)} 个分段")
+            return True
+
+        self._metadata["document_count"] = len(self._doc_ids) - len(invalid_docs)
+        if self._save_generation(segments, merges=merges, overrides=overrides, rebuild_suggestions=True):
+            print(f"搜索索引优化完成！清理了 {len(invalid_docs)} 个无效条目，合并了 "
+                  f"{sum(len(group) for group in merges)} 个分段，当前共 {len(self._segments.segments)} 个分段")
             return True
         else:
             print("搜索索引优化失败")
             return False
-    
-    def schedule_index_update(self, interval_seconds: int = 3600):
+
+    def schedule_index_update(self, interval_seconds: int = 3600, background: bool = False,
+                              workers: int = 1) -> Optional[threading.Thread]:
         """安排定期索引更新
         
+        每次更新构建下一代索引并原子地发布为新快照，更新期间的搜索不会被阻塞。
+        
         Args:
             interval_seconds: 更新间隔（秒），默认1小时
+            background: 是否在后台守护线程中运行，为False时阻塞当前线程
+            workers: 每次更新使用的进程数
+            
+        Returns:
+            后台运行时返回更新线程，否则返回None
         """
         print(f"已设置定期索引更新，间隔: {interval_seconds} 秒")
+        self._update_stop.clear()
+        
+        if background:
+            if self._update_thread is not None and self._update_thread.is_alive():
+                print("定期索引更新已在运行")
+                return self._update_thread
+            self._update_thread = threading.Thread(
+                target=self._run_index_updates, args=(interval_seconds, workers),
+                name="search-index-update", daemon=True)
+            self._update_thread.start()
+            return self._update_thread
         
         try:
-            while True:
-                time.sleep(interval_seconds)
-                print("执行定期索引更新...")
-                self.build_index()
+            self._run_index_updates(interval_seconds, workers)
         except KeyboardInterrupt:
             print("定期索引更新已停止")
+        return None
+
+    def _run_index_updates(self, interval_seconds: float, workers: int):
+        """定期执行增量构建，直到收到停止信号"""
+        while not self._update_stop.wait(interval_seconds):
+            print("执行定期索引更新...")
+            try:
+                self.build_index(workers=workers)
+            except Exception as e:
+                # 构建失败时继续使用当前快照，等待下一次更新
+                print(f"定期索引更新失败: {e}")
+
+    def watch_index_updates(self, debounce_seconds: float = 0.5, poll_interval: float = 0.5,
+                            backend: str = "auto", background: bool = False,
+                            workers: int = 1) -> Optional[threading.Thread]:
+        """监视文档目录，文档变化后立即增量更新索引
+
+        与定期更新相比，空闲时只检查目录和文档的修改时间，不读取文件；文档变化后经过
+        防抖合并，只把变化的文档交给增量构建，索引通常在一秒内反映修改。
+
+        Args:
+            debounce_seconds: 最后一次变化后等待的安静时间（秒）
+            poll_interval: 轮询间隔（秒）
+            backend: 监视后端，"auto"、"watchdog" 或 "polling"
+            background: 是否在后台守护线程中运行，为False时阻塞当前线程
+            workers: 每次更新使用的进程数
+
+        Returns:
+            后台运行时返回监视线程，否则返回None
+        """
+        watcher = create_watcher(self.docs_dir, backend)
+        print(f"开始监视文档目录: {self.docs_dir}（{type(watcher).__name__}）")
+        self._update_stop.clear()
+
+        def on_change(changed_paths: Set[str]):
+            print(f"检测到 {len(changed_paths)} 个文档变化，更新索引...")
+            try:
+                self.build_index(workers=workers, changed_paths=changed_paths)
+            except Exception as e:
+                # 构建失败时继续使用当前快照，等待下一次变化
+                print(f"索引更新失败: {e}")
+
+        def run():
+            try:
+                watch_changes(watcher, on_change, self._update_stop, poll_interval, debounce_seconds)
+            finally:
+                watcher.close()
+
+        if background:
+            if self._update_thread is not None and self._update_thread.is_alive():
+                watcher.close()
+                print("索引更新已在运行")
+                return self._update_thread
+            self._update_thread = threading.Thread(target=run, name="search-index-watch", daemon=True)
+            self._update_thread.start()
+            return self._update_thread
+
+        try:
+            run()
+        except KeyboardInterrupt:
+            print("文档目录监视已停止")
+        return None
+
+    def stop_index_updates(self, timeout: Optional[float] = None):
+        """停止定期索引更新或文档目录监视
+        
+        Args:
+            timeout: 等待后台线程结束的最长秒数，None表示一直等待
+        """
+        self._update_stop.set()
+        if self._update_thread is not None:
+            self._update_thread.join(timeout)
+            if not self._update_thread.is_alive():
+                self._update_thread = None
+                print("定期索引更新已停止")
     
     def export_index_stats(self) -> Dict[str, Any]:
         """导出索引统计信息
@@ -584,13 +2435,11 @@ class SearchIndexOptimizer:
         Returns:
             索引统计信息
         """
-        # 计算词语频率
+        # 计算词语频率，追加的规范词语不是文档中的词语，不计入统计
         token_frequency = {}
-        for doc_data in self._index.values():
-            for token, count in doc_data.get('inverted_index', {}).items():
-                if token not in token_frequency:
-                    token_frequency[token] = 0
-                token_frequency[token] += count
+        for token, postings in self._snapshot.postings.items():
+            if not is_canonical_term(token):
+                token_frequency[token] = sum(postings[1::2])
         
         # 获取最常见的词语
         top_tokens = sorted(token_frequency.items(), key=lambda x: x[1], reverse=True)[:20]
@@ -600,21 +2449,154 @@ class SearchIndexOptimizer:
             "top_tokens": top_tokens,
             "average_tokens_per_document": self._metadata["token_count"] / self._metadata["document_count"] if self._metadata["document_count"] > 0 else 0,
             "unique_tokens": len(token_frequency),
-            "index_size_kb": os.path.getsize(self.index_file) / 1024 if os.path.exists(self.index_file) else 0
+            "index_size_kb": self._index_size() / 1024,
+            "text_store_size_kb": self._segment_files_size(TEXT_SUFFIX, [self.text_store_file]) / 1024,
+            "fuzzy_index_size_kb": self._segment_files_size(FUZZY_SUFFIX, []) / 1024,
+            "segment_count": len(self._segments.segments),
+            "caches": self.cache_stats()
         }
         
         return stats
 
+    def _index_size(self) -> int:
+        """计算索引文件（各分段的二进制索引，或旧版本的索引文件）占用的字节数"""
+        return self._segment_files_size(INDEX_SUFFIX, [self.binary_index_file, self.index_file, self.postings_file])
+
+    def _segment_files_size(self, suffix: str, legacy_files: List[str]) -> int:
+        """计算当前一代各分段中某类文件（或旧版本的同类文件）占用的字节数"""
+        paths = legacy_files + [os.path.join(self.data_dir, segment.name + suffix)
+                                for segment in self._segments.segments if segment.name is not None]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def _bare_terms(query_tokens: Tuple[str, ...]) -> Tuple[str, ...]:
+    """去掉查询词的字段限定，按首次出现的顺序去重"""
+    return tuple(dict.fromkeys(split_field(token)[1] for token in query_tokens))
+
+
+def _filter_postings(postings: Any, terms: Tuple[str, ...], doc_ids: Set[int]) -> Dict[str, List[int]]:
+    """只保留指定词语的倒排列表中属于指定文档的条目
+
+    Args:
+        postings: 词语到倒排列表的映射
+        terms: 词语
+        doc_ids: 保留的 doc_id 集合
+
+    Returns:
+        词语到过滤后倒排列表的映射
+    """
+    restricted = {}
+    for term in terms:
+        term_postings = postings.get(term)
+        if not term_postings:
+            continue
+        filtered = []
+        for i in range(0, len(term_postings), 2):
+            if term_postings[i] in doc_ids:
+                filtered.extend((term_postings[i], term_postings[i + 1]))
+        restricted[term] = filtered
+    return restricted
+
+
+def _densest_window(hits: List[Tuple[int, int, str]], budget: int) -> Tuple[int, int]:
+    """找出字节跨度不超过预算、覆盖查询词种类最多（其次命中次数最多）的命中窗口
+
+    Args:
+        hits: (起始字节, 结束字节, 词语) 列表，不能为空
+        budget: 窗口的字节预算
+
+    Returns:
+        窗口内第一个命中的起始字节和最后一个命中的结束字节
+    """
+    hits = sorted(hits)
+    counts = {}
+    best_key = None
+    best = (hits[0][0], hits[0][1])
+    # 双指针滑动窗口，counts 记录 hits[i:j] 中每个词语的命中次数
+    j = 0
+    for i, (start, _, token) in enumerate(hits):
+        if j == i:
+            # 单个命中超出预算时窗口只包含它自己
+            counts[token] = counts.get(token, 0) + 1
+            j += 1
+        while j < len(hits) and hits[j][1] - start <= budget:
+            counts[hits[j][2]] = counts.get(hits[j][2], 0) + 1
+            j += 1
+        key = (sum(1 for count in counts.values() if count), j - i)
+        if best_key is None or key > best_key:
+            best_key = key
+            best = (start, max(end for _, end, _ in hits[i:j]))
+        counts[token] -= 1
+    return best
+
+
+# 并行索引工作进程中的优化器实例，仅用于文本提取和分词
+_worker_optimizer = None
+
+
+def _init_index_worker(metadata: Dict[str, Any]):
+    """初始化并行索引工作进程
+
+    工作进程只需要分词配置，不加载磁盘上的索引文件。
+
+    Args:
+        metadata: 索引元数据（包含分词配置）
+    """
+    global _worker_optimizer
+    _worker_optimizer = SearchIndexOptimizer.__new__(SearchIndexOptimizer)
+    _worker_optimizer._metadata = metadata
+    _worker_optimizer._reset_term_normalizer()
+
+
+def _index_document_worker(job: Tuple[str, str, float, str, str]) -> Tuple[Optional[Dict[str, Any]], float, Optional[str]]:
+    """并行索引工作进程的任务入口
+
+    Args:
+        job: (相对路径, 文档内容, 修改时间, 内容哈希, 创建时间)
+
+    Returns:
+        (文档索引条目, 耗时秒数, 错误信息)
+    """
+    return _worker_optimizer._timed_index_document(job)
+
+
 def main():
     """主函数 - 用于演示和测试搜索索引优化器"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='搜索索引优化工具')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='文本提取和分词使用的进程数，默认1（串行），0表示使用全部CPU核心')
+    parser.add_argument('--export-json', metavar='DIR',
+                        help='构建完成后将索引额外导出为JSON格式到指定目录')
+    parser.add_argument('--ranking', choices=['bm25', 'legacy'],
+                        help='搜索排序算法，默认使用元数据中的配置（bm25）')
+    parser.add_argument('--migrate', action='store_true',
+                        help='将已有的search_index.json迁移为精简索引结构后退出')
+    parser.add_argument('--watch', action='store_true',
+                        help='构建完成后持续监视文档目录，文档变化时增量更新索引')
+    parser.add_argument('--watch-backend', choices=['auto', 'watchdog', 'polling'], default='auto',
+                        help='文档目录监视后端，默认在安装了watchdog时使用事件监视，否则轮询')
+    args = parser.parse_args()
+
     # 创建搜索索引优化器实例
     index_optimizer = SearchIndexOptimizer()
+
+    if args.migrate:
+        index_optimizer.migrate_index()
+        return
+
+    if args.ranking:
+        index_optimizer.set_ranking({"algorithm": args.ranking})
     
     # 构建索引
-    index_optimizer.build_index(force_rebuild=True)
+    index_optimizer.build_index(force_rebuild=True, workers=args.workers)
     
     # 优化索引
     index_optimizer.optimize_index()
+
+    if args.export_json:
+        index_optimizer.export_json_index(args.export_json)
     
     # 执行搜索测试
     test_queries = ["安装", "API", "搜索", "配置", "示例"]
@@ -628,6 +2610,8 @@ def main():
             for i, result in enumerate(results, 1):
                 print(f"{i}. {result['title']} (得分: {result['score']:.4f})")
                 print(f"   路径: {result['path']}")
+                if result['anchor']:
+                    print(f"   章节: {result['section']} (#{result['anchor']})")
                 print(f"   摘要: {result['snippet']}")
                 print()
         else:
@@ -646,9 +2630,14 @@ def main():
     print(f"平均每文档词语数: {stats['average_tokens_per_document']:.2f}")
     print(f"唯一词语数: {stats['unique_tokens']}")
     print(f"索引文件大小: {stats['index_size_kb']:.2f} KB")
+    print(f"文本存储大小: {stats['text_store_size_kb']:.2f} KB")
+    print(f"模糊匹配字典大小: {stats['fuzzy_index_size_kb']:.2f} KB")
     print("\n最常见的20个词语:")
     for token, count in stats['top_tokens'][:10]:  # 只显示前10个
         print(f"  '{token}': {count} 次")
 
+    if args.watch:
+        index_optimizer.watch_index_updates(backend=args.watch_backend, workers=args.workers)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
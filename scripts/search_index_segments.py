@@ -0,0 +1,801 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+索引分段模块 - 关联需求FR-007
+
+此模块把搜索索引组织为多个不可变的分段，包括：
+1. 由文档条目构建分段（倒排表、位置、偏移、字段倒排表和文档文本）
+2. 分段文件的写入和打开，分段写入后不再修改
+3. 删除标记位图：修改或删除的文档只在所属分段的位图中标记
+4. 跨分段的合并视图：按分段顺序读取各分段，跳过已删除的文档
+5. 按大小分层的合并策略，以及由分段还原文档条目用于合并
+
+一代索引目录中的分段布局：
+
+    gen-0000000N/
+        segments.json               {"version": 1, "segments": [{"name", "doc_count", "deleted"}],
+                                     "overrides": {文档路径: {"modified_time": ...}}}
+        seg-0000000K-0.bin          分段的二进制索引，doc_id 为分段内序号
+        seg-0000000K-0.text         分段的文档文本存储
+        seg-0000000K-0.fields.json  分段的标题、小标题字段倒排表
+        seg-0000000K-0.fuzzy.json   分段词典中英文词语的对称删除字典（模糊匹配）
+
+deleted 为 base64 编码的删除标记位图（第 i 位对应分段内第 i 个文档），没有删除时为 null；
+overrides 记录内容未变化、只有修改时间变化的文档，合并分段时写回文档记录。
+未变化的分段文件从上一代目录硬链接（不支持硬链接时复制），每次提交只写入新分段和
+分段清单。合并视图中的全局 doc_id 按分段顺序、分段内顺序给未删除的文档连续编号。
+"""
+
+import os
+import json
+import math
+import base64
+import shutil
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from search_index_storage import (BinaryIndexReader, TextStoreReader, lean_document, write_binary_index,
+                                  write_text_store)
+from search_ranking import bm25_idf, compute_ranking_stats
+from search_fuzzy import DeletionIndex
+from search_terms import is_canonical_term
+
+SEGMENTS_FILE = 'segments.json'
+INDEX_SUFFIX = '.bin'
+TEXT_SUFFIX = '.text'
+FIELDS_SUFFIX = '.fields.json'
+FUZZY_SUFFIX = '.fuzzy.json'
+SEGMENT_SUFFIXES = (INDEX_SUFFIX, TEXT_SUFFIX, FIELDS_SUFFIX, FUZZY_SUFFIX)
+
+# 合并策略：文档数在同一数量级（以 MERGE_FACTOR 为底）的分段达到 MERGE_FACTOR 个时合并为一个
+MERGE_FACTOR = 4
+# 小于此文档数的分段都归入最低一层，避免大量极小分段各自成层
+MIN_SEGMENT_DOCS = 10
+# 已删除文档占比达到此值的分段单独重写，回收被删除文档占用的空间
+EXPUNGE_DELETES_RATIO = 0.3
+
+
+def segment_name(generation: int, sequence: int) -> str:
+    """第 generation 代写入的第 sequence 个分段的名称"""
+    return f"seg-{generation:08d}-{sequence}"
+
+
+class MemoryIndex:
+    """内存中的分段数据，属性与 BinaryIndexReader 一致
+
+    用于刚构建、尚未写入文件的分段，以及分段之前版本的JSON索引。
+    """
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]], postings: Dict[str, List[int]],
+                 doc_lengths: List[int], positions: Optional[Dict[str, List[List[int]]]] = None,
+                 offsets: Optional[Dict[str, List[List[int]]]] = None, idf: Optional[Dict[str, float]] = None,
+                 max_scores: Optional[Dict[str, float]] = None, meta: Optional[Dict[str, Any]] = None):
+        self.documents = documents
+        self.doc_ids = list(documents.keys())
+        self.doc_count = len(self.doc_ids)
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.positions = positions
+        self.offsets = offsets
+        self.idf = idf if idf is not None else {}
+        self.max_scores = max_scores if max_scores is not None else {}
+        self.meta = meta or {}
+
+    def read_document(self, doc_id: int) -> Dict[str, Any]:
+        """返回文档记录的副本"""
+        return dict(self.documents[self.doc_ids[doc_id]])
+
+    def read_doc_length(self, doc_id: int) -> int:
+        """读取文档长度"""
+        return self.doc_lengths[doc_id]
+
+
+class IndexSegment:
+    """一个不可变分段及其删除标记
+
+    删除文档时创建带有新位图的分段对象，已发布快照中的分段对象不会被修改。
+    name 为 None 表示分段还没有以分段文件的形式保存（旧版本索引），下次保存时重写。
+    """
+
+    __slots__ = ('name', 'index', 'texts', 'fields', 'deleted', 'live_count', 'fuzzy')
+
+    def __init__(self, name: Optional[str], index: Any, texts: Optional[TextStoreReader] = None,
+                 fields: Optional[Dict[str, Dict[str, Any]]] = None, deleted: Optional[bytes] = None,
+                 fuzzy: Optional['_FuzzyDictionary'] = None):
+        """初始化分段
+
+        Args:
+            name: 分段名称
+            index: 分段的索引数据（BinaryIndexReader 或 MemoryIndex）
+            texts: 分段的文档文本存储，没有时为 None
+            fields: 附加字段名 -> {"postings", "sections", "doc_lengths", "avg_doc_length"}，没有时为 None
+            deleted: 删除标记位图，没有删除时为 None
+            fuzzy: 分段词典的对称删除字典（延迟加载），没有时在首次使用时由词典构建
+        """
+        self.name = name
+        self.index = index
+        self.texts = texts
+        self.fields = fields
+        self.deleted = deleted
+        self.live_count = index.doc_count - _count_bits(deleted)
+        self.fuzzy = fuzzy if fuzzy is not None else _FuzzyDictionary(None, index)
+
+    @property
+    def doc_count(self) -> int:
+        return self.index.doc_count
+
+    def is_deleted(self, doc_id: int) -> bool:
+        """分段内的文档是否已被删除"""
+        return self.deleted is not None and bool(self.deleted[doc_id >> 3] & (1 << (doc_id & 7)))
+
+    def with_deletions(self, doc_ids: Sequence[int]) -> 'IndexSegment':
+        """返回额外删除了指定文档的新分段对象
+
+        Args:
+            doc_ids: 分段内的文档序号
+
+        Returns:
+            共享分段数据、删除标记位图为副本的分段
+        """
+        deleted = bytearray(self.deleted or bytes((self.doc_count + 7) // 8))
+        for doc_id in doc_ids:
+            deleted[doc_id >> 3] |= 1 << (doc_id & 7)
+        return IndexSegment(self.name, self.index, self.texts, self.fields, bytes(deleted), self.fuzzy)
+
+    def fuzzy_index(self) -> DeletionIndex:
+        """分段词典的对称删除字典，首次模糊匹配时才读取"""
+        return self.fuzzy.get()
+
+
+class _FuzzyDictionary:
+    """延迟加载的对称删除字典
+
+    打开索引时不读取删除字典文件，只有查询结果不足、需要模糊匹配时才加载。
+    分段文件中没有删除字典时（旧版本索引）由词典构建，构建结果只是缓存，不改变分段的内容。
+    同一分段标记删除后得到的分段对象共享同一个实例，只加载一次。
+    """
+
+    __slots__ = ('path', 'index', 'value', '_lock')
+
+    def __init__(self, path: Optional[str], index: Any):
+        """初始化
+
+        Args:
+            path: 删除字典文件路径，没有时为 None
+            index: 分段的索引数据，没有删除字典文件时由其中的词语构建
+        """
+        self.path = path
+        self.index = index
+        self.value = None
+        self._lock = threading.Lock()
+
+    def get(self) -> DeletionIndex:
+        """返回删除字典，首次调用时加载；并发的搜索线程只有一个执行加载"""
+        value = self.value
+        if value is None:
+            with self._lock:
+                value = self.value
+                if value is None:
+                    value = self.value = self._load()
+        return value
+
+    def _load(self) -> DeletionIndex:
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return DeletionIndex.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"加载模糊匹配字典失败，按分段词典重新构建: {e}")
+        return DeletionIndex.build(self.index.postings.keys())
+
+
+def _count_bits(bitmap: Optional[bytes]) -> int:
+    """位图中置位的个数"""
+    if not bitmap:
+        return 0
+    return sum(bin(byte).count('1') for byte in bitmap)
+
+
+def build_segment(documents: Dict[str, Dict[str, Any]], positional: bool, k1: float, b: float
+                  ) -> Tuple[MemoryIndex, List[bytes], Dict[str, Dict[str, Any]]]:
+    """由文档条目构建分段
+
+    doc_id 为文档在 documents 中的顺序号，每个词语的倒排列表按 doc_id 递增排列，
+    以扁平的 [doc_id, tf, doc_id, tf, ...] 形式存储。同时构建与倒排列表逐项对应的
+    词语位置和字节偏移、标题和小标题字段的倒排表，并按 doc_id 顺序收集文档完整文本。
+    文档记录中的词频、位置、偏移、字段词语和文本不保留在分段的文档记录中（精简结构）。
+
+    Args:
+        documents: 文档路径到文档条目的映射，条目含 inverted_index（或旧结构的 tokens）、
+            term_positions、term_offsets、field_terms 和 text，缺少的部分按空值处理
+        positional: 是否保存词语位置和字节偏移
+        k1: 计算得分上界使用的 BM25 k1 参数
+        b: 计算得分上界使用的 BM25 b 参数
+
+    Returns:
+        (分段数据, 按 doc_id 排列的文档文本（UTF-8）, 字段倒排表)
+    """
+    postings = {}
+    positions = {}
+    offsets = {}
+    texts = []
+    doc_lengths = []
+    records = {}
+    fields = {}
+    for doc_id, (doc_path, doc_data) in enumerate(documents.items()):
+        records[doc_path] = lean_document(doc_data)
+        doc_lengths.append(doc_data.get('token_count', 0))
+        field_terms = doc_data.get('field_terms') or {}
+        for name in field_terms:
+            fields.setdefault(name, {'postings': {}, 'sections': {}, 'doc_lengths': [0] * doc_id})
+        for name, field in fields.items():
+            field_length = 0
+            for token, sections in field_terms.get(name, {}).items():
+                field['postings'].setdefault(token, []).extend((doc_id, len(sections)))
+                field['sections'].setdefault(token, []).append(sections)
+                if not is_canonical_term(token):
+                    field_length += len(sections)
+            field['doc_lengths'].append(field_length)
+        text = doc_data.get('text')
+        if text is None:
+            # 旧索引没有完整文本，以文档记录中的开头部分代替
+            text = doc_data.get('content', '')
+        texts.append(text.encode('utf-8'))
+
+        term_counts = doc_data.get('inverted_index')
+        if term_counts is None:
+            # 旧结构中只有词语列表的文档
+            term_counts = {}
+            for token in doc_data.get('tokens') or []:
+                term_counts[token] = term_counts.get(token, 0) + 1
+        term_positions = doc_data.get('term_positions') or {}
+        term_offsets = doc_data.get('term_offsets') or {}
+        for token, tf in term_counts.items():
+            postings.setdefault(token, []).extend((doc_id, tf))
+            if positional:
+                doc_positions = term_positions.get(token, [])
+                doc_offsets = term_offsets.get(token)
+                if doc_offsets is None or len(doc_offsets) != len(doc_positions):
+                    # 没有记录偏移的旧索引条目，摘要退回到文档开头
+                    doc_offsets = [0] * len(doc_positions)
+                positions.setdefault(token, []).append(doc_positions)
+                offsets.setdefault(token, []).append(doc_offsets)
+
+    for field in fields.values():
+        field['avg_doc_length'] = sum(field['doc_lengths']) / len(doc_lengths) if doc_lengths else 0.0
+    stats = compute_ranking_stats(postings, doc_lengths, k1, b)
+    index = MemoryIndex(records, postings, doc_lengths,
+                        positions=positions if positional else None,
+                        offsets=offsets if positional else None,
+                        idf=stats["idf"], max_scores=stats["max_scores"],
+                        meta={"avg_doc_length": stats["avg_doc_length"],
+                              "bound_k1": stats["k1"], "bound_b": stats["b"]})
+    return index, texts, fields
+
+
+def segment_documents(segment: IndexSegment, overrides: Optional[Dict[str, Dict[str, Any]]] = None
+                      ) -> Dict[str, Dict[str, Any]]:
+    """由分段还原未删除文档的完整文档条目，用于把多个分段合并为一个
+
+    Args:
+        segment: 分段
+        overrides: 文档路径到需要写回文档记录的字段的映射
+
+    Returns:
+        按分段内顺序排列的文档路径到文档条目的映射，条目可直接交给 build_segment
+    """
+    index = segment.index
+    overrides = overrides or {}
+    entries = {}
+    live = {}
+    for doc_id, doc_path in enumerate(index.doc_ids):
+        if segment.is_deleted(doc_id):
+            continue
+        doc_data = index.read_document(doc_id)
+        doc_data.update(overrides.get(doc_path, {}))
+        doc_data['inverted_index'] = {}
+        doc_data['field_terms'] = {name: {} for name in segment.fields or {}}
+        if index.positions is not None:
+            doc_data['term_positions'] = {}
+            doc_data['term_offsets'] = {}
+        if segment.texts is not None:
+            doc_data['text'] = segment.texts.read_bytes(doc_id).decode('utf-8')
+        entries[doc_path] = doc_data
+        live[doc_id] = doc_data
+
+    for token, postings in index.postings.items():
+        token_positions = index.positions.get(token) if index.positions is not None else None
+        token_offsets = index.offsets.get(token) if index.offsets is not None else None
+        for i in range(0, len(postings), 2):
+            doc_data = live.get(postings[i])
+            if doc_data is None:
+                continue
+            doc_data['inverted_index'][token] = postings[i + 1]
+            if token_positions is not None:
+                doc_data['term_positions'][token] = token_positions[i // 2]
+                if token_offsets is not None:
+                    doc_data['term_offsets'][token] = token_offsets[i // 2]
+
+    for name, field in (segment.fields or {}).items():
+        for token, postings in field['postings'].items():
+            for i, sections in enumerate(field['sections'].get(token) or []):
+                doc_data = live.get(postings[i * 2])
+                if doc_data is not None:
+                    doc_data['field_terms'][name][token] = sections
+    return entries
+
+
+def write_segment(directory: str, name: str, index: MemoryIndex, texts: List[bytes],
+                  fields: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, Any]] = None):
+    """把 build_segment 构建的分段写入分段文件
+
+    Args:
+        directory: 目标目录（一代索引的临时目录）
+        name: 分段名称
+        index: 分段数据
+        texts: 按 doc_id 排列的文档文本
+        fields: 字段倒排表
+        meta: 写入二进制索引的附加元数据
+    """
+    base = os.path.join(directory, name)
+    write_binary_index(base + INDEX_SUFFIX, index.documents, index.postings, index.doc_lengths,
+                       index.idf, index.max_scores, positions=index.positions, offsets=index.offsets,
+                       meta=dict(index.meta, **(meta or {})))
+    write_text_store(base + TEXT_SUFFIX, texts)
+    with open(base + FIELDS_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'fields': fields}, f, ensure_ascii=False, separators=(',', ':'))
+    with open(base + FUZZY_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(DeletionIndex.build(index.postings.keys()).to_dict(), f, ensure_ascii=False,
+                  separators=(',', ':'))
+
+
+def open_segment(directory: str, name: str, deleted: Optional[bytes] = None) -> IndexSegment:
+    """打开分段文件
+
+    Args:
+        directory: 分段文件所在目录
+        name: 分段名称
+        deleted: 删除标记位图
+
+    Returns:
+        分段
+    """
+    base = os.path.join(directory, name)
+    index = BinaryIndexReader(base + INDEX_SUFFIX)
+    texts = None
+    if os.path.exists(base + TEXT_SUFFIX):
+        texts = TextStoreReader(base + TEXT_SUFFIX)
+    fields = None
+    if os.path.exists(base + FIELDS_SUFFIX):
+        with open(base + FIELDS_SUFFIX, 'r', encoding='utf-8') as f:
+            fields = json.load(f).get('fields')
+    # 删除字典只在模糊匹配时使用，打开索引时只记录文件路径
+    fuzzy_path = base + FUZZY_SUFFIX if os.path.exists(base + FUZZY_SUFFIX) else None
+    return IndexSegment(name, index, texts, fields, deleted, _FuzzyDictionary(fuzzy_path, index))
+
+
+def link_segment(source_dir: str, target_dir: str, name: str):
+    """把上一代目录中的分段文件放入新一代目录，优先使用硬链接
+
+    Args:
+        source_dir: 分段文件所在的目录
+        target_dir: 新一代索引的临时目录
+        name: 分段名称
+    """
+    for suffix in SEGMENT_SUFFIXES:
+        source = os.path.join(source_dir, name + suffix)
+        if not os.path.exists(source):
+            continue
+        target = os.path.join(target_dir, name + suffix)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+
+def write_segment_list(directory: str, segments: List[IndexSegment],
+                       overrides: Dict[str, Dict[str, Any]]):
+    """写入分段清单
+
+    Args:
+        directory: 一代索引的目录
+        segments: 按顺序排列的分段
+        overrides: 只有修改时间变化的文档记录字段
+    """
+    data = {
+        'version': 1,
+        'segments': [{'name': segment.name,
+                      'doc_count': segment.doc_count,
+                      'deleted': base64.b64encode(segment.deleted).decode('ascii') if segment.deleted else None}
+                     for segment in segments],
+        'overrides': overrides
+    }
+    with open(os.path.join(directory, SEGMENTS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def open_segments(directory: str) -> Optional['SegmentedIndex']:
+    """打开一代索引目录中的全部分段
+
+    Args:
+        directory: 一代索引的目录
+
+    Returns:
+        合并视图；目录中没有分段清单（分段之前版本的索引）时返回 None
+    """
+    list_path = os.path.join(directory, SEGMENTS_FILE)
+    if not os.path.exists(list_path):
+        return None
+    with open(list_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    segments = []
+    for entry in data['segments']:
+        deleted = base64.b64decode(entry['deleted']) if entry.get('deleted') else None
+        segment = open_segment(directory, entry['name'], deleted)
+        if segment.doc_count != entry['doc_count']:
+            raise ValueError(f"分段 {entry['name']} 的文档数与分段清单不一致")
+        segments.append(segment)
+    return SegmentedIndex(segments, data.get('overrides'))
+
+
+def plan_merges(segments: List[IndexSegment], merge_factor: int = MERGE_FACTOR,
+                min_segment_docs: int = MIN_SEGMENT_DOCS,
+                expunge_ratio: float = EXPUNGE_DELETES_RATIO) -> List[List[int]]:
+    """按大小分层的合并策略选出需要合并的分段
+
+    分段按未删除的文档数分层（第 n 层为 min_segment_docs * merge_factor^n 起的一个数量级），
+    同一层的分段达到 merge_factor 个时合并为一个；已删除文档占比达到 expunge_ratio 的分段
+    单独重写。每个文档在一次优化中最多被改写一次，合并的总写入量为 O(n log n)。
+
+    Args:
+        segments: 按顺序排列的分段
+        merge_factor: 每层触发合并的分段数
+        min_segment_docs: 最低一层的文档数上限
+        expunge_ratio: 触发重写的已删除文档占比
+
+    Returns:
+        需要合并的分段序号组，每组合并为一个新分段
+    """
+    tiers = {}
+    for i, segment in enumerate(segments):
+        if not segment.live_count:
+            continue
+        tier = int(math.log(max(segment.live_count, min_segment_docs) / min_segment_docs, merge_factor))
+        tiers.setdefault(tier, []).append(i)
+
+    merges = []
+    merged = set()
+    for tier in sorted(tiers):
+        if len(tiers[tier]) >= merge_factor:
+            merges.append(tiers[tier])
+            merged.update(tiers[tier])
+    for i, segment in enumerate(segments):
+        if i not in merged and segment.live_count and \
+                segment.doc_count - segment.live_count >= expunge_ratio * segment.doc_count:
+            merges.append([i])
+    return sorted(merges)
+
+
+class SegmentedIndex:
+    """多个分段的合并只读视图
+
+    提供与单个二进制索引读取器相同的字典和序列接口（文档表、倒排表、位置、偏移、IDF、
+    字段倒排表、文本存储），查询按分段顺序读取各分段的倒排列表，把分段内 doc_id 换算为
+    全局 doc_id 并跳过已删除的文档。只有一个没有删除标记的分段时直接使用分段的数据，
+    不做换算；多个分段时 IDF 按未删除的文档即时计算，不提供预计算的得分上界。
+    """
+
+    def __init__(self, segments: List[IndexSegment], overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        """初始化合并视图
+
+        Args:
+            segments: 按顺序排列的分段
+            overrides: 文档路径到覆盖文档记录的字段（只有修改时间变化的文档）的映射
+        """
+        self.segments = segments
+        self.overrides = overrides or {}
+        self.doc_ids = []
+        self.doc_lengths = []
+        # 文档路径 -> 全局 doc_id；全局 doc_id -> (分段序号, 分段内 doc_id)
+        self._doc_numbers = {}
+        self._locations = []
+        # 每个分段的分段内 doc_id -> 全局 doc_id，已删除的文档为 -1
+        global_ids = []
+        for segment_index, segment in enumerate(segments):
+            index = segment.index
+            mapping = []
+            for doc_id, doc_path in enumerate(index.doc_ids):
+                if segment.is_deleted(doc_id):
+                    mapping.append(-1)
+                    continue
+                mapping.append(len(self.doc_ids))
+                self._doc_numbers[doc_path] = len(self.doc_ids)
+                self._locations.append((segment_index, doc_id))
+                self.doc_ids.append(doc_path)
+                self.doc_lengths.append(index.read_doc_length(doc_id))
+            global_ids.append(mapping)
+
+        self.documents = _SegmentedDocuments(self)
+        self.score_bound_params = None
+        if len(segments) == 1 and segments[0].deleted is None:
+            segment = segments[0]
+            index = segment.index
+            self.postings = index.postings
+            self.positions = index.positions
+            self.offsets = index.offsets
+            self.idf = index.idf
+            self.max_scores = index.max_scores
+            if 'bound_k1' in index.meta:
+                self.score_bound_params = (index.meta['bound_k1'], index.meta['bound_b'])
+            self.avg_doc_length = index.meta.get('avg_doc_length')
+            self.texts = segment.texts
+            self.fields = segment.fields
+        else:
+            indexes = [segment.index for segment in segments]
+            self.postings = _MergedPostings([index.postings for index in indexes], global_ids)
+            self.positions = None
+            self.offsets = None
+            if all(index.positions is not None for index in indexes):
+                self.positions = _MergedTermData(self.postings, [index.positions for index in indexes])
+                if all(index.offsets is not None for index in indexes):
+                    self.offsets = _MergedTermData(self.postings, [index.offsets for index in indexes])
+            self.idf = _MergedIdf(self.postings, len(self.doc_ids))
+            self.max_scores = {}
+            self.avg_doc_length = None
+            self.texts = None
+            if all(segment.texts is not None for segment in segments):
+                self.texts = _SegmentedTexts([segment.texts for segment in segments], self._locations)
+            self.fields = None
+            if all(segment.fields is not None for segment in segments):
+                self.fields = self._merge_fields(global_ids)
+        if self.avg_doc_length is None:
+            self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_ids) if self.doc_ids else 0.0
+        self.positions = self.positions if self.positions is not None else {}
+        self.offsets = self.offsets if self.offsets is not None else {}
+        self.fields = self.fields if self.fields is not None else {}
+
+    def _merge_fields(self, global_ids: List[List[int]]) -> Dict[str, Dict[str, Any]]:
+        """合并各分段的字段倒排表，只保留所有分段都有的字段"""
+        names = set.intersection(*(set(segment.fields) for segment in self.segments)) if self.segments else set()
+        fields = {}
+        for name in sorted(names):
+            segment_fields = [segment.fields[name] for segment in self.segments]
+            postings = _MergedPostings([field['postings'] for field in segment_fields], global_ids)
+            doc_lengths = [segment_fields[segment_index]['doc_lengths'][doc_id]
+                           for segment_index, doc_id in self._locations]
+            fields[name] = {
+                'postings': postings,
+                'sections': _MergedTermData(postings, [field['sections'] for field in segment_fields]),
+                'doc_lengths': doc_lengths,
+                'avg_doc_length': sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+            }
+        return fields
+
+    def locate(self, doc_path: str) -> Optional[Tuple[int, int]]:
+        """文档所在的 (分段序号, 分段内 doc_id)，文档不存在时返回 None"""
+        doc_number = self._doc_numbers.get(doc_path)
+        return None if doc_number is None else self._locations[doc_number]
+
+    def with_deletions(self, doc_paths: Sequence[str]) -> List[IndexSegment]:
+        """返回删除了指定文档后的分段列表，不存在的文档被忽略
+
+        Args:
+            doc_paths: 文档路径
+
+        Returns:
+            按原顺序排列的分段，没有变化的分段是原来的对象
+        """
+        deletions = {}
+        for doc_path in doc_paths:
+            location = self.locate(doc_path)
+            if location is not None:
+                deletions.setdefault(location[0], []).append(location[1])
+        return [segment.with_deletions(deletions[i]) if i in deletions else segment
+                for i, segment in enumerate(self.segments)]
+
+    def fuzzy_lookup(self, term: str, max_distance: int) -> Dict[str, int]:
+        """在各分段的对称删除字典中查找与查询词相近的词语
+
+        Args:
+            term: 查询词
+            max_distance: 编辑距离
+
+        Returns:
+            仍有未删除文档的词语到编辑距离的映射
+        """
+        matches = {}
+        for segment in self.segments:
+            for candidate, distance in segment.fuzzy_index().lookup(term, max_distance).items():
+                if candidate not in matches:
+                    matches[candidate] = distance
+        if len(self.segments) > 1 or any(segment.deleted is not None for segment in self.segments):
+            matches = {candidate: distance for candidate, distance in matches.items()
+                       if candidate in self.postings}
+        return matches
+
+    def read_document(self, doc_number: int) -> Dict[str, Any]:
+        """按全局 doc_id 读取文档记录（已应用修改时间等覆盖字段）"""
+        segment_index, doc_id = self._locations[doc_number]
+        doc_data = self.segments[segment_index].index.read_document(doc_id)
+        override = self.overrides.get(self.doc_ids[doc_number])
+        if override:
+            doc_data.update(override)
+        return doc_data
+
+
+class _SegmentedDocuments:
+    """以字典接口（文档路径 -> 文档数据）访问各分段中未删除的文档记录
+
+    每次访问都会读取一份新的文档记录。
+    """
+
+    def __init__(self, index: SegmentedIndex):
+        self._index = index
+
+    def get(self, doc_path: str, default=None):
+        doc_number = self._index._doc_numbers.get(doc_path)
+        if doc_number is None:
+            return default
+        return self._index.read_document(doc_number)
+
+    def __getitem__(self, doc_path: str) -> Dict[str, Any]:
+        return self._index.read_document(self._index._doc_numbers[doc_path])
+
+    def __contains__(self, doc_path: str) -> bool:
+        return doc_path in self._index._doc_numbers
+
+    def __len__(self) -> int:
+        return len(self._index.doc_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self._index.doc_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.doc_ids)
+
+    def keys(self):
+        return self._index._doc_numbers.keys()
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        for doc_number in range(len(self._index.doc_ids)):
+            yield self._index.read_document(doc_number)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for doc_number, doc_path in enumerate(self._index.doc_ids):
+            yield doc_path, self._index.read_document(doc_number)
+
+
+class _MergedPostings:
+    """以字典接口访问跨分段合并的倒排列表
+
+    各分段的倒排列表按分段顺序拼接，分段内 doc_id 换算为全局 doc_id，已删除文档的条目被跳过；
+    所有条目都已删除的词语视为不存在。
+    """
+
+    def __init__(self, tables: List[Any], global_ids: List[List[int]]):
+        self._tables = tables
+        self._global_ids = global_ids
+
+    def get(self, term: str, default=None):
+        merged = []
+        for table, mapping in zip(self._tables, self._global_ids):
+            postings = table.get(term)
+            if not postings:
+                continue
+            for i in range(0, len(postings), 2):
+                doc_id = mapping[postings[i]]
+                if doc_id >= 0:
+                    merged.append(doc_id)
+                    merged.append(postings[i + 1])
+        return merged if merged else default
+
+    def live_entries(self, term: str) -> Iterator[Tuple[int, List[int]]]:
+        """依次给出各分段中词语的 (分段序号, 未删除条目在分段倒排列表中的序号列表)"""
+        for segment_index, (table, mapping) in enumerate(zip(self._tables, self._global_ids)):
+            postings = table.get(term)
+            if postings:
+                yield segment_index, [i // 2 for i in range(0, len(postings), 2) if mapping[postings[i]] >= 0]
+
+    def __getitem__(self, term: str) -> List[int]:
+        postings = self.get(term)
+        if postings is None:
+            raise KeyError(term)
+        return postings
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def keys(self) -> Iterator[str]:
+        for term, _ in self.items():
+            yield term
+
+    def items(self) -> Iterator[Tuple[str, List[int]]]:
+        terms = set()
+        for table in self._tables:
+            terms.update(table.keys())
+        for term in sorted(terms):
+            postings = self.get(term)
+            if postings is not None:
+                yield term, postings
+
+
+class _MergedTermData:
+    """以字典接口访问与合并倒排列表逐项对应的逐词数据（位置、字节偏移、小标题序号）"""
+
+    def __init__(self, postings: _MergedPostings, tables: List[Any]):
+        self._postings = postings
+        self._tables = tables
+
+    def get(self, term: str, default=None):
+        merged = []
+        for segment_index, entries in self._postings.live_entries(term):
+            values = self._tables[segment_index].get(term) or []
+            merged.extend(values[i] for i in entries if i < len(values))
+        return merged if merged else default
+
+    def __getitem__(self, term: str) -> Any:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+
+class _MergedIdf:
+    """按未删除的文档即时计算逆文档频率，结果在视图内缓存"""
+
+    def __init__(self, postings: _MergedPostings, doc_count: int):
+        self._postings = postings
+        self._doc_count = doc_count
+        self._cache = {}
+
+    def get(self, term: str, default=None):
+        value = self._cache.get(term)
+        if value is None:
+            postings = self._postings.get(term)
+            if postings is None:
+                return default
+            value = bm25_idf(self._doc_count, len(postings) // 2)
+            if len(self._cache) >= 4096:
+                self._cache.clear()
+            self._cache[term] = value
+        return value
+
+    def __getitem__(self, term: str) -> float:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+
+class _SegmentedTexts:
+    """按全局 doc_id 访问各分段的文档文本存储"""
+
+    def __init__(self, stores: List[TextStoreReader], locations: List[Tuple[int, int]]):
+        self._stores = stores
+        self._locations = locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _locate(self, doc_id: int) -> Tuple[TextStoreReader, int]:
+        segment_index, local_id = self._locations[doc_id]
+        return self._stores[segment_index], local_id
+
+    def byte_length(self, doc_id: int) -> int:
+        store, local_id = self._locate(doc_id)
+        return store.byte_length(local_id)
+
+    def char_length(self, doc_id: int) -> int:
+        store, local_id = self._locate(doc_id)
+        return store.char_length(local_id)
+
+    def read_bytes(self, doc_id: int, start: int = 0, end: Optional[int] = None) -> bytes:
+        store, local_id = self._locate(doc_id)
+        return store.read_bytes(local_id, start, end)
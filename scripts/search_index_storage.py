@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索索引二进制存储模块 - 关联需求FR-007
+
+此模块提供搜索索引的紧凑二进制格式，包括：
+1. 按字节序排列的词典（支持二分查找）
+2. 差值 + varint 编码的倒排列表
+3. 带偏移量的文档表和文档存储区
+4. 预先计算的逐词 IDF（版本2起）和 BM25 得分上界（版本3起）
+5. 可选的词语位置信息（版本4起，文件头 flags 含 FLAG_POSITIONS 时）
+6. 可选的词语在文档文本中的字节偏移（版本5起，文件头 flags 含 FLAG_OFFSETS 时）
+7. 基于 mmap 的按需加载读取器
+8. 独立的文档文本存储（按字节偏移读取任意片段，用于在整篇文档中截取摘要）
+
+文件布局（小端序）：
+
+    文件头   magic(4) version(2) flags(2) doc_count(4) term_count(4)
+             paths_offset(8) paths_length(8)
+             term_table_offset(8) term_blob_offset(8) term_blob_length(8)
+             postings_offset(8) postings_length(8)
+             doc_table_offset(8) doc_store_offset(8) doc_store_length(8)
+             meta_offset(8) meta_length(8)
+    路径区   以换行分隔的UTF-8文档路径，顺序即 doc_id
+    词条表   每个词条 term_offset(4) term_length(2) postings_offset(8) postings_length(4) doc_freq(4)
+             idf(8, 版本2起) max_score(8, 版本3起)
+    词语区   词语UTF-8字节拼接
+    倒排区   每个词条: 依次为 varint(doc_id差值) varint(tf)；
+             含位置信息时开头为 varint(doc_id/tf 部分字节数)，之后依次为每个文档的 tf 个 varint(位置差值)；
+             含字节偏移时每个位置差值之后紧跟 varint(字节偏移差值)，位置和偏移在每个文档内从0起算差值
+    文档表   每个文档 record_offset(8) record_length(4) doc_length(4)
+    文档区   每个文档的紧凑JSON记录（不含词语列表）
+    元数据区 JSON（版本2起包含 avg_doc_length，版本3起包含得分上界对应的 bound_k1/bound_b）
+
+文本存储文件布局（小端序）：
+
+    文件头   magic(4) version(2) flags(2) doc_count(4)
+    文档表   每个文档 text_offset(8) byte_length(4) char_length(4)，顺序即 doc_id
+    文本区   每个文档提取出的完整纯文本（UTF-8）
+"""
+
+import os
+import json
+import mmap
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from search_ranking import bm25_idf
+
+MAGIC = b'SIDX'
+FORMAT_VERSION = 5
+
+# 文件头 flags：倒排列表中包含词语位置
+FLAG_POSITIONS = 0x1
+# 文件头 flags：每个位置附带词语在文档文本中的字节偏移
+FLAG_OFFSETS = 0x2
+
+TEXT_MAGIC = b'STXT'
+TEXT_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII' + 'Q' * 12)
+_TERM_ENTRY_V1 = struct.Struct('<IHQII')
+_TERM_ENTRY_V2 = struct.Struct('<IHQIId')
+_TERM_ENTRY = struct.Struct('<IHQIIdd')
+_DOC_ENTRY = struct.Struct('<QII')
+_TEXT_HEADER = struct.Struct('<4sHHI')
+_TEXT_ENTRY = struct.Struct('<QII')
+
+# 精简索引结构中不保存的文档字段：词语列表仅在分词时使用，词频、位置和偏移已保存在
+# 全局倒排表中，字段词语保存在字段倒排表中，完整文本保存在文本存储中
+REDUNDANT_DOC_FIELDS = ('tokens', 'inverted_index', 'term_positions', 'term_offsets', 'field_terms', 'text')
+
+
+def _encode_varint(value: int, out: bytearray):
+    """以 varint 编码写入非负整数"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varints(buffer, start: int, end: int) -> List[int]:
+    """解码一段连续的 varint"""
+    values = []
+    value = 0
+    shift = 0
+    for byte in buffer[start:end]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = 0
+        shift = 0
+    return values
+
+
+def _read_varint(buffer, offset: int) -> Tuple[int, int]:
+    """读取单个 varint
+
+    Returns:
+        (整数值, 下一个字节的偏移)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _decode_postings(buffer, start: int, end: int, positional: bool = False) -> List[int]:
+    """解码倒排列表
+
+    Args:
+        buffer: 可按字节索引的缓冲区
+        start: 起始偏移
+        end: 结束偏移
+        positional: 是否为含位置信息的倒排区（开头为 doc_id/tf 部分的字节长度，位置部分不解码）
+
+    Returns:
+        扁平的 [doc_id, tf, doc_id, tf, ...] 列表
+    """
+    if positional:
+        length, start = _read_varint(buffer, start)
+        end = start + length
+    postings = _decode_varints(buffer, start, end)
+    doc_id = 0
+    for i in range(0, len(postings), 2):
+        doc_id += postings[i]
+        postings[i] = doc_id
+    return postings
+
+
+def _decode_positions(buffer, start: int, end: int, with_offsets: bool = False,
+                      field: int = 0) -> List[List[int]]:
+    """解码含位置信息的倒排区中的位置或字节偏移
+
+    Args:
+        buffer: 可按字节索引的缓冲区
+        start: 起始偏移
+        end: 结束偏移
+        with_offsets: 倒排区中每个位置是否附带字节偏移
+        field: 0 返回位置，1 返回字节偏移（要求 with_offsets）
+
+    Returns:
+        与倒排列表逐项对应的位置（或字节偏移）列表
+    """
+    length, postings_start = _read_varint(buffer, start)
+    postings = _decode_varints(buffer, postings_start, postings_start + length)
+    deltas = _decode_varints(buffer, postings_start + length, end)
+    stride = 2 if with_offsets else 1
+    values = []
+    cursor = field
+    for i in range(1, len(postings), 2):
+        tf = postings[i]
+        doc_values = []
+        value = 0
+        for delta in deltas[cursor:cursor + tf * stride:stride]:
+            value += delta
+            doc_values.append(value)
+        values.append(doc_values)
+        cursor += tf * stride
+    return values
+
+
+def lean_document(doc_data: Dict[str, Any]) -> Dict[str, Any]:
+    """返回去除冗余字段后的文档记录
+
+    Args:
+        doc_data: 文档数据
+
+    Returns:
+        只包含搜索、建议和统计所需字段的文档记录
+    """
+    return {key: value for key, value in doc_data.items() if key not in REDUNDANT_DOC_FIELDS}
+
+
+def write_binary_index(file_path: str, documents: Dict[str, Dict[str, Any]],
+                       postings: Dict[str, List[int]], doc_lengths: List[int],
+                       idf: Dict[str, float], max_scores: Dict[str, float],
+                       positions: Optional[Dict[str, List[List[int]]]] = None,
+                       offsets: Optional[Dict[str, List[List[int]]]] = None,
+                       meta: Optional[Dict[str, Any]] = None):
+    """写入二进制索引文件
+
+    先写入同目录下的临时文件再原子替换，避免正在 mmap 旧文件的读取器读到不完整数据。
+
+    Args:
+        file_path: 目标文件路径
+        documents: 按 doc_id 顺序排列的文档路径到文档数据的映射
+        postings: 词语到扁平倒排列表的映射（doc_id 递增）
+        doc_lengths: 按 doc_id 排列的文档长度
+        idf: 词语到逆文档频率的映射
+        max_scores: 词语到 BM25 得分上界的映射
+        positions: 词语到位置列表的映射，与倒排列表逐项对应（位置递增，个数等于 tf），
+            为 None 时不保存位置信息
+        offsets: 词语到字节偏移列表的映射，与位置列表逐项对应，为 None 时不保存偏移
+            （只在同时给出 positions 时保存）
+        meta: 附加元数据
+    """
+    paths_blob = '\n'.join(documents.keys()).encode('utf-8')
+
+    # 词典按UTF-8字节序排列，读取时可直接二分查找
+    encoded_terms = sorted((term.encode('utf-8'), term) for term in postings)
+    term_table = bytearray()
+    term_blob = bytearray()
+    postings_blob = bytearray()
+    for term_bytes, term in encoded_terms:
+        term_postings = postings[term]
+        term_positions = positions[term] if positions is not None else None
+        term_offsets = offsets[term] if positions is not None and offsets is not None else None
+        postings_start = len(postings_blob)
+        encoded = bytearray()
+        previous_doc_id = 0
+        for i in range(0, len(term_postings), 2):
+            doc_id = term_postings[i]
+            _encode_varint(doc_id - previous_doc_id, encoded)
+            _encode_varint(term_postings[i + 1], encoded)
+            previous_doc_id = doc_id
+        if term_positions is not None:
+            # 位置放在 doc_id/tf 之后，只需要倒排列表时不必解码位置
+            _encode_varint(len(encoded), postings_blob)
+            postings_blob += encoded
+            for i, doc_positions in enumerate(term_positions):
+                previous_position = 0
+                if term_offsets is None:
+                    for position in doc_positions:
+                        _encode_varint(position - previous_position, postings_blob)
+                        previous_position = position
+                    continue
+                # 位置和偏移交错存放，读取某一个词语在某个文档中的命中时一次解码
+                previous_offset = 0
+                for position, offset in zip(doc_positions, term_offsets[i]):
+                    _encode_varint(position - previous_position, postings_blob)
+                    _encode_varint(offset - previous_offset, postings_blob)
+                    previous_position = position
+                    previous_offset = offset
+        else:
+            postings_blob += encoded
+        term_table += _TERM_ENTRY.pack(len(term_blob), len(term_bytes), postings_start,
+                                       len(postings_blob) - postings_start, len(term_postings) // 2,
+                                       idf[term], max_scores[term])
+        term_blob += term_bytes
+
+    doc_table = bytearray()
+    doc_store = bytearray()
+    for (doc_path, doc_data), doc_length in zip(documents.items(), doc_lengths):
+        record_bytes = json.dumps(lean_document(doc_data), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        doc_table += _DOC_ENTRY.pack(len(doc_store), len(record_bytes), doc_length)
+        doc_store += record_bytes
+
+    meta_blob = json.dumps(meta or {}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    # 计算各区偏移量
+    offset = _HEADER.size
+    paths_offset = offset
+    offset += len(paths_blob)
+    term_table_offset = offset
+    offset += len(term_table)
+    term_blob_offset = offset
+    offset += len(term_blob)
+    postings_offset = offset
+    offset += len(postings_blob)
+    doc_table_offset = offset
+    offset += len(doc_table)
+    doc_store_offset = offset
+    offset += len(doc_store)
+    meta_offset = offset
+
+    flags = 0
+    if positions is not None:
+        flags |= FLAG_POSITIONS
+        if offsets is not None:
+            flags |= FLAG_OFFSETS
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags,
+        len(documents), len(encoded_terms),
+        paths_offset, len(paths_blob),
+        term_table_offset, term_blob_offset, len(term_blob),
+        postings_offset, len(postings_blob),
+        doc_table_offset, doc_store_offset, len(doc_store),
+        meta_offset, len(meta_blob)
+    )
+
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        for part in (header, paths_blob, term_table, term_blob, postings_blob,
+                     doc_table, doc_store, meta_blob):
+            f.write(part)
+    os.replace(temp_path, file_path)
+
+
+class BinaryIndexReader:
+    """基于 mmap 的二进制索引读取器
+
+    打开时只解析文件头和文档路径，词典、倒排列表和文档记录均在访问时按需读取。
+    """
+
+    def __init__(self, file_path: str):
+        """打开二进制索引文件
+
+        Args:
+            file_path: 索引文件路径
+        """
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, version, flags, self.doc_count, self.term_count,
+         paths_offset, paths_length,
+         self._term_table_offset, self._term_blob_offset, _term_blob_length,
+         self._postings_offset, _postings_length,
+         self._doc_table_offset, self._doc_store_offset, _doc_store_length,
+         meta_offset, meta_length) = _HEADER.unpack_from(self._mm, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的搜索索引文件: {file_path}")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的索引格式版本: {version}")
+        self.version = version
+        self.positional = bool(flags & FLAG_POSITIONS)
+        self.has_offsets = self.positional and bool(flags & FLAG_OFFSETS)
+        self._term_struct = {1: _TERM_ENTRY_V1, 2: _TERM_ENTRY_V2}.get(version, _TERM_ENTRY)
+        # 最近查找过的词条序号，避免同一查询中重复二分查找
+        self._term_cache = {}
+
+        paths = self._mm[paths_offset:paths_offset + paths_length].decode('utf-8')
+        self.doc_ids = paths.split('\n') if self.doc_count else []
+        self.meta = json.loads(self._mm[meta_offset:meta_offset + meta_length].decode('utf-8'))
+
+        self.postings = _PostingsView(self)
+        self.idf = _TermFieldView(self, self.term_idf)
+        self.max_scores = _TermFieldView(self, self.term_max_score)
+        self.positions = _TermFieldView(self, self.read_positions) if self.positional else None
+        self.offsets = _TermFieldView(self, self.read_offsets) if self.has_offsets else None
+        self.doc_lengths = _DocLengthView(self)
+        self.documents = _DocumentTableView(self)
+
+    def close(self):
+        """关闭映射和文件"""
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+    def _term_entry(self, term_index: int) -> Tuple:
+        """读取词条表中的一项"""
+        return self._term_struct.unpack_from(self._mm, self._term_table_offset + term_index * self._term_struct.size)
+
+    def _term_bytes(self, term_index: int) -> bytes:
+        """读取词条对应的UTF-8字节"""
+        term_offset, term_length = self._term_entry(term_index)[:2]
+        start = self._term_blob_offset + term_offset
+        return self._mm[start:start + term_length]
+
+    def find_term(self, term: str) -> int:
+        """二分查找词条序号
+
+        Args:
+            term: 词语
+
+        Returns:
+            词条序号，不存在时返回 -1
+        """
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        key = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        term_index = low if low < self.term_count and self._term_bytes(low) == key else -1
+
+        if len(self._term_cache) >= 4096:
+            self._term_cache.clear()
+        self._term_cache[term] = term_index
+        return term_index
+
+    def read_postings(self, term_index: int) -> List[int]:
+        """读取并解码词条的倒排列表"""
+        postings_offset, postings_length = self._term_entry(term_index)[2:4]
+        start = self._postings_offset + postings_offset
+        return _decode_postings(self._mm, start, start + postings_length, self.positional)
+
+    def read_positions(self, term_index: int) -> Optional[List[List[int]]]:
+        """读取词条的位置列表，不含位置信息的文件返回 None"""
+        if not self.positional:
+            return None
+        postings_offset, postings_length = self._term_entry(term_index)[2:4]
+        start = self._postings_offset + postings_offset
+        return _decode_positions(self._mm, start, start + postings_length, self.has_offsets)
+
+    def read_offsets(self, term_index: int) -> Optional[List[List[int]]]:
+        """读取词条在各文档文本中的字节偏移，不含偏移信息的文件返回 None"""
+        if not self.has_offsets:
+            return None
+        postings_offset, postings_length = self._term_entry(term_index)[2:4]
+        start = self._postings_offset + postings_offset
+        return _decode_positions(self._mm, start, start + postings_length, True, field=1)
+
+    def doc_freq(self, term_index: int) -> int:
+        """读取词条的文档频率"""
+        return self._term_entry(term_index)[4]
+
+    def term_idf(self, term_index: int) -> float:
+        """读取词条的逆文档频率，版本1文件根据文档频率即时计算"""
+        entry = self._term_entry(term_index)
+        if len(entry) > 5:
+            return entry[5]
+        return bm25_idf(self.doc_count, entry[4])
+
+    def term_max_score(self, term_index: int) -> Optional[float]:
+        """读取词条的 BM25 得分上界，版本3之前的文件返回 None"""
+        entry = self._term_entry(term_index)
+        if len(entry) > 6:
+            return entry[6]
+        return None
+
+    def iter_terms(self) -> Iterator[str]:
+        """按字节序遍历全部词语"""
+        for term_index in range(self.term_count):
+            yield self._term_bytes(term_index).decode('utf-8')
+
+    def read_doc_length(self, doc_id: int) -> int:
+        """读取文档长度"""
+        return _DOC_ENTRY.unpack_from(self._mm, self._doc_table_offset + doc_id * _DOC_ENTRY.size)[2]
+
+    def read_document(self, doc_id: int) -> Dict[str, Any]:
+        """读取并解码文档记录"""
+        record_offset, record_length, _ = _DOC_ENTRY.unpack_from(
+            self._mm, self._doc_table_offset + doc_id * _DOC_ENTRY.size)
+        start = self._doc_store_offset + record_offset
+        return json.loads(self._mm[start:start + record_length].decode('utf-8'))
+
+
+class _PostingsView:
+    """以字典接口访问 mmap 中的倒排列表"""
+
+    def __init__(self, reader: BinaryIndexReader):
+        self._reader = reader
+
+    def get(self, term: str, default=None):
+        term_index = self._reader.find_term(term)
+        if term_index < 0:
+            return default
+        return self._reader.read_postings(term_index)
+
+    def __getitem__(self, term: str) -> List[int]:
+        postings = self.get(term)
+        if postings is None:
+            raise KeyError(term)
+        return postings
+
+    def __contains__(self, term: str) -> bool:
+        return self._reader.find_term(term) >= 0
+
+    def __len__(self) -> int:
+        return self._reader.term_count
+
+    def __iter__(self) -> Iterator[str]:
+        return self._reader.iter_terms()
+
+    def keys(self) -> Iterator[str]:
+        return self._reader.iter_terms()
+
+    def items(self) -> Iterator[Tuple[str, List[int]]]:
+        for term_index in range(self._reader.term_count):
+            yield self._reader._term_bytes(term_index).decode('utf-8'), self._reader.read_postings(term_index)
+
+
+class _TermFieldView:
+    """以字典接口访问逐词数据（IDF、得分上界、位置列表）"""
+
+    def __init__(self, reader: BinaryIndexReader, read_field):
+        self._reader = reader
+        self._read_field = read_field
+
+    def get(self, term: str, default=None):
+        term_index = self._reader.find_term(term)
+        if term_index < 0:
+            return default
+        value = self._read_field(term_index)
+        return default if value is None else value
+
+    def __getitem__(self, term: str) -> Any:
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+
+class _DocLengthView:
+    """以序列接口访问文档长度"""
+
+    def __init__(self, reader: BinaryIndexReader):
+        self._reader = reader
+
+    def __getitem__(self, doc_id: int) -> int:
+        if not 0 <= doc_id < self._reader.doc_count:
+            raise IndexError(doc_id)
+        return self._reader.read_doc_length(doc_id)
+
+    def __len__(self) -> int:
+        return self._reader.doc_count
+
+    def __iter__(self) -> Iterator[int]:
+        for doc_id in range(self._reader.doc_count):
+            yield self._reader.read_doc_length(doc_id)
+
+
+class _DocumentTableView:
+    """以字典接口（文档路径 -> 文档数据）访问文档记录
+
+    每次访问都会解码一份新的文档记录，记录中不包含词语列表和文档级倒排索引。
+    """
+
+    def __init__(self, reader: BinaryIndexReader):
+        self._reader = reader
+        self._positions = {doc_path: doc_id for doc_id, doc_path in enumerate(reader.doc_ids)}
+
+    def get(self, doc_path: str, default=None):
+        doc_id = self._positions.get(doc_path)
+        if doc_id is None:
+            return default
+        return self._reader.read_document(doc_id)
+
+    def __getitem__(self, doc_path: str) -> Dict[str, Any]:
+        doc_id = self._positions[doc_path]
+        return self._reader.read_document(doc_id)
+
+    def __contains__(self, doc_path: str) -> bool:
+        return doc_path in self._positions
+
+    def __len__(self) -> int:
+        return self._reader.doc_count
+
+    def __bool__(self) -> bool:
+        return self._reader.doc_count > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._reader.doc_ids)
+
+    def keys(self) -> List[str]:
+        return list(self._reader.doc_ids)
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        for doc_id in range(self._reader.doc_count):
+            yield self._reader.read_document(doc_id)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for doc_id, doc_path in enumerate(self._reader.doc_ids):
+            yield doc_path, self._reader.read_document(doc_id)
+
+
+def write_text_store(file_path: str, texts: List[bytes]):
+    """写入文档文本存储文件
+
+    先写入同目录下的临时文件再原子替换。
+
+    Args:
+        file_path: 目标文件路径
+        texts: 按 doc_id 顺序排列的文档纯文本（UTF-8 编码）
+    """
+    table = bytearray()
+    offset = 0
+    for text in texts:
+        table += _TEXT_ENTRY.pack(offset, len(text), len(text.decode('utf-8')))
+        offset += len(text)
+
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_TEXT_HEADER.pack(TEXT_MAGIC, TEXT_FORMAT_VERSION, 0, len(texts)))
+        f.write(table)
+        for text in texts:
+            f.write(text)
+    os.replace(temp_path, file_path)
+
+
+class TextStoreReader:
+    """基于 mmap 的文档文本存储读取器
+
+    打开时只解析文件头，按 doc_id 和字节范围读取文本片段，不需要加载或解码整篇文档。
+    """
+
+    def __init__(self, file_path: str):
+        """打开文本存储文件
+
+        Args:
+            file_path: 文本存储文件路径
+        """
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, _flags, self.doc_count = _TEXT_HEADER.unpack_from(self._mm, 0)
+        if magic != TEXT_MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的文本存储文件: {file_path}")
+        if version > TEXT_FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的文本存储格式版本: {version}")
+        self._text_offset = _TEXT_HEADER.size + self.doc_count * _TEXT_ENTRY.size
+
+    def close(self):
+        """关闭映射和文件"""
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def _entry(self, doc_id: int) -> Tuple[int, int, int]:
+        if not 0 <= doc_id < self.doc_count:
+            raise IndexError(doc_id)
+        return _TEXT_ENTRY.unpack_from(self._mm, _TEXT_HEADER.size + doc_id * _TEXT_ENTRY.size)
+
+    def byte_length(self, doc_id: int) -> int:
+        """文档文本的UTF-8字节数"""
+        return self._entry(doc_id)[1]
+
+    def char_length(self, doc_id: int) -> int:
+        """文档文本的字符数"""
+        return self._entry(doc_id)[2]
+
+    def read_bytes(self, doc_id: int, start: int = 0, end: Optional[int] = None) -> bytes:
+        """读取文档文本中 [start, end) 字节范围的原始字节
+
+        Args:
+            doc_id: 文档序号
+            start: 起始字节偏移
+            end: 结束字节偏移，默认为文档末尾
+
+        Returns:
+            UTF-8 字节（范围边界不在字符边界上时可能包含不完整的字符）
+        """
+        text_offset, byte_length, _ = self._entry(doc_id)
+        end = byte_length if end is None else min(end, byte_length)
+        start = min(max(start, 0), end)
+        base = self._text_offset + text_offset
+        return self._mm[base + start:base + end]
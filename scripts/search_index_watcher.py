@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文档目录监视模块 - 关联需求FR-007
+
+此模块提供搜索索引增量更新使用的文档变化监视功能，包括：
+1. 基于标准库的轮询监视器（目录修改时间短路判断）
+2. 可选的 watchdog 事件监视后端（安装了 watchdog 时可用）
+3. 连续修改的防抖合并，只把变化的文件路径交给增量索引
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 为可选依赖
+    FileSystemEventHandler = object
+    Observer = None
+
+# 监视的文件后缀
+WATCHED_SUFFIXES = ('.md',)
+
+
+class PollingWatcher:
+    """基于标准库的轮询监视器
+
+    记录每个目录的修改时间和其中每个文档的 (修改时间, 大小)。目录中新增、删除或
+    重命名条目时目录的修改时间会变化，只有这些目录需要重新列出；修改时间未变化的
+    目录只对已知文档逐个 stat，检测原地写入。文档数量为 n 时每次轮询只有 O(n) 次
+    stat 调用，不读取文件内容，空闲时的开销可以忽略。
+    """
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...] = WATCHED_SUFFIXES):
+        """初始化轮询监视器并记录当前状态
+
+        Args:
+            root: 监视的根目录
+            suffixes: 监视的文件后缀
+        """
+        self.root = root
+        self.suffixes = suffixes
+        # 目录绝对路径 -> 修改时间
+        self._dirs = {}
+        # 目录绝对路径 -> {文件名: (修改时间, 大小)}
+        self._files = {}
+        for directory in self._walk_dirs(root):
+            self._scan_dir(directory)
+
+    def _walk_dirs(self, top: str):
+        """列出 top 及其全部子目录"""
+        for directory, _, _ in os.walk(top):
+            yield directory
+
+    def _scan_dir(self, directory: str) -> Optional[Set[str]]:
+        """重新列出目录，返回新出现的子目录；目录已不存在时返回None"""
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            return None
+        files = {}
+        subdirs = set()
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.add(entry.path)
+                elif entry.name.endswith(self.suffixes):
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        self._dirs[directory] = dir_mtime
+        self._files[directory] = files
+        return subdirs
+
+    def _relative(self, directory: str, name: str) -> str:
+        return os.path.relpath(os.path.join(directory, name), self.root)
+
+    def poll(self) -> Set[str]:
+        """检查自上次轮询以来变化的文档
+
+        Returns:
+            新增、修改或删除的文档相对路径集合
+        """
+        changed = set()
+        for directory in list(self._dirs):
+            if directory not in self._dirs:
+                # 已随上层目录的删除一并处理
+                continue
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                dir_mtime = None
+
+            if dir_mtime == self._dirs[directory]:
+                # 目录条目未变化，只检查已知文档是否被原地修改
+                files = self._files[directory]
+                for name, signature in files.items():
+                    try:
+                        stat = os.stat(os.path.join(directory, name))
+                        current = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        current = None
+                    if current != signature:
+                        changed.add(self._relative(directory, name))
+                        files[name] = current
+                for name in [name for name, signature in files.items() if signature is None]:
+                    del files[name]
+                continue
+
+            previous_files = self._files.pop(directory)
+            del self._dirs[directory]
+            subdirs = self._scan_dir(directory) if dir_mtime is not None else None
+            if subdirs is None:
+                # 目录被删除，其中的文档全部视为删除
+                changed.update(self._relative(directory, name) for name in previous_files)
+                for subdir in [path for path in self._dirs if path.startswith(directory + os.sep)]:
+                    changed.update(self._relative(subdir, name) for name in self._files.pop(subdir))
+                    del self._dirs[subdir]
+                continue
+
+            current_files = self._files[directory]
+            for name in previous_files.keys() | current_files.keys():
+                if previous_files.get(name) != current_files.get(name):
+                    changed.add(self._relative(directory, name))
+            for subdir in subdirs:
+                if subdir not in self._dirs:
+                    # 新出现的子目录（可能是整体移入的目录树）
+                    for new_dir in self._walk_dirs(subdir):
+                        if new_dir not in self._dirs and self._scan_dir(new_dir) is not None:
+                            changed.update(self._relative(new_dir, name) for name in self._files[new_dir])
+        return changed
+
+    def close(self):
+        """释放监视器资源（轮询监视器无需释放）"""
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """把 watchdog 事件中的文档路径放入队列"""
+
+    def __init__(self, watcher: 'WatchdogWatcher'):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path:
+                self._watcher._record(os.fsdecode(path), event.is_directory)
+
+
+class WatchdogWatcher:
+    """基于 watchdog 的事件监视器
+
+    使用操作系统的文件事件通知（Linux 上为 inotify），poll 只是取出事件线程收集到
+    的路径，不访问文件系统。目录事件（如整个目录被移动）无法直接对应到文档，交给
+    轮询监视器重新比对。
+    """
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...] = WATCHED_SUFFIXES):
+        """启动事件监视
+
+        Args:
+            root: 监视的根目录
+            suffixes: 监视的文件后缀
+        """
+        if Observer is None:
+            raise ImportError("watchdog 未安装，无法使用事件监视后端")
+        self.root = root
+        self.suffixes = suffixes
+        self._events = queue.SimpleQueue()
+        self._fallback = PollingWatcher(root, suffixes)
+        self._observer = Observer()
+        self._observer.schedule(_WatchdogHandler(self), root, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def _record(self, path: str, is_directory: bool):
+        """记录事件路径（在 watchdog 事件线程中调用）"""
+        if is_directory:
+            self._events.put(None)
+        elif path.endswith(self.suffixes):
+            self._events.put(os.path.relpath(path, self.root))
+
+    def poll(self) -> Set[str]:
+        """取出自上次调用以来收到的文档变化
+
+        Returns:
+            变化的文档相对路径集合
+        """
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                path = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if path is None:
+                rescan = True
+            else:
+                changed.add(path)
+        if rescan or changed:
+            # 同步轮询监视器的状态，并补充目录事件中涉及的文档
+            changed |= self._fallback.poll()
+        return changed
+
+    def close(self):
+        """停止事件线程"""
+        self._observer.stop()
+        self._observer.join()
+
+
+def create_watcher(root: str, backend: str = "auto"):
+    """创建文档监视器
+
+    Args:
+        root: 监视的根目录
+        backend: "auto"（安装了 watchdog 时使用事件监视，否则轮询）、"watchdog" 或 "polling"
+
+    Returns:
+        监视器实例，提供 poll() 和 close()
+    """
+    if backend == "watchdog" or (backend == "auto" and Observer is not None):
+        return WatchdogWatcher(root)
+    if backend in ("auto", "polling"):
+        return PollingWatcher(root)
+    raise ValueError(f"未知的监视后端: {backend}")
+
+
+def watch_changes(watcher, on_change: Callable[[Set[str]], None], stop_event: threading.Event,
+                  poll_interval: float = 0.5, debounce_seconds: float = 0.5,
+                  max_delay_seconds: float = 5.0, clock: Callable[[], float] = time.monotonic):
+    """监视文档变化并在防抖后回调
+
+    连续的修改（例如编辑器保存时的多次写入、git checkout 切换大量文件）合并为一次
+    回调：最后一次变化之后安静 debounce_seconds 秒才触发；持续修改时最迟在第一次
+    变化之后 max_delay_seconds 秒触发，避免索引一直得不到更新。
+
+    Args:
+        watcher: 由 create_watcher 创建的监视器
+        on_change: 回调函数，参数为变化的文档相对路径集合
+        stop_event: 停止信号
+        poll_interval: 轮询间隔（秒）
+        debounce_seconds: 防抖等待时间（秒）
+        max_delay_seconds: 从第一次变化到回调的最长等待时间（秒）
+        clock: 计时函数
+    """
+    pending = set()
+    first_change = last_change = 0.0
+    # 有待处理变化时缩短等待间隔，使防抖结束后能及时触发
+    while not stop_event.wait(min(poll_interval, debounce_seconds) if pending else poll_interval):
+        changed = watcher.poll()
+        now = clock()
+        if changed:
+            if not pending:
+                first_change = now
+            pending |= changed
+            last_change = now
+        if pending and (now - last_change >= debounce_seconds or now - first_change >= max_delay_seconds):
+            batch, pending = pending, set()
+            on_change(batch)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索结果排序模块 - 关联需求FR-007
+
+此模块提供可替换的搜索排序算法，包括：
+1. BM25 排序（默认，k1/b 可调）
+2. 旧版排序（命中比例 + 词频 + 长度归一化）
+
+排序算法在倒排表上按词累加得分，IDF、平均文档长度和逐词得分上界在构建索引时预先计算。
+BM25 使用 MaxScore 算法按文档顺序求前 k 个结果，跳过不可能进入前 k 的文档。
+标题、小标题等附加字段有各自的倒排表和长度归一化，字段命中的 BM25 得分乘以字段权重后
+累加到正文得分上；"字段:词语" 形式的查询词只在指定字段中检索。
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_RANKING_SETTINGS = {
+    "algorithm": "bm25",
+    "k1": 1.2,
+    "b": 0.75
+}
+
+# 正文字段名，全局倒排表即正文字段的倒排表
+BODY_FIELD = "body"
+# 查询词中字段名与词语的分隔符，如 "title:规范"（分词结果中不会出现该字符）
+FIELD_SEPARATOR = ":"
+
+
+def split_field(token: str) -> Tuple[Optional[str], str]:
+    """拆分限定字段的查询词
+
+    Args:
+        token: 查询词，可以是 "字段:词语" 形式
+
+    Returns:
+        (字段名, 词语)，未限定字段时字段名为 None
+    """
+    field, separator, term = token.partition(FIELD_SEPARATOR)
+    if not separator:
+        return None, token
+    return field, term
+
+
+def bm25_idf(doc_count: int, doc_freq: int) -> float:
+    """计算 BM25 的逆文档频率（取非负的 Lucene 变体）
+
+    Args:
+        doc_count: 文档总数
+        doc_freq: 包含该词语的文档数
+
+    Returns:
+        逆文档频率
+    """
+    return math.log(1.0 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def compute_ranking_stats(postings: Dict[str, List[int]], doc_lengths: Sequence[int],
+                          k1: float = DEFAULT_RANKING_SETTINGS["k1"],
+                          b: float = DEFAULT_RANKING_SETTINGS["b"]) -> Dict[str, Any]:
+    """在构建索引时预先计算排序所需的统计信息
+
+    Args:
+        postings: 词语到扁平倒排列表的映射
+        doc_lengths: 按 doc_id 排列的文档长度
+        k1: 计算得分上界使用的 BM25 k1 参数
+        b: 计算得分上界使用的 BM25 b 参数
+
+    Returns:
+        包含 idf（词语 -> 逆文档频率）、avg_doc_length、
+        max_scores（词语 -> 该词对任一文档的最大 BM25 得分）及对应 k1/b 的字典
+    """
+    doc_count = len(doc_lengths)
+    avg_doc_length = sum(doc_lengths) / doc_count if doc_count else 0.0
+    length_norms = [k1 * (1 - b + b * doc_length / (avg_doc_length or 1.0)) for doc_length in doc_lengths]
+
+    idf = {}
+    max_scores = {}
+    for term, term_postings in postings.items():
+        term_idf = bm25_idf(doc_count, len(term_postings) // 2)
+        best = 0.0
+        for i in range(0, len(term_postings), 2):
+            tf = term_postings[i + 1]
+            saturation = tf / (tf + length_norms[term_postings[i]])
+            if saturation > best:
+                best = saturation
+        idf[term] = term_idf
+        max_scores[term] = term_idf * (k1 + 1) * best
+
+    return {"idf": idf, "avg_doc_length": avg_doc_length, "max_scores": max_scores, "k1": k1, "b": b}
+
+
+class FieldIndex(NamedTuple):
+    """附加字段（标题、小标题）的倒排表、长度统计和得分权重"""
+    postings: Any
+    doc_lengths: Sequence[int]
+    avg_doc_length: float
+    boost: float
+
+
+class RankingContext(NamedTuple):
+    """排序算法访问索引数据的只读视图
+
+    postings/doc_lengths 为正文字段，fields 为附加字段名到字段索引的映射。
+    max_score 返回正文词语的预计算得分上界；参数与索引构建时不一致时返回 None。
+    """
+    postings: Any
+    doc_lengths: Sequence[int]
+    idf: Callable[[str], float]
+    avg_doc_length: float
+    max_score: Callable[[str, float, float], Optional[float]]
+    fields: Optional[Dict[str, FieldIndex]] = None
+    body_boost: float = 1.0
+
+
+class QueryClause(NamedTuple):
+    """在一个字段中检索一个词语的子句"""
+    term: str
+    field: str
+    postings: Any
+    doc_lengths: Sequence[int]
+    avg_doc_length: float
+    boost: float
+
+
+def query_clauses(query_tokens: List[str], context: RankingContext) -> List[QueryClause]:
+    """把查询词展开为各字段上的检索子句
+
+    未限定字段的查询词在正文和全部附加字段中检索，限定字段的查询词只在该字段中检索。
+    只返回倒排列表非空的子句，同一字段中的同一词语只出现一次。
+
+    Args:
+        query_tokens: 查询词语列表
+        context: 索引数据视图
+
+    Returns:
+        检索子句列表
+    """
+    fields = context.fields or {}
+    clauses = {}
+    for token in query_tokens:
+        field, term = split_field(token)
+        if field in (None, BODY_FIELD) and (term, BODY_FIELD) not in clauses:
+            postings = context.postings.get(term)
+            if postings:
+                clauses[(term, BODY_FIELD)] = QueryClause(term, BODY_FIELD, postings, context.doc_lengths,
+                                                          context.avg_doc_length, context.body_boost)
+        for name, index in fields.items():
+            if field not in (None, name) or (term, name) in clauses:
+                continue
+            postings = index.postings.get(term)
+            if postings:
+                clauses[(term, name)] = QueryClause(term, name, postings, index.doc_lengths,
+                                                    index.avg_doc_length, index.boost)
+    return list(clauses.values())
+
+
+class RankingEngine:
+    """排序算法基类
+
+    子类实现 score()，根据查询词在倒排表上计算候选文档得分。
+    """
+
+    name = ""
+
+    def score(self, query_tokens: List[str], context: RankingContext) -> Dict[int, float]:
+        """计算候选文档得分
+
+        Args:
+            query_tokens: 查询词语列表
+            context: 索引数据视图
+
+        Returns:
+            doc_id 到相关性得分的映射
+        """
+        raise NotImplementedError
+
+    def top_k(self, query_tokens: List[str], context: RankingContext, k: int) -> List[Tuple[int, float]]:
+        """计算得分最高的 k 个文档
+
+        默认实现对全部候选文档打分后用堆选出前 k 个。得分相同时 doc_id 较小者优先。
+
+        Args:
+            query_tokens: 查询词语列表
+            context: 索引数据视图
+            k: 返回结果数量
+
+        Returns:
+            按得分从高到低排列的 (doc_id, 得分) 列表
+        """
+        scores = self.score(query_tokens, context)
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(doc_id, score) for doc_id, score in best if score > 0]
+
+
+class BM25Ranker(RankingEngine):
+    """BM25 排序算法"""
+
+    name = "bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """初始化 BM25 排序算法
+
+        Args:
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query_tokens: List[str], context: RankingContext) -> Dict[int, float]:
+        scores = {}
+        k1 = self.k1
+        # 文档长度归一化因子只依赖字段长度，同一查询内按 (字段, doc_id) 缓存
+        length_norms = {}
+        for clause in query_clauses(query_tokens, context):
+            postings = clause.postings
+            doc_lengths = clause.doc_lengths
+            avg_doc_length = clause.avg_doc_length or 1.0
+            weight = context.idf(clause.term) * (k1 + 1) * clause.boost
+            for i in range(0, len(postings), 2):
+                doc_id = postings[i]
+                tf = postings[i + 1]
+                norm = length_norms.get((clause.field, doc_id))
+                if norm is None:
+                    norm = k1 * (1 - self.b + self.b * doc_lengths[doc_id] / avg_doc_length)
+                    length_norms[(clause.field, doc_id)] = norm
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + norm)
+        return scores
+
+    def top_k(self, query_tokens: List[str], context: RankingContext, k: int) -> List[Tuple[int, float]]:
+        """使用 MaxScore 算法计算得分最高的 k 个文档
+
+        查询词按得分上界升序排列，上界之和不超过当前第 k 名得分的词为非必要词：
+        只出现在非必要词中的文档不可能进入前 k，不再枚举；候选文档累加非必要词
+        得分前，若加上剩余上界仍无法超过第 k 名也会提前放弃。
+        """
+        if k <= 0:
+            return []
+
+        k1 = self.k1
+        b = self.b
+
+        # 每个检索子句: [得分上界, idf * (k1 + 1) * 权重, doc_id 列表, 词频列表, 游标, 字段长度, 平均长度]
+        terms = []
+        for clause in query_clauses(query_tokens, context):
+            weight = context.idf(clause.term) * (k1 + 1) * clause.boost
+            upper_bound = None
+            if clause.field == BODY_FIELD:
+                upper_bound = context.max_score(clause.term, k1, b)
+            if upper_bound is None:
+                # 词频饱和项小于1，idf * (k1 + 1) 总是有效的上界
+                upper_bound = weight
+            else:
+                upper_bound *= clause.boost
+            terms.append([upper_bound, weight, clause.postings[0::2], clause.postings[1::2], 0,
+                          clause.doc_lengths, clause.avg_doc_length or 1.0])
+        if not terms:
+            return []
+
+        terms.sort(key=lambda term: term[0])
+        cumulative_bounds = []
+        total = 0.0
+        for term in terms:
+            total += term[0]
+            cumulative_bounds.append(total)
+
+        # 最小堆保存当前前 k 名 (得分, -doc_id)，堆顶为第 k 名
+        heap = []
+        threshold = 0.0
+        first_essential = 0
+
+        def length_norm(term: List[Any], doc_id: int) -> float:
+            return k1 * (1 - b + b * term[5][doc_id] / term[6])
+
+        while True:
+            # 在必要词的倒排列表中取下一个候选文档
+            candidate = None
+            for term in terms[first_essential:]:
+                cursor = term[4]
+                if cursor < len(term[2]) and (candidate is None or term[2][cursor] < candidate):
+                    candidate = term[2][cursor]
+            if candidate is None:
+                break
+
+            score = 0.0
+            for term in terms[first_essential:]:
+                cursor = term[4]
+                if cursor < len(term[2]) and term[2][cursor] == candidate:
+                    tf = term[3][cursor]
+                    score += term[1] * tf / (tf + length_norm(term, candidate))
+                    term[4] = cursor + 1
+
+            # 按上界从高到低补充非必要词的得分，无法超过阈值时提前放弃
+            for index in range(first_essential - 1, -1, -1):
+                if len(heap) == k and score + cumulative_bounds[index] <= threshold:
+                    break
+                term = terms[index]
+                cursor = bisect_left(term[2], candidate, term[4])
+                term[4] = cursor
+                if cursor < len(term[2]) and term[2][cursor] == candidate:
+                    tf = term[3][cursor]
+                    score += term[1] * tf / (tf + length_norm(term, candidate))
+
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -candidate))
+            elif score > threshold:
+                heapq.heapreplace(heap, (score, -candidate))
+            else:
+                continue
+
+            if len(heap) == k:
+                threshold = heap[0][0]
+                while first_essential < len(terms) and cumulative_bounds[first_essential] <= threshold:
+                    first_essential += 1
+                if first_essential == len(terms):
+                    break
+
+        best = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [(-neg_doc_id, score) for score, neg_doc_id in best]
+
+
+class LegacyRanker(RankingEngine):
+    """旧版排序算法：命中比例、归一化词频和文档长度归一化的加权组合
+
+    只使用正文字段，限定其他字段的查询词按正文词语处理。
+    """
+
+    name = "legacy"
+
+    def score(self, query_tokens: List[str], context: RankingContext) -> Dict[int, float]:
+        unique_tokens = {split_field(token)[1] for token in query_tokens}
+        if not unique_tokens:
+            return {}
+
+        # doc_id -> [命中词数, 归一化词频之和]
+        accumulators = {}
+        doc_lengths = context.doc_lengths
+        for token in unique_tokens:
+            postings = context.postings.get(token)
+            if not postings:
+                continue
+            for i in range(0, len(postings), 2):
+                doc_id = postings[i]
+                doc_length = doc_lengths[doc_id]
+                acc = accumulators.get(doc_id)
+                if acc is None:
+                    acc = accumulators[doc_id] = [0, 0.0]
+                acc[0] += 1
+                acc[1] += postings[i + 1] / doc_length if doc_length > 0 else 0
+
+        query_size = len(unique_tokens)
+        scores = {}
+        for doc_id, (matched, term_frequency_score) in accumulators.items():
+            base_score = matched / query_size
+            length_normalization = 1.0 / (1.0 + doc_lengths[doc_id] / 1000.0)
+            scores[doc_id] = (base_score * 0.6 + term_frequency_score * 0.4) * length_normalization
+
+        return scores
+
+
+def create_ranker(settings: Optional[Dict[str, Any]] = None) -> RankingEngine:
+    """根据配置创建排序算法
+
+    Args:
+        settings: 排序配置，如 {"algorithm": "bm25", "k1": 1.2, "b": 0.75}
+
+    Returns:
+        排序算法实例
+    """
+    settings = dict(DEFAULT_RANKING_SETTINGS, **(settings or {}))
+    algorithm = settings["algorithm"]
+    if algorithm == "bm25":
+        return BM25Ranker(k1=settings["k1"], b=settings["b"])
+    if algorithm == "legacy":
+        return LegacyRanker()
+    raise ValueError(f"未知的排序算法: {algorithm}")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索建议前缀索引模块 - 关联需求FR-007
+
+此模块提供搜索建议和自动完成使用的前缀索引，包括：
+1. 按小写键排序的词语和标题数组（bisect 前缀查找）
+2. 按文档频率排序的建议结果
+3. 短前缀的前 k 个建议预计算缓存
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+# 预先计算前 k 个建议的最大前缀长度
+PREFIX_CACHE_DEPTH = 3
+# 每个缓存前缀保存的候选数量（需大于常用的建议数量以便去重和排除完全匹配）
+PREFIX_CACHE_SIZE = 20
+
+
+class PrefixIndex:
+    """前缀索引
+
+    条目按小写键排序，前缀对应的条目是一段连续区间。长度不超过 PREFIX_CACHE_DEPTH
+    的前缀直接读取预先排好序的候选，查询复杂度为 O(前缀长度 + k)；更长的前缀区间
+    通常很短，在区间内按权重选出前 k 个。
+    """
+
+    def __init__(self, keys: List[str], displays: List[str], weights: List[int],
+                 top: Dict[str, List[int]]):
+        """初始化前缀索引
+
+        Args:
+            keys: 已排序的小写查找键
+            displays: 各条目的展示文本
+            weights: 各条目的权重（文档频率）
+            top: 短前缀到按权重排序的条目序号列表
+        """
+        self.keys = keys
+        self.displays = displays
+        self.weights = weights
+        self.top = top
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str, int]]) -> 'PrefixIndex':
+        """构建前缀索引
+
+        Args:
+            entries: (查找键, 展示文本, 权重) 列表，相同键和展示文本的权重会累加
+
+        Returns:
+            前缀索引
+        """
+        return cls._from_weights(_merge_entries({}, entries))
+
+    def updated(self, entries: Iterable[Tuple[str, str, int]]) -> 'PrefixIndex':
+        """在当前条目的基础上累加权重变化，返回新的前缀索引
+
+        当前索引保持不变（可能仍被已发布的快照使用），权重减到0的条目被移除。
+
+        Args:
+            entries: (查找键, 展示文本, 权重变化) 列表，权重变化可以为负
+
+        Returns:
+            新的前缀索引
+        """
+        merged = dict(zip(zip(self.keys, self.displays), self.weights))
+        return self._from_weights(_merge_entries(merged, entries))
+
+    @classmethod
+    def _from_weights(cls, merged: Dict[Tuple[str, str], int]) -> 'PrefixIndex':
+        """由 (小写查找键, 展示文本) 到权重的映射构建前缀索引，忽略权重不为正的条目"""
+        ordered = sorted(item for item in merged.items() if item[1] > 0)
+        keys = [key for (key, _), _ in ordered]
+        displays = [display for (_, display), _ in ordered]
+        weights = [weight for _, weight in ordered]
+
+        candidates = {}
+        for entry_index, key in enumerate(keys):
+            for length in range(1, min(len(key), PREFIX_CACHE_DEPTH) + 1):
+                candidates.setdefault(key[:length], []).append(entry_index)
+
+        index = cls(keys, displays, weights, {})
+        index.top = {
+            prefix: heapq.nsmallest(PREFIX_CACHE_SIZE, entry_indexes, key=index._rank_key)
+            for prefix, entry_indexes in candidates.items()
+        }
+        return index
+
+    def _rank_key(self, entry_index: int) -> Tuple[int, int, str]:
+        """建议排序键：权重高者优先，其次是较短、字典序较小的文本"""
+        display = self.displays[entry_index]
+        return -self.weights[entry_index], len(display), display
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """查找以指定前缀开头的建议
+
+        Args:
+            prefix: 查询前缀
+            limit: 返回建议数量限制
+
+        Returns:
+            按权重从高到低排列的建议列表（不含与前缀完全相同的文本）
+        """
+        prefix = prefix.lower()
+        if not prefix or limit <= 0:
+            return []
+
+        cached = self.top.get(prefix) if len(prefix) <= PREFIX_CACHE_DEPTH else None
+        if cached is not None and (limit * 2 <= PREFIX_CACHE_SIZE or len(cached) < PREFIX_CACHE_SIZE):
+            ranked = cached
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\U0010ffff', start)
+            ranked = heapq.nsmallest(limit * 2 + 1, range(start, end), key=self._rank_key)
+
+        suggestions = []
+        seen = set()
+        for entry_index in ranked:
+            display = self.displays[entry_index]
+            if display in seen or display.lower() == prefix:
+                continue
+            seen.add(display)
+            suggestions.append(display)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典"""
+        return {
+            'version': 1,
+            'keys': self.keys,
+            'displays': self.displays,
+            'weights': self.weights,
+            'top': self.top
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PrefixIndex':
+        """从字典恢复前缀索引"""
+        return cls(data['keys'], data['displays'], data['weights'], data['top'])
+
+
+def _merge_entries(merged: Dict[Tuple[str, str], int],
+                   entries: Iterable[Tuple[str, str, int]]) -> Dict[Tuple[str, str], int]:
+    """把条目按 (小写查找键, 展示文本) 累加到 merged 中，空键被忽略"""
+    for key, display, weight in entries:
+        key = key.lower()
+        if not key:
+            continue
+        merged[(key, display)] = merged.get((key, display), 0) + weight
+    return merged
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词语规范化模块 - 关联需求FR-007
+
+此模块实现 optimization_settings 中的 stemming 和 synonyms_enabled 配置，包括：
+1. 英文词干提取（Porter 算法中处理屈折变化的部分：复数、-ed、-ing 和词尾的 e）
+2. 同义词表：每组同义词对应一个规范词语，同义词可以由多个词语组成（如 "VS Code"）
+3. 词语到规范词语的映射表：同义词在创建时编译，词干按不同的词语记忆，
+   查询时每个词语只需一次字典查找
+
+规范词语以 CANONICAL_PREFIX 开头（如 "~featur"、"~VSCode"），不会与分词得到的词语重名。
+建立索引时在原词语的位置上追加规范词语，原词语仍然保留，精确匹配、模糊匹配和搜索建议不受影响；
+查询时词语替换为规范词语，一次查找即可命中所有变体，不需要在查询时展开多个词语。
+同义词表可以在 optimization_settings.synonyms 中以词语列表的列表覆盖，每组第一个词语作为规范词语。
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 规范词语的前缀，分词结果只包含字母、数字和中文，不会以它开头
+CANONICAL_PREFIX = '~'
+
+# 默认同义词表，每组第一个词语作为规范词语
+DEFAULT_SYNONYMS = [
+    ["SDD", "规格驱动开发", "Spec-Driven Development"],
+    ["VSCode", "VS Code", "Visual Studio Code"]
+]
+
+# 记忆的词语数上限，超过时清空（查询中可能出现任意多的不同词语）
+NORMALIZER_CACHE_SIZE = 65536
+
+# 参与词干提取的词语：全小写或只有首字母大写的英文单词
+_STEMMABLE_PATTERN = re.compile(r'[a-z]{3,}|[A-Z][a-z]{2,}')
+_VOWELS = frozenset('aeiou')
+
+
+def is_canonical_term(term: str) -> bool:
+    """是否为规范词语"""
+    return term.startswith(CANONICAL_PREFIX)
+
+
+def _is_consonant(word: str, i: int) -> bool:
+    """word[i] 是否为辅音字母，前面是辅音的 y 视为元音"""
+    char = word[i]
+    if char in _VOWELS:
+        return False
+    if char == 'y':
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem: str) -> int:
+    """词干中元音-辅音序列的个数（Porter 算法中的 m）"""
+    count = 0
+    previous_vowel = False
+    for i in range(len(stem)):
+        consonant = _is_consonant(stem, i)
+        if consonant and previous_vowel:
+            count += 1
+        previous_vowel = not consonant
+    return count
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _ends_double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _ends_cvc(word: str) -> bool:
+    """是否以辅音-元音-辅音结尾，且最后的辅音不是 w、x、y"""
+    if len(word) < 3 or word[-1] in 'wxy':
+        return False
+    return (_is_consonant(word, len(word) - 3) and not _is_consonant(word, len(word) - 2)
+            and _is_consonant(word, len(word) - 1))
+
+
+def stem(word: str) -> str:
+    """提取小写英文单词的词干
+
+    只处理屈折变化（Porter 算法的第1步和第5a步），features、feature、featured 得到相同的词干。
+    词干不一定是完整的单词，只用作规范词语。
+
+    Args:
+        word: 小写英文单词
+
+    Returns:
+        词干
+    """
+    if len(word) <= 2:
+        return word
+    # 第1a步：复数
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    # 第1b步：-eed、-ed、-ing
+    if word.endswith('eed'):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif _ends_double_consonant(word) and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += 'e'
+                break
+    # 第1c步：词尾的 y
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+    # 第5a步：词尾的 e
+    if word.endswith('e'):
+        measure = _measure(word[:-1])
+        if measure > 1 or (measure == 1 and not _ends_cvc(word[:-1])):
+            word = word[:-1]
+    return word
+
+
+class TermNormalizer:
+    """词语到规范词语的映射
+
+    同义词在创建时按与正文相同的切分方式切分并编译为映射表：单个词语的同义词直接放入
+    词语映射表，多个词语的同义词按首个词语建立短语表。词干在首次遇到词语时计算并记忆。
+    同义词匹配不区分英文大小写。
+    """
+
+    def __init__(self, stemming: bool, synonym_groups: Iterable[List[str]],
+                 split: Callable[[str], List[str]]):
+        """初始化映射表
+
+        Args:
+            stemming: 是否提取英文词干
+            synonym_groups: 同义词组，每组第一个词语作为规范词语
+            split: 切分文本的函数（不做停用词和短词过滤）
+        """
+        self.stemming = stemming
+        # 小写词语 -> 规范词语，只包含单个词语的同义词
+        self._synonyms = {}
+        # 首个小写词语 -> [(小写词语元组, 规范词语)]，较长的短语在前
+        self._phrases = {}
+        # 规范词语 -> 同组的全部同义词，用于高亮
+        self.aliases = {}
+        for group in synonym_groups:
+            if not group:
+                continue
+            canonical = CANONICAL_PREFIX + group[0]
+            self.aliases[canonical] = tuple(group)
+            for alias in group:
+                key = tuple(token.lower() for token in split(alias))
+                if len(key) == 1:
+                    self._synonyms[key[0]] = canonical
+                elif key:
+                    self._phrases.setdefault(key[0], []).append((key, canonical))
+        for candidates in self._phrases.values():
+            candidates.sort(key=lambda item: -len(item[0]))
+        self._cache = {}
+
+    def normalize(self, token: str) -> str:
+        """词语对应的规范词语，没有时返回词语本身"""
+        canonical = self._cache.get(token)
+        if canonical is None:
+            canonical = self._synonyms.get(token.lower())
+            if canonical is None:
+                if self.stemming and _STEMMABLE_PATTERN.fullmatch(token):
+                    canonical = CANONICAL_PREFIX + stem(token.lower())
+                else:
+                    canonical = token
+            if len(self._cache) >= NORMALIZER_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[token] = canonical
+        return canonical
+
+    def phrases(self, tokens: List[str]) -> Dict[int, Tuple[int, str]]:
+        """查找词语序列中由多个词语组成的同义词，重叠时保留先出现的较长短语
+
+        Args:
+            tokens: 切分得到的词语序列
+
+        Returns:
+            短语起始序号 -> (短语的词语数, 规范词语)
+        """
+        matches = {}
+        if not self._phrases:
+            return matches
+        i = 0
+        while i < len(tokens):
+            match = self._match_phrase(tokens, i)
+            if match is None:
+                i += 1
+                continue
+            matches[i] = match
+            i += match[0]
+        return matches
+
+    def _match_phrase(self, tokens: List[str], start: int) -> Optional[Tuple[int, str]]:
+        candidates = self._phrases.get(tokens[start].lower())
+        if not candidates:
+            return None
+        for key, canonical in candidates:
+            end = start + len(key)
+            if end <= len(tokens) and all(tokens[start + j].lower() == key[j] for j in range(1, len(key))):
+                return len(key), canonical
+        return None
+
+
+_normalizers = {}
+
+
+def get_normalizer(signature: str, stemming: bool, synonym_groups: List[List[str]],
+                   split: Callable[[str], List[str]]) -> TermNormalizer:
+    """获取映射表，同一分词配置在进程内只编译一次
+
+    Args:
+        signature: 分词配置签名，签名相同的配置得到同一个映射表
+        stemming: 是否提取英文词干
+        synonym_groups: 同义词组
+        split: 切分文本的函数
+
+    Returns:
+        映射表
+    """
+    normalizer = _normalizers.get(signature)
+    if normalizer is None:
+        normalizer = _normalizers[signature] = TermNormalizer(stemming, synonym_groups, split)
+    return normalizer
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+站点构建缓存模块 - 关联需求FR-010
+
+为 build_docs.py 的进程内构建提供按内容寻址的增量构建缓存，包括：
+1. 页面渲染缓存：缓存键为页面 Markdown 内容、mkdocs.yml、主题和插件版本以及文档文件集合的
+   哈希，命中时跳过 Markdown 转换，直接恢复渲染结果（正文 HTML、目录、标题和锚点）
+2. 页面模板仍然逐页渲染，导航、上一页/下一页、搜索插件和搜索索引钩子看到的都是完整站点
+3. 静态文件（图片、主题资源）只在源文件比输出新时复制，不再每次清空 site/ 后全部重新复制
+4. 构建结束后只删除本次构建没有产生的过期输出
+
+缓存目录默认为项目根目录下的 .cache/site-build，可以通过 DOCS_BUILD_CACHE 环境变量或
+build_docs.py 的 --cache-dir 参数指定。CI 中把该目录保存为缓存即可在多次运行之间复用：
+
+    .cache/site-build/
+        pages/ab/abcdef....json     页面渲染结果，文件名为缓存键
+        outputs.json                上次构建的环境摘要和输出文件列表
+"""
+
+import os
+import re
+import json
+import time
+import types
+import hashlib
+import logging
+import importlib.metadata
+from typing import Any, Dict, List, Optional, Set
+
+from mkdocs.commands.build import build
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.pages import Page
+from mkdocs.structure.toc import get_toc
+
+from search_index_generations import write_file_atomic
+
+# 缓存格式版本，渲染结果的存储格式变化时递增，旧条目随之失效
+CACHE_VERSION = 1
+CACHE_DIR_ENV = 'DOCS_BUILD_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 '.cache', 'site-build')
+PAGES_DIR = 'pages'
+OUTPUTS_FILE = 'outputs.json'
+# 超过此天数没有被命中的页面缓存条目在构建结束时删除
+MAX_ENTRY_AGE_DAYS = 14
+# 包含 mkdocstrings 指令的页面，渲染结果还取决于 Python 源码，不缓存
+_AUTODOC_PATTERN = re.compile(r'^:::', re.MULTILINE)
+
+
+def default_cache_dir() -> str:
+    """构建缓存目录：DOCS_BUILD_CACHE 环境变量，未设置时为 .cache/site-build"""
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def _module_distributions() -> Dict[str, Set[str]]:
+    """顶层模块名 -> 提供该模块的发行包名称
+
+    优先读取 top_level.txt；没有该文件的发行包从 RECORD 的路径中取顶层目录。
+    importlib.metadata.packages_distributions() 会为每个文件构造路径对象，在安装了
+    数百个包的环境中需要数百毫秒，这里只做字符串处理。
+    """
+    modules = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        top_level = dist.read_text('top_level.txt')
+        if top_level:
+            top_names = top_level.split()
+        else:
+            top_names = {line.split(',', 1)[0].split('/', 1)[0].rsplit('.py', 1)[0]
+                         for line in (dist.read_text('RECORD') or '').splitlines()}
+        for top_name in top_names:
+            modules.setdefault(top_name, set()).add(name)
+    return modules
+
+
+def _dependency_versions(config) -> Dict[str, str]:
+    """影响渲染结果的已安装发行包版本：mkdocs、Markdown、主题、插件和 Markdown 扩展"""
+    modules = {'mkdocs', 'markdown'}
+    for plugin in config.plugins.values():
+        if not isinstance(plugin, types.ModuleType):
+            modules.add(type(plugin).__module__)
+    for extension in config.markdown_extensions:
+        modules.add(extension if isinstance(extension, str) else type(extension).__module__)
+
+    distributions = _module_distributions()
+    versions = {}
+    for module in modules:
+        for name in distributions.get(module.split('.')[0], ()):
+            versions[name] = importlib.metadata.version(name)
+    for entry_point in importlib.metadata.entry_points(group='mkdocs.themes', name=config.theme.name):
+        if entry_point.dist is not None:
+            versions[entry_point.dist.name] = entry_point.dist.version
+    return versions
+
+
+def environment_digest(config) -> str:
+    """计算与页面内容无关的构建环境摘要
+
+    包括缓存格式版本、mkdocs.yml 原文、相关发行包版本和钩子脚本源码，其中任何一项
+    变化都会使全部页面缓存失效。
+
+    Args:
+        config: 已加载的 mkdocs 配置
+
+    Returns:
+        十六进制摘要
+    """
+    hasher = hashlib.sha256(f"site-build-cache/{CACHE_VERSION}\n".encode('utf-8'))
+    with open(config.config_file_path, 'rb') as f:
+        hasher.update(f.read())
+    for name, version in sorted(_dependency_versions(config).items()):
+        hasher.update(f"\n{name}=={version}".encode('utf-8'))
+    for plugin in config.plugins.values():
+        hook_file = getattr(plugin, '__file__', None) if isinstance(plugin, types.ModuleType) else None
+        if hook_file and os.path.isfile(hook_file):
+            with open(hook_file, 'rb') as f:
+                hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def _toc_tokens(items) -> List[Dict[str, Any]]:
+    """把页面目录转换为 get_toc 可以还原的词法单元"""
+    return [{'level': item.level, 'id': item.id, 'name': item.title,
+             'children': _toc_tokens(item.children)} for item in items]
+
+
+def read_outputs_record(cache_dir: str) -> Optional[Dict[str, Any]]:
+    """读取上次构建记录的输出文件列表，不存在或损坏时返回None"""
+    try:
+        with open(os.path.join(cache_dir, OUTPUTS_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_outputs(site_dir: str) -> List[str]:
+    """列出站点目录中全部文件的相对路径（以 / 分隔）"""
+    outputs = []
+    for root, _, files in os.walk(site_dir):
+        for name in files:
+            outputs.append(os.path.relpath(os.path.join(root, name), site_dir).replace(os.sep, '/'))
+    return sorted(outputs)
+
+
+def remove_stale_outputs(site_dir: str, expected: Set[str], started_at: Optional[float] = None) -> List[str]:
+    """删除站点目录中的过期输出
+
+    Args:
+        site_dir: 站点目录
+        expected: 应当保留的输出相对路径集合
+        started_at: 构建开始时间；给出时构建期间写入的文件（插件生成的输出）一并保留
+
+    Returns:
+        已删除文件的相对路径列表
+    """
+    removed = []
+    for relative_path in list_outputs(site_dir):
+        if relative_path in expected:
+            continue
+        path = os.path.join(site_dir, relative_path)
+        try:
+            if started_at is not None and os.path.getmtime(path) >= started_at:
+                continue
+            os.remove(path)
+            removed.append(relative_path)
+        except OSError:
+            continue
+    # 自底向上删除因此变空的目录
+    for root, dirs, files in os.walk(site_dir, topdown=False):
+        if root != site_dir and not dirs and not files:
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+    return removed
+
+
+def clean_stale_outputs(site_dir: str, cache_dir: str = None) -> Optional[List[str]]:
+    """按上次构建记录的输出列表清理站点目录
+
+    Args:
+        site_dir: 站点目录
+        cache_dir: 构建缓存目录
+
+    Returns:
+        已删除文件的相对路径列表；没有对应的构建记录时返回None
+    """
+    record = read_outputs_record(cache_dir or default_cache_dir())
+    if record is None or os.path.normpath(record.get('site_dir', '')) != os.path.normpath(site_dir):
+        return None
+    return remove_stale_outputs(site_dir, set(record['outputs']))
+
+
+class _DirtyBuildLogFilter(logging.Filter):
+    """过滤 mkdocs 针对 dirty 构建的提示：缓存构建中全部页面都会重新生成，导航不会过期，
+    过期文件在构建结束后清理"""
+
+    def filter(self, record):
+        message = record.getMessage()
+        return not (message.startswith("A 'dirty' build") or
+                    message.startswith("The directory contains stale files"))
+
+
+class SiteBuildCache(BasePlugin):
+    """站点构建缓存
+
+    以插件形式注册到已加载的 mkdocs 配置上，在 Markdown 转换前按缓存键查找渲染结果。
+    mkdocs 以 dirty 模式构建，不清空站点目录；文档页面始终视为已修改，因此每个页面都
+    经过完整的插件事件和模板渲染，只有 Markdown 转换被缓存替代。
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """初始化构建缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为 default_cache_dir()
+        """
+        super().__init__()
+        self.cache_dir = os.path.abspath(cache_dir or default_cache_dir())
+        self.pages_dir = os.path.join(self.cache_dir, PAGES_DIR)
+        # 只在 run_build 期间生效，同一配置上的其他构建（如启动耗时对比）不受影响
+        self.enabled = False
+        self._environment = None
+        self._files_digest = None
+        self._expected_outputs = set()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.pages_dir, key[:2], f"{key}.json")
+
+    def on_files(self, files, config, **kwargs):
+        """记录文档文件集合的摘要和本次构建的输出文件，并让文档页面始终重新生成"""
+        if not self.enabled:
+            return files
+        # 页面中的相对链接按文件集合解析，新增或删除任何文件都使全部页面缓存失效
+        src_uris = sorted(file.src_uri for file in files)
+        self._files_digest = hashlib.sha256('\n'.join(src_uris).encode('utf-8')).hexdigest()
+        self._expected_outputs = {
+            os.path.relpath(file.abs_dest_path, config.site_dir).replace(os.sep, '/') for file in files
+        }
+        for file in files.documentation_pages():
+            file.is_modified = _always_modified
+        return files
+
+    def on_page_markdown(self, markdown, page, config, files, **kwargs):
+        """按页面内容查找缓存，用恢复缓存或渲染后写入缓存的函数替换页面的 render"""
+        if not self.enabled:
+            return markdown
+        if _AUTODOC_PATTERN.search(markdown):
+            self.uncached += 1
+            return markdown
+        hasher = hashlib.sha256()
+        for part in (self._environment, self._files_digest, page.file.src_uri, markdown):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\0')
+        key = hasher.hexdigest()
+
+        entry = self._load_entry(key)
+        if entry is not None:
+            self.hits += 1
+            page.render = lambda config, files: self._restore_page(page, entry, files)
+        else:
+            self.misses += 1
+            page.render = lambda config, files: self._render_page(page, key, config, files)
+        return markdown
+
+    def _load_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目并更新其修改时间（用于过期清理），不存在或损坏时返回None"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def _restore_page(self, page: Page, entry: Dict[str, Any], files):
+        """用缓存条目恢复 Page.render 的全部结果"""
+        page.content = entry['content']
+        page.toc = get_toc(entry['toc'])
+        page._title_from_render = entry['title']
+        page.present_anchor_ids = set(entry['anchors'])
+        links_to_anchors = {}
+        for src_uri, links in entry['links_to_anchors'].items():
+            file = files.get_file_from_path(src_uri)
+            if file is not None:
+                links_to_anchors[file] = links
+        page.links_to_anchors = links_to_anchors
+
+    def _render_page(self, page: Page, key: str, config, files):
+        """正常渲染页面并写入缓存"""
+        Page.render(page, config, files)
+        entry = {
+            'content': page.content,
+            'toc': _toc_tokens(page.toc),
+            'title': page._title_from_render,
+            'anchors': sorted(page.present_anchor_ids or ()),
+            'links_to_anchors': {file.src_uri: links for file, links in (page.links_to_anchors or {}).items()}
+        }
+        path = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_file_atomic(path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            print(f"写入页面缓存失败 {page.file.src_uri}: {e}")
+
+    def run_build(self, config, clean: bool = False) -> Dict[str, Any]:
+        """使用缓存构建站点
+
+        构建环境（mkdocs.yml、主题或插件版本）与上次构建不同时清空站点目录完整构建，
+        否则在已有的站点目录上增量构建。
+
+        Args:
+            config: 已加载的 mkdocs 配置
+            clean: 构建后是否删除本次构建没有产生的过期输出
+
+        Returns:
+            构建统计：页面缓存命中数、重新渲染数、不缓存数、删除的过期输出和耗时
+        """
+        if self.__class__.__name__ not in config.plugins:
+            config.plugins[self.__class__.__name__] = self
+        self.hits = self.misses = self.uncached = 0
+        site_dir = os.path.abspath(config.site_dir)
+        record = read_outputs_record(self.cache_dir)
+        environment = self._environment = environment_digest(config)
+        incremental = (record is not None and record.get('environment') == environment and
+                       os.path.normpath(record.get('site_dir', '')) == os.path.normpath(site_dir) and
+                       os.path.isdir(site_dir))
+
+        log_filter = _DirtyBuildLogFilter()
+        build_logger = logging.getLogger('mkdocs.commands.build')
+        build_logger.addFilter(log_filter)
+        self.enabled = True
+        # 文件系统的修改时间精度可能较粗，留出余量
+        started_at = time.time() - 2
+        start = time.perf_counter()
+        try:
+            build(config, dirty=incremental)
+        finally:
+            self.enabled = False
+            build_logger.removeFilter(log_filter)
+        elapsed = time.perf_counter() - start
+
+        removed = remove_stale_outputs(site_dir, self._expected_outputs, started_at) if clean else []
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_file_atomic(os.path.join(self.cache_dir, OUTPUTS_FILE), json.dumps({
+            'version': CACHE_VERSION,
+            'environment': environment,
+            'site_dir': site_dir,
+            'outputs': list_outputs(site_dir)
+        }, ensure_ascii=False, indent=2).encode('utf-8'))
+        self.collect_garbage()
+        return {
+            'incremental': incremental,
+            'hits': self.hits,
+            'misses': self.misses,
+            'uncached': self.uncached,
+            'removed': removed,
+            'seconds': elapsed
+        }
+
+    def collect_garbage(self, max_age_days: float = MAX_ENTRY_AGE_DAYS) -> int:
+        """删除长时间未被命中的页面缓存条目
+
+        Args:
+            max_age_days: 未被命中的最长天数
+
+        Returns:
+            删除的条目数
+        """
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for root, _, files in os.walk(self.pages_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+
+def _always_modified() -> bool:
+    """文档页面的输出依赖导航等全站信息，每次构建都重新生成"""
+    return True
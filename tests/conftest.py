@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试公共配置 - 关联需求FR-007
+
+scripts/ 下的模块以同级模块的方式互相导入，测试时把该目录加入模块搜索路径。
+"""
+
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, 'scripts')
+DOCS_DIR = os.path.join(PROJECT_ROOT, 'docs')
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+@pytest.fixture(scope='session')
+def docs_dir():
+    """仓库中的文档目录"""
+    return DOCS_DIR
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+中文分词测试 - 关联需求FR-007
+"""
+
+import os
+
+import pytest
+
+from chinese_segmenter import ChineseSegmenter, get_segmenter
+from search_index_optimizer import SearchIndexOptimizer
+
+
+@pytest.fixture(scope='module')
+def segmenter():
+    return get_segmenter()
+
+
+@pytest.mark.parametrize('sentence, expected', [
+    ('今天天气很好我们去公园散步吧', ['今天天气', '很', '好', '我们', '去', '公园', '散步', '吧']),
+    ('大量训练', ['大量', '训练']),
+    ('规范驱动开发', ['规范', '驱动', '开发']),
+])
+def test_cut_common_text(segmenter, sentence, expected):
+    assert segmenter.cut(sentence) == expected
+
+
+def test_cut_offsets_cover_sentence(segmenter):
+    sentence = '今天天气很好我们去公园散步吧'
+    words = segmenter.cut_with_offsets(sentence)
+    assert ''.join(word for word, _ in words) == sentence
+    for word, offset in words:
+        assert sentence[offset:offset + len(word)] == word
+
+
+def test_unknown_characters_become_bigrams(tmp_path):
+    dictionary = tmp_path / 'dict.txt'
+    dictionary.write_text('# 测试词典\n公园 100\n好 10\n', encoding='utf-8')
+    segmenter = ChineseSegmenter(str(dictionary))
+    # 连续的未登录单字不再合并为一个长词语
+    assert segmenter.cut_with_offsets('甲乙丙公园好') == [('甲乙', 0), ('乙丙', 1), ('公园', 3), ('好', 5)]
+    assert segmenter.cut_with_offsets('甲公园') == [('甲', 0), ('公园', 1)]
+
+
+def test_subwords_search_mode(segmenter):
+    assert segmenter.subwords('今天天气') == [('今天', 0), ('天天', 1), ('天气', 2)]
+    assert segmenter.subwords('公园') == []
+
+
+def test_words_inside_compounds_are_searchable(tmp_path, docs_dir):
+    """词典中的长词语不会遮住其中的常用词，查询能找到所有包含该词的页面"""
+    optimizer = SearchIndexOptimizer(docs_dir=docs_dir, index_dir=str(tmp_path / 'index'))
+    optimizer.build_index(force_rebuild=True)
+    for query in ('中文', '优化', '目录', '规范'):
+        expected = set()
+        for root, _, files in os.walk(docs_dir):
+            for file in files:
+                if file.endswith('.md'):
+                    path = os.path.join(root, file)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        if query in f.read():
+                            expected.add(os.path.relpath(path, docs_dir).replace(os.sep, '/'))
+        found = {result['path'] for result in optimizer.search(query, limit=100)}
+        assert found == expected, query
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+索引代数目录测试 - 关联需求FR-007
+"""
+
+import os
+
+import pytest
+
+from search_index_generations import (GENERATIONS_DIR, collect_garbage, create_staging_directory,
+                                      generation_directory_name, publish_generation, read_manifest,
+                                      release_generation, reserve_generation)
+
+
+def _publish(index_dir, generation, content):
+    staging_dir = create_staging_directory(index_dir, generation)
+    with open(os.path.join(staging_dir, 'data.txt'), 'w', encoding='utf-8') as f:
+        f.write(content)
+    return publish_generation(index_dir, staging_dir, generation)
+
+
+def test_reserve_generation_skips_taken_numbers(tmp_path):
+    index_dir = str(tmp_path)
+    assert reserve_generation(index_dir, 1) == 1
+    # 另一个写入方以相同的清单代数为下限时分到下一代
+    assert reserve_generation(index_dir, 1) == 2
+    release_generation(index_dir, 1)
+    assert reserve_generation(index_dir, 1) == 1
+
+
+def test_publish_never_replaces_published_generation(tmp_path):
+    index_dir = str(tmp_path)
+    generation = reserve_generation(index_dir, 1)
+    final_dir = _publish(index_dir, generation, 'first')
+
+    staging_dir = create_staging_directory(index_dir, generation)
+    with open(os.path.join(staging_dir, 'data.txt'), 'w', encoding='utf-8') as f:
+        f.write('second')
+    with pytest.raises(OSError):
+        publish_generation(index_dir, staging_dir, generation)
+    with open(os.path.join(final_dir, 'data.txt'), encoding='utf-8') as f:
+        assert f.read() == 'first'
+    assert read_manifest(index_dir)['generation'] == generation
+
+    # 已发布的目录不是空目录，放弃占用时不会被删除
+    release_generation(index_dir, generation)
+    assert os.path.isdir(final_dir)
+
+
+def test_garbage_collection_keeps_reservations(tmp_path):
+    index_dir = str(tmp_path)
+    for generation in (1, 2):
+        _publish(index_dir, reserve_generation(index_dir, generation), str(generation))
+    # 较慢的写入方占用了第3代，另一个写入方随后发布第4代
+    reserved = reserve_generation(index_dir, 3)
+    _publish(index_dir, reserve_generation(index_dir, 3), '4')
+
+    collect_garbage(index_dir)
+    generations_dir = os.path.join(index_dir, GENERATIONS_DIR)
+    assert sorted(os.listdir(generations_dir)) == [generation_directory_name(2), generation_directory_name(3),
+                                                   generation_directory_name(4)]
+    # 占用方较晚发布时清单不会退回第3代，第3代目录被删除
+    assert _publish(index_dir, reserved, '3') is None
+    assert read_manifest(index_dir)['generation'] == 4
+    assert not os.path.exists(os.path.join(generations_dir, generation_directory_name(3)))
+    with open(os.path.join(index_dir, read_manifest(index_dir)['directory'], 'data.txt'), encoding='utf-8') as f:
+        assert f.read() == '4'
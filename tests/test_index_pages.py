@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+已渲染页面索引测试 - 关联需求FR-007
+
+MkDocs 钩子（index_pages）与命令行构建（build_index）写入同一索引目录，
+两条路径得到的文本和小标题不同，不应互相复用对方建立的条目。
+"""
+
+import hashlib
+
+from search_index_optimizer import SearchIndexOptimizer
+
+MARKDOWN = "# 页面\n\nmarkdownonly 正文\n"
+
+
+def _rendered_page(docs_dir):
+    with open(docs_dir / 'page.md', 'rb') as f:
+        raw_content = f.read()
+    return {
+        'title': '页面',
+        'text': '页面 renderedonly 正文',
+        'headings': [[1, '页面', 'page'], [2, '渲染小标题', 'rendered']],
+        # 没有头信息时页面 Markdown 与文件内容相同，哈希也相同
+        'content_hash': hashlib.sha256(raw_content).hexdigest(),
+        'modified_time': 0.0
+    }
+
+
+def test_index_pages_does_not_reuse_markdown_entries(tmp_path):
+    docs_dir = tmp_path / 'docs'
+    docs_dir.mkdir()
+    (docs_dir / 'page.md').write_text(MARKDOWN, encoding='utf-8')
+    optimizer = SearchIndexOptimizer(docs_dir=str(docs_dir), index_dir=str(tmp_path / 'index'))
+    assert optimizer.build_index(force_rebuild=True)
+    assert optimizer.search('markdownonly')
+
+    assert optimizer.index_pages({'page.md': _rendered_page(docs_dir)}, ['page.md'])
+    assert optimizer.search('renderedonly')
+    assert not optimizer.search('markdownonly')
+
+    # 命令行构建同样不复用由渲染页面建立的条目
+    assert optimizer.build_index()
+    assert optimizer.search('markdownonly')
+    assert not optimizer.search('renderedonly')
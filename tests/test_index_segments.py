@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+索引分段测试 - 关联需求FR-007
+"""
+
+import pytest
+
+from search_index_optimizer import SearchIndexOptimizer
+from search_index_segments import open_segments
+
+
+@pytest.fixture(scope='module')
+def index_dir(tmp_path_factory, docs_dir):
+    index_dir = str(tmp_path_factory.mktemp('index'))
+    SearchIndexOptimizer(docs_dir=docs_dir, index_dir=index_dir).build_index(force_rebuild=True)
+    return index_dir
+
+
+def test_fuzzy_dictionary_loads_on_first_lookup(index_dir):
+    optimizer = SearchIndexOptimizer(index_dir=index_dir)
+    segments = optimizer._segments.segments
+    assert segments and all(segment.fuzzy.value is None for segment in segments)
+
+    assert optimizer.search('specket')
+    assert all(segment.fuzzy.value is not None for segment in segments)
+
+
+def test_segments_with_deletions_share_fuzzy_dictionary(index_dir):
+    optimizer = SearchIndexOptimizer(index_dir=index_dir)
+    segmented = open_segments(optimizer.data_dir)
+    segment = segmented.segments[0]
+    deleted = segmented.with_deletions([segmented.doc_ids[0]])[0]
+    assert deleted.fuzzy is segment.fuzzy
+    assert deleted.fuzzy_index() is segment.fuzzy_index()
+    assert 'speckit' in segment.fuzzy_index().lookup('specket', 1)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+Markdown文本提取测试 - 关联需求FR-007
+
+fixtures/markdown/ 下每个 <名称>.md 对应一个 <名称>.json，记录期望的文本和章节边界
+（[级别, 标题, 起始偏移]）。
+"""
+
+import json
+import os
+
+import pytest
+
+from markdown_text import extract, extract_text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'markdown')
+CASES = sorted(name[:-3] for name in os.listdir(FIXTURES_DIR) if name.endswith('.md'))
+
+
+def _load(case):
+    with open(os.path.join(FIXTURES_DIR, case + '.md'), 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+    with open(os.path.join(FIXTURES_DIR, case + '.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    return markdown_content, expected
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_extract_fixture(case):
+    markdown_content, expected = _load(case)
+    extracted = extract(markdown_content)
+    assert extracted.text == expected['text']
+    assert [list(section) for section in extracted.sections] == expected['sections']
+    assert extract_text(markdown_content) == expected['text']
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_section_offsets_point_at_titles(case):
+    markdown_content, _ = _load(case)
+    extracted = extract(markdown_content)
+    for section in extracted.sections:
+        assert extracted.text.startswith(section.title, section.start)
+
+
+def test_crlf_line_endings_match_lf():
+    markdown_content, expected = _load('fences')
+    assert extract(markdown_content.replace('\n', '\r\n')).text == expected['text']
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+倒排表搜索与逐文档扫描的一致性测试 - 关联需求FR-007
+
+使用旧版排序算法时，倒排表搜索（search）与逐文档扫描（_search_by_scan）的打分公式相同，
+两者对 docs/ 的查询应返回相同的文档和得分。
+"""
+
+import pytest
+
+from search_index_optimizer import SearchIndexOptimizer
+
+QUERIES = [
+    'speckit', 'SDD', 'VSCode', 'Supabase', 'CodeBuddy', 'Git', 'AI',
+    '规范', '中文', '安装', '配置 数据库', '规格驱动开发', 'speckit 安装 命令',
+    'title:speckit', 'heading:安装', '不存在的词语xyz'
+]
+
+
+@pytest.fixture(scope='module')
+def optimizer(tmp_path_factory, docs_dir):
+    optimizer = SearchIndexOptimizer(docs_dir=docs_dir, index_dir=str(tmp_path_factory.mktemp('index')))
+    optimizer.build_index(force_rebuild=True)
+    optimizer.set_ranking({"algorithm": "legacy"})
+    # 模糊匹配只在倒排表搜索中使用
+    optimizer._metadata["fuzzy"] = {"enabled": False}
+    return optimizer
+
+
+def _ranked(results):
+    return sorted(((result['path'], result['score']) for result in results), key=lambda item: (-item[1], item[0]))
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_matches_scan(optimizer, query):
+    indexed = _ranked(optimizer.search(query, limit=100))
+    scanned = _ranked(optimizer._search_by_scan(query, limit=100))
+    assert [path for path, _ in indexed] == [path for path, _ in scanned]
+    assert [score for _, score in indexed] == pytest.approx([score for _, score in scanned])
+
+
+def test_queries_find_documents(optimizer):
+    assert all(optimizer.search(query, limit=100) for query in QUERIES[:-1])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+搜索建议增量更新测试 - 关联需求FR-007
+
+增量构建按变化的文档更新上一代的搜索建议，结果应与由新一代索引完整重建的前缀索引相同，
+并随新一代一起保存。
+"""
+
+import os
+import shutil
+
+import pytest
+
+from search_index_optimizer import SearchIndexOptimizer
+
+
+@pytest.fixture
+def docs_copy(tmp_path, docs_dir):
+    path = str(tmp_path / 'docs')
+    shutil.copytree(docs_dir, path)
+    return path
+
+
+def _edit_documents(docs_dir):
+    """修改、新增和删除文档，覆盖标题、小标题和正文词语的变化"""
+    documents = sorted(os.path.relpath(os.path.join(root, name), docs_dir)
+                       for root, _, files in os.walk(docs_dir) for name in files if name.endswith('.md'))
+    with open(os.path.join(docs_dir, documents[0]), 'w', encoding='utf-8') as f:
+        f.write("# 改写后的标题\n\n## Rewritten heading\n\nreplacement 正文 speckit\n")
+    os.remove(os.path.join(docs_dir, documents[1]))
+    with open(os.path.join(docs_dir, 'added.md'), 'w', encoding='utf-8') as f:
+        f.write("# Added page\n\n## 新增小标题\n\naddedterm speckit 规范\n")
+
+
+def _assert_matches_full_rebuild(optimizer):
+    snapshot = optimizer._snapshot
+    assert os.path.exists(snapshot.suggestions_file)
+    expected = optimizer._create_prefix_index(snapshot.postings, snapshot.documents)
+    saved = optimizer._load_prefix_index(snapshot.postings, snapshot.documents, snapshot.suggestions_file)
+    assert snapshot.prefix_index.to_dict() == expected.to_dict()
+    assert saved.to_dict() == expected.to_dict()
+
+
+def test_incremental_build_updates_suggestions(tmp_path, docs_copy):
+    optimizer = SearchIndexOptimizer(docs_dir=docs_copy, index_dir=str(tmp_path / 'index'))
+    optimizer.build_index(force_rebuild=True)
+    _edit_documents(docs_copy)
+    assert optimizer.build_index()
+    _assert_matches_full_rebuild(optimizer)
+    assert 'addedterm' in optimizer.get_search_suggestions('addedt')
+    assert 'Rewritten heading' in optimizer.get_search_suggestions('rewri')
+
+
+def test_incremental_build_reads_previous_suggestions_file(tmp_path, docs_copy):
+    index_dir = str(tmp_path / 'index')
+    SearchIndexOptimizer(docs_dir=docs_copy, index_dir=index_dir).build_index(force_rebuild=True)
+    _edit_documents(docs_copy)
+    # 新进程没有加载过搜索建议，从上一代的文件更新
+    optimizer = SearchIndexOptimizer(docs_dir=docs_copy, index_dir=index_dir)
+    assert optimizer.build_index()
+    _assert_matches_full_rebuild(optimizer)
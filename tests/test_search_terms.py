@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+规范词语测试 - 关联需求FR-007
+
+启用词干提取和同义词时，索引在原词语之后追加规范词语；规范词语不占用文档的词语数上限，
+也不出现在索引统计中。
+"""
+
+import pytest
+
+from search_index_optimizer import SearchIndexOptimizer
+from search_terms import is_canonical_term
+
+
+@pytest.fixture(scope='module')
+def optimizer(tmp_path_factory, docs_dir):
+    optimizer = SearchIndexOptimizer(docs_dir=docs_dir, index_dir=str(tmp_path_factory.mktemp('index')))
+    optimizer.build_index(force_rebuild=True)
+    return optimizer
+
+
+def test_max_tokens_counts_original_tokens(optimizer):
+    text = 'features featured walking walks'
+    assert optimizer._tokenize(text, max_tokens=2) == ['features', '~featur', 'featured', '~featur']
+    assert [token for token, _, _ in optimizer._tokenize_with_offsets(text, 2)] == \
+        ['features', '~featur', 'featured', '~featur']
+    # 同义短语的规范词语随短语的首个词语保留
+    assert optimizer._tokenize('VS Code walks', max_tokens=1) == ['VS', '~VSCode']
+
+
+def test_index_text_truncates_before_expansion(optimizer):
+    settings = optimizer._metadata["optimization_settings"]
+    max_tokens = settings["max_tokens_per_document"]
+    settings["max_tokens_per_document"] = 3
+    try:
+        doc_index = optimizer._index_text('doc.md', '标题', 'features featured walking walks', 0.0, '', '')
+    finally:
+        settings["max_tokens_per_document"] = max_tokens
+    assert doc_index['token_count'] == 3
+    assert set(doc_index['inverted_index']) == {'features', 'featured', 'walking', '~featur', '~walk'}
+
+
+def test_export_index_stats_excludes_canonical_terms(optimizer):
+    stats = optimizer.export_index_stats()
+    assert not any(is_canonical_term(token) for token, _ in stats['top_tokens'])
+    assert stats['unique_tokens'] == sum(1 for token in optimizer._snapshot.postings.keys()
+                                         if not is_canonical_term(token))
+
+
+def test_normalizer_cached_between_queries(optimizer, monkeypatch):
+    normalizer = optimizer._term_normalizer()
+    assert normalizer is not None
+
+    def signature():
+        raise AssertionError("分词时不应重新计算配置签名")
+
+    monkeypatch.setattr(optimizer, '_settings_signature', signature)
+    assert optimizer._tokenize('features', query=True) == ['~featur']
+    assert optimizer._term_normalizer() is normalizer
+
+
+def test_hit_offsets_cover_surface_text(tmp_path):
+    docs_dir = tmp_path / 'docs'
+    docs_dir.mkdir()
+    (docs_dir / 'page.md').write_text("# 页面\n\nWe use Visual Studio Code for featured plugins.\n", encoding='utf-8')
+    optimizer = SearchIndexOptimizer(docs_dir=str(docs_dir), index_dir=str(tmp_path / 'index'))
+    optimizer.build_index(force_rebuild=True)
+    snapshot = optimizer._snapshot
+    query_tokens = tuple(optimizer._tokenize('vscode features', query=True))
+    assert query_tokens == ('~VSCode', '~featur')
+
+    hits = optimizer._hit_offsets(snapshot, {0}, query_tokens)[0]
+    surfaces = {token: snapshot.texts.read_bytes(0, start, end).decode('utf-8') for start, end, token in hits}
+    assert surfaces == {'~VSCode': 'Visual Studio Code', '~featur': 'featured'}
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+索引快照并发测试 - 关联需求FR-007
+
+多个线程持续搜索，同时主线程反复执行增量构建、完整重建和分段合并。搜索使用已发布的
+不可变快照，不应抛出异常，也不应返回不完整或重复的结果。
+"""
+
+import os
+import shutil
+import threading
+
+import pytest
+
+from search_index_optimizer import SearchIndexOptimizer
+
+QUERIES = ['speckit', 'SDD', 'Supabase', 'Git', '规范', '安装', '配置 数据库', 'title:speckit']
+READER_THREADS = 4
+WRITER_ROUNDS = 6
+# 追加到文档末尾的词语，不会被上面的查询命中
+APPENDED_WORD = 'zzqappended'
+
+
+@pytest.fixture
+def optimizer(tmp_path, docs_dir):
+    docs_copy = str(tmp_path / 'docs')
+    shutil.copytree(docs_dir, docs_copy)
+    optimizer = SearchIndexOptimizer(docs_dir=docs_copy, index_dir=str(tmp_path / 'index'))
+    optimizer.build_index(force_rebuild=True)
+    # 关闭结果缓存，每次搜索都读取快照
+    optimizer.set_result_cache({"size": 0})
+    return optimizer
+
+
+def _paths(results):
+    return [result['path'] for result in results]
+
+
+def test_search_during_rebuild_and_optimize(optimizer):
+    expected = {query: set(_paths(optimizer.search(query, limit=100))) for query in QUERIES}
+    assert any(expected.values())
+    documents = sorted(optimizer._snapshot.documents)
+
+    stop = threading.Event()
+    errors = []
+    searches = [0] * READER_THREADS
+
+    def reader(worker):
+        try:
+            while not stop.is_set():
+                for query in QUERIES:
+                    paths = _paths(optimizer.search(query, limit=100))
+                    assert len(paths) == len(set(paths)), f"{query} 返回了重复的结果: {paths}"
+                    assert set(paths) == expected[query], f"{query} 返回的结果不完整: {paths}"
+                    searches[worker] += 1
+        except Exception as e:  # noqa: BLE001 - 失败信息交给主线程断言
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader, args=(worker,), daemon=True) for worker in range(READER_THREADS)]
+    for thread in threads:
+        thread.start()
+    try:
+        for round_index in range(WRITER_ROUNDS):
+            doc_path = os.path.join(optimizer.docs_dir, documents[round_index % len(documents)])
+            with open(doc_path, 'a', encoding='utf-8') as f:
+                f.write(f"\n\n{APPENDED_WORD}{round_index}\n")
+            assert optimizer.build_index(changed_paths={documents[round_index % len(documents)]})
+            assert optimizer.optimize_index()
+            if round_index % 3 == 2:
+                assert optimizer.build_index(force_rebuild=True)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=30)
+
+    assert not errors, errors[0]
+    assert all(count > 0 for count in searches)
+    # 其他轮次追加的词语只差一个字符，会作为模糊匹配结果排在后面
+    assert _paths(optimizer.search(f"{APPENDED_WORD}0", limit=100))[0] == documents[0]